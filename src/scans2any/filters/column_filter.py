@@ -20,6 +20,7 @@ Granularity Modes:
 """
 
 import re
+import warnings
 from dataclasses import dataclass, field
 from re import Pattern
 
@@ -29,6 +30,12 @@ from scans2any.parsers import parser_custom_columns
 PRIORITY = 1
 
 HOST_COLUMNS = ("IP-Addresses", "Hostnames", "OS")
+SERVICE_COLUMNS = ("Ports", "Services", "Banners")
+
+# Leading inline flags, which can be turned into a scoped group
+_LEADING_FLAGS = re.compile(r"\(\?([ims]+)\)")
+_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL}
+_BACKREFERENCE = re.compile(r"\\\d|\(\?P=|\(\?\(")
 
 
 @dataclass
@@ -62,7 +69,7 @@ def add_arguments(parser):
 
 
 def _compile_specs(specs: list[str]) -> list[ColumnPattern]:
-    service_cols = {"Ports", "Services", "Banners", *parser_custom_columns.values()}
+    service_cols = {*SERVICE_COLUMNS, *parser_custom_columns.values()}
     valid_cols = {*HOST_COLUMNS, *service_cols}
     canonical = {k.lower(): v for k, v in parser_custom_columns.items()}
     compiled: list[ColumnPattern] = []
@@ -97,12 +104,14 @@ def _compile_specs(specs: list[str]) -> list[ColumnPattern]:
 
 
 def _get_host_field(host: Host, col: str) -> str:
+    # Values are joined in sorted order, independent of set iteration order
+    # (and like the database pushdown does)
     if col == "IP-Addresses":
-        return " ".join(host.address)
+        return " ".join(sorted(host.address))
     if col == "Hostnames":
-        return " ".join(host.hostnames)
+        return " ".join(sorted(host.hostnames))
     if col == "OS":
-        return " ".join(str(o) for o in host.os)
+        return " ".join(sorted(str(o) for o in host.os))
     return ""
 
 
@@ -116,15 +125,89 @@ def _get_service_field(service: Service, col: str) -> str:
     return str(service.custom_fields[col]) if col in service.custom_fields else ""
 
 
-def _matches_any_host_field(host: Host, cp: ColumnPattern) -> bool:
-    return any(cp.matches(_get_host_field(host, col)) for col in HOST_COLUMNS)
+def _get_service_fields(service: Service) -> dict[str, str]:
+    """All column strings of `service`, custom columns last."""
+    fields = {
+        "Ports": f"{service.port}/{service.protocol}",
+        "Services": " ".join(service.service_names),
+        "Banners": " \n".join(service.banners),
+    }
+    for col, values in service.custom_fields.items():
+        fields.setdefault(col, str(values))
+    return fields
+
+
+def _combine(patterns: list[ColumnPattern]) -> Pattern[str] | None:
+    """
+    Alternation of all `patterns`, which matches somewhere iff at least one
+    of them does. None if the patterns cannot be combined safely (inline flags
+    other than a leading (?i)/(?m)/(?s), or backreferences, which would be
+    renumbered).
+    """
+    parts = []
+    for p in patterns:
+        source = p.pattern.pattern
+        if _BACKREFERENCE.search(source):
+            return None
+        flags = ""
+        if match := _LEADING_FLAGS.match(source):
+            flags, source = match.group(1), source[match.end() :]
+        if p.pattern.flags & ~re.UNICODE != sum(_FLAGS[f] for f in set(flags)):
+            return None
+        parts.append(f"(?{flags}:{source})")
+    try:
+        return re.compile("|".join(parts))
+    except re.error:
+        return None
+
+
+class _PatternSet:
+    """
+    Several patterns evaluated against the same column strings.
+
+    Results are cached per string, the same values (ports, service names,
+    OS, ...) repeat across hosts. If all patterns combine into one regex, a
+    string without any match is answered by a single `re` pass.
+    """
+
+    def __init__(self, patterns: list[ColumnPattern]):
+        self.patterns = patterns
+        self.all = frozenset(range(len(patterns)))
+        # Result for strings none of the patterns is found in
+        self._none_found = frozenset(i for i, p in enumerate(patterns) if p.negated)
+        self._combined = _combine(patterns) if len(patterns) > 1 else None
+        self._cache: dict[str, frozenset[int]] = {}
+
+    def passing(self, text: str) -> frozenset[int]:
+        """Indices of the patterns passing for `text`."""
+        result = self._cache.get(text)
+        if result is None:
+            if self._combined is not None and not self._combined.search(text):
+                result = self._none_found
+            else:
+                result = frozenset(
+                    i for i, p in enumerate(self.patterns) if p.matches(text)
+                )
+            self._cache[text] = result
+        return result
 
+    def all_pass(self, text: str) -> bool:
+        return len(self.passing(text)) == len(self.patterns)
 
-def _matches_any_service_field(service: Service, cp: ColumnPattern) -> bool:
-    return any(
-        cp.matches(_get_service_field(service, col))
-        for col in ("Ports", "Services", "Banners", *service.custom_fields)
-    )
+    def any_field(self, texts) -> frozenset[int]:
+        """Indices of the patterns passing for at least one of `texts`."""
+        found = frozenset()
+        for text in texts:
+            found |= self.passing(text)
+        return found
+
+
+def _by_column(patterns: list[ColumnPattern]) -> dict[str, _PatternSet]:
+    columns: dict[str, list[ColumnPattern]] = {}
+    for p in patterns:
+        assert p.column is not None
+        columns.setdefault(p.column, []).append(p)
+    return {col: _PatternSet(col_patterns) for col, col_patterns in columns.items()}
 
 
 def _trim_service_values(service: Service, patterns: list[ColumnPattern]) -> None:
@@ -147,77 +230,94 @@ def _trim_service_values(service: Service, patterns: list[ColumnPattern]) -> Non
         # Ports is a single value — no trimming needed (match already confirmed)
 
 
-def apply_filter(infra: Infrastructure, args):
-    """Filter hosts/services by column regex specifications."""
-    specs_raw = getattr(args, "column_regex", [])
-    if not specs_raw:
-        return
-
-    patterns = _compile_specs(specs_raw)
-    if not patterns:
-        return
-
-    value_mode = getattr(args, "col_value_mode", False)
-    host_mode = getattr(args, "col_host_mode", False)
-
-    host_level = [p for p in patterns if p.column and not p.is_service_level]
-    service_level = [p for p in patterns if p.column and p.is_service_level]
-    global_level = [p for p in patterns if p.column is None]
-
-    def host_matches(host: Host) -> bool:
-        # Specific host-column patterns must all match
-        for p in host_level:
-            assert p.column is not None
-            if not p.matches(_get_host_field(host, p.column)):
-                return False
+def _filter_hosts(
+    hosts: list[Host],
+    host_level: list[ColumnPattern],
+    service_level: list[ColumnPattern],
+    global_level: list[ColumnPattern],
+    *,
+    value_mode: bool,
+    host_mode: bool,
+) -> list[Host]:
+    """Python backend, see `apply_filter`."""
+
+    # Every column string is built once per host/service and every distinct
+    # string is only matched once per pattern set.
+    host_columns = _by_column(host_level)
+    service_columns = _by_column(service_level)
+    global_set = _PatternSet(global_level)
+
+    def evaluate_service(service: Service) -> tuple[bool, frozenset[int]]:
+        """Whether all service-level patterns pass, and the passing globals."""
+        if not global_level:
+            # Only the columns with patterns are needed
+            return all(
+                pset.all_pass(_get_service_field(service, col))
+                for col, pset in service_columns.items()
+            ), frozenset()
+        fields = _get_service_fields(service)
+        columns_pass = all(
+            pset.all_pass(fields.get(col, "")) for col, pset in service_columns.items()
+        )
+        return columns_pass, global_set.any_field(fields.values())
 
+    def host_matches(
+        host_global: frozenset[int], services: list[tuple[bool, frozenset[int]]]
+    ) -> bool:
         # Global patterns: at least one of (host field, any service field) must match
-        for p in global_level:
-            if _matches_any_host_field(host, p):
-                continue
-            if any(_matches_any_service_field(s, p) for s in host.services):
-                continue
-            return False
+        missing = global_set.all - host_global
+        for _, found in services:
+            missing -= found
 
         # In host mode, at least one service must satisfy every service-level
         # pattern for the host to be included.
-        return not (host_mode and service_level) or any(
-            all(
-                p.matches(_get_service_field(s, col))
-                for p in service_level
-                if (col := p.column) is not None
-            )
-            for s in host.services
+        return not missing and (
+            not (host_mode and service_level)
+            or any(columns_pass for columns_pass, _ in services)
         )
 
-    def service_matches(service: Service, host: Host) -> bool:
+    def service_matches(
+        result: tuple[bool, frozenset[int]], host_global: frozenset[int]
+    ) -> bool:
+        columns_pass, found = result
         # Specific service-column patterns must all match
-        for p in service_level:
-            assert p.column is not None
-            if not p.matches(_get_service_field(service, p.column)):
-                return False
-
-        # Global patterns
-        for p in global_level:
-            if _matches_any_service_field(service, p):
-                continue
-            # In value mode the service must match on its own fields.
-            # In normal mode a match on the host fields is sufficient.
-            if not value_mode and _matches_any_host_field(host, p):
-                continue
+        if not columns_pass:
             return False
-        return True
+        # Global patterns. In value mode the service must match on its own
+        # fields. In normal mode a match on the host fields is sufficient.
+        if not value_mode:
+            found |= host_global
+        return found == global_set.all
 
-    # Apply to infrastructure
-    original_count = len(infra.hosts)
     filtered_hosts: list[Host] = []
-    for host in infra.hosts:
-        if not host_matches(host):
+    for host in hosts:
+        # Specific host-column patterns must all match
+        if not all(
+            pset.all_pass(_get_host_field(host, col))
+            for col, pset in host_columns.items()
+        ):
+            continue
+
+        host_global = (
+            global_set.any_field(_get_host_field(host, col) for col in HOST_COLUMNS)
+            if global_level
+            else frozenset()
+        )
+        services = (
+            [evaluate_service(s) for s in host.services]
+            if service_level or global_level
+            else []
+        )
+        if not host_matches(host_global, services):
             continue
 
         # In host mode keep all services — filtering already happened at host level.
         if not host_mode and (service_level or global_level):
-            new_services = [s for s in host.services if service_matches(s, host)]
+            new_services = [
+                s
+                for s, result in zip(host.services, services, strict=True)
+                if service_matches(result, host_global)
+            ]
             if not new_services:
                 continue
             if value_mode:
@@ -225,9 +325,155 @@ def apply_filter(infra: Infrastructure, args):
                     _trim_service_values(s, service_level)
             host.services = new_services
         filtered_hosts.append(host)
+    return filtered_hosts
+
+
+def _filter_hosts_pandas(
+    hosts: list[Host],
+    host_level: list[ColumnPattern],
+    service_level: list[ColumnPattern],
+    global_level: list[ColumnPattern],
+    *,
+    value_mode: bool,
+    host_mode: bool,
+) -> list[Host]:
+    """
+    pandas backend, see `apply_filter`.
+
+    Builds a flat table with one row per host and one row per service. Every
+    pattern is evaluated with `Series.str.contains` on the distinct values of
+    a column only, the results are combined as boolean masks and mapped back
+    to the hosts and services via their row numbers.
+    """
+    # Deferred import: keeps pandas/numpy out of the startup critical path.
+    import numpy as np
+    import pandas as pd
+
+    services = [s for host in hosts for s in host.services]
+    # Services of a host are consecutive rows, starting at `offsets[i]`
+    counts = np.fromiter((len(host.services) for host in hosts), np.intp, len(hosts))
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    host_ids = np.repeat(np.arange(len(hosts)), counts)
+
+    # Global patterns need all columns, else only those with patterns
+    if global_level:
+        host_columns = HOST_COLUMNS
+        # Missing custom columns are NaN
+        service_table = pd.DataFrame([_get_service_fields(s) for s in services])
+    else:
+        host_columns = {p.column for p in host_level}
+        # Missing custom columns are ""
+        service_table = pd.DataFrame(
+            {
+                col: [_get_service_field(s, col) for s in services]
+                for col in {p.column for p in service_level}
+            },
+            index=pd.RangeIndex(len(services)),
+        )
+    host_table = pd.DataFrame(
+        {col: [_get_host_field(host, col) for host in hosts] for col in host_columns},
+        index=pd.RangeIndex(len(hosts)),
+    )
+    factorized: dict[tuple[str, str], tuple[np.ndarray, pd.Series]] = {}
+
+    def passes(table: str, col: str, p: ColumnPattern, *, missing: bool) -> np.ndarray:
+        """Mask of rows passing `p`, rows without `col` pass if `missing`."""
+        if (table, col) not in factorized:
+            column = (host_table if table == "host" else service_table).get(col)
+            if column is None:
+                column = pd.Series(np.nan, index=service_table.index)
+            codes, uniques = pd.factorize(column)
+            factorized[table, col] = codes, pd.Series(uniques, dtype=object)
+        codes, uniques = factorized[table, col]
+        with warnings.catch_warnings():
+            # Groups are fine, only whether the pattern is found is of interest
+            warnings.simplefilter("ignore", UserWarning)
+            found = uniques.str.contains(p.pattern, regex=True).to_numpy(bool)
+        # Trailing entry for missing values (code -1)
+        passing = np.append(found ^ p.negated, missing)
+        return passing[codes]
+
+    def any_per_host(mask: np.ndarray) -> np.ndarray:
+        return np.bincount(host_ids[mask], minlength=len(hosts)) > 0
+
+    host_ok = np.ones(len(hosts), bool)
+    for p in host_level:
+        assert p.column is not None
+        host_ok &= passes("host", p.column, p, missing=False)
+
+    # Service-level patterns on missing columns are matched against ""
+    columns_ok = np.ones(len(service_table), bool)
+    for p in service_level:
+        assert p.column is not None
+        columns_ok &= passes("service", p.column, p, missing=p.matches(""))
+    # In host mode, at least one service must satisfy every service-level
+    # pattern for the host to be included.
+    if host_mode and service_level:
+        host_ok &= any_per_host(columns_ok)
+
+    service_ok = columns_ok
+    for p in global_level:
+        host_found = np.zeros(len(hosts), bool)
+        for col in HOST_COLUMNS:
+            host_found |= passes("host", col, p, missing=False)
+        service_found = np.zeros(len(service_table), bool)
+        for col in service_table.columns:
+            service_found |= passes("service", col, p, missing=False)
+        # At least one of (host field, any service field) must match
+        host_ok &= host_found | any_per_host(service_found)
+        # In value mode the service must match on its own fields. In normal
+        # mode a match on the host fields is sufficient.
+        if not value_mode:
+            service_found |= host_found[host_ids]
+        service_ok = service_ok & service_found
+
+    # In host mode keep all services — filtering already happened at host level.
+    if host_mode:
+        return [host for host, ok in zip(hosts, host_ok, strict=True) if ok]
+
+    filter_services = bool(service_level or global_level)
+    if filter_services:
+        host_ok &= any_per_host(service_ok)
+
+    filtered_hosts: list[Host] = []
+    for i in np.flatnonzero(host_ok):
+        host = hosts[i]
+        if filter_services:
+            keep = service_ok[offsets[i] : offsets[i + 1]]
+            new_services = [s for s, k in zip(host.services, keep, strict=True) if k]
+            if value_mode:
+                for s in new_services:
+                    _trim_service_values(s, service_level)
+            host.services = new_services
+        filtered_hosts.append(host)
+    return filtered_hosts
 
-    infra.hosts = filtered_hosts
 
-    printer.status(
-        f"column_filter: kept {len(filtered_hosts)} of {original_count} hosts"
+def apply_filter(infra: Infrastructure, args):
+    """Filter hosts/services by column regex specifications."""
+    specs_raw = getattr(args, "column_regex", [])
+    if not specs_raw:
+        return
+
+    patterns = _compile_specs(specs_raw)
+    if not patterns:
+        return
+
+    host_level = [p for p in patterns if p.column and not p.is_service_level]
+    service_level = [p for p in patterns if p.column and p.is_service_level]
+    global_level = [p for p in patterns if p.column is None]
+
+    backend = getattr(args, "column_filter_backend", "python")
+    filter_hosts = _filter_hosts_pandas if backend == "pandas" else _filter_hosts
+
+    original_count = len(infra.hosts)
+    infra.hosts = filter_hosts(
+        infra.hosts,
+        host_level,
+        service_level,
+        global_level,
+        value_mode=getattr(args, "col_value_mode", False),
+        host_mode=getattr(args, "col_host_mode", False),
     )
+
+    printer.status(f"column_filter: kept {len(infra.hosts)} of {original_count} hosts")
@@ -5,18 +5,26 @@ from scans2any.internal import Service, SortedSet
 PRIORITY = 3
 
 
-def apply_filter(service: Service, args):
+def applies_to(service: Service) -> bool:
+    """A single banner is kept as it is."""
+    return len(service.banners) != 1 or not isinstance(service.banners, SortedSet)
+
+
+def apply_filter(service: Service, args) -> bool:
     """Combine info from multiple service banners into one banner"""
 
+    if not applies_to(service):
+        return False
+
     # Remove too long banners to combine
-    service.banners = SortedSet(
-        [
-            banner
-            for banner in service.banners
-            if len(banner) <= 50 or len(service.banners) == 1
-        ]
-    )
+    banners = [
+        banner
+        for banner in service.banners
+        if len(banner) <= 50 or len(service.banners) == 1
+    ]
+    if not isinstance(service.banners, SortedSet):
+        banners = sorted(set(banners))
 
     # Combine banners
-    combined_banner = " | ".join(service.banners)
-    service.banners = SortedSet([combined_banner])
+    service.banners = SortedSet([" | ".join(banners)])
+    return True
@@ -5,9 +5,13 @@ from scans2any.internal import Host
 PRIORITY = 3
 
 
-def apply_filter(host: Host, args):
+def apply_filter(host: Host, args) -> bool:
     """Filter services, that have no identified open banner or service name."""
 
-    host.services = [
+    services = [
         service for service in host.services if service.service_names or service.banners
     ]
+    if len(services) == len(host.services):
+        return False
+    host.services = services
+    return True
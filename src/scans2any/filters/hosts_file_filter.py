@@ -1,9 +1,111 @@
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
 from pathlib import Path
 
 from scans2any.internal import Infrastructure, printer
 
 PRIORITY = 3
 
+# Marks a fully covered subtree in `_NetworkTrie`
+_COVERED = True
+# Marker keys in the `_HostnameTrie` nodes, distinct from all labels
+_EXACT = 0
+_WILDCARD = 1
+
+
+class _NetworkTrie:
+    """
+    Binary radix trie of IP networks over integer addresses (separately for
+    IPv4 and IPv6).
+
+    Every node is a `[child_0, child_1]` list indexed by the next address bit.
+    A network replaces the node for its prefix by `_COVERED`, so lookups walk
+    at most one node per address bit, however many networks are stored.
+    """
+
+    def __init__(self):
+        self.__roots: dict[int, list] = {4: [None, None], 6: [None, None]}
+        # IP versions covered completely (`0.0.0.0/0`, `::/0`)
+        self.__everything: set[int] = set()
+
+    def add(self, network: IPv4Network | IPv6Network):
+        if network.prefixlen == 0:
+            self.__everything.add(network.version)
+            return
+
+        value = int(network.network_address)
+        shift = network.max_prefixlen
+        node = self.__roots[network.version]
+        for _ in range(network.prefixlen - 1):
+            shift -= 1
+            bit = value >> shift & 1
+            child = node[bit]
+            if child is _COVERED:
+                # Contained in a network added before
+                return
+            if child is None:
+                child = node[bit] = [None, None]
+            node = child
+        node[value >> (shift - 1) & 1] = _COVERED
+
+    def __contains__(self, address: str) -> bool:
+        try:
+            ip = ip_address(address)
+        except ValueError:
+            return False
+        if ip.version in self.__everything:
+            return True
+
+        value = int(ip)
+        node = self.__roots[ip.version]
+        for shift in range(ip.max_prefixlen - 1, -1, -1):
+            node = node[value >> shift & 1]
+            if node is None:
+                return False
+            if node is _COVERED:
+                return True
+        return False
+
+
+class _HostnameTrie:
+    """
+    Trie of hostnames over their reversed labels (`www.corp.example` is stored
+    as `example` -> `corp` -> `www`), case-insensitive.
+
+    Entries are exact hostnames, wildcards (`*.corp.example`, any hostname
+    below `corp.example`) or suffixes (`.corp.example`, `corp.example` itself
+    and any hostname below it). Lookups walk one node per label.
+    """
+
+    def __init__(self):
+        self.__root: dict = {}
+
+    def add(self, entry: str):
+        entry = entry.lower().rstrip(".")
+        if entry.startswith("*."):
+            name, markers = entry[2:], (_WILDCARD,)
+        elif entry.startswith("."):
+            name, markers = entry[1:], (_EXACT, _WILDCARD)
+        else:
+            name, markers = entry, (_EXACT,)
+
+        node = self.__root
+        for label in reversed(name.split(".")):
+            node = node.setdefault(label, {})
+        for marker in markers:
+            node[marker] = True
+
+    def __contains__(self, hostname: str) -> bool:
+        labels = hostname.lower().rstrip(".").split(".")
+        node = self.__root
+        for i in range(len(labels) - 1, -1, -1):
+            if _WILDCARD in node:
+                return True
+            child = node.get(labels[i])
+            if child is None:
+                return False
+            node = child
+        return _EXACT in node
+
 
 def add_arguments(parser):
     """
@@ -13,7 +115,7 @@ def add_arguments(parser):
 
 
 def apply_filter(infra: Infrastructure, args):
-    """Filter hosts by a list of IPs or hostnames from a file."""
+    """Filter hosts by a list of IPs, networks or hostnames from a file."""
     if not args.hosts_file:
         return
 
@@ -22,18 +124,25 @@ def apply_filter(infra: Infrastructure, args):
         printer.error(f"Hosts file not found: {args.hosts_file}")
         return
 
-    allowed_entries = set()
+    networks = _NetworkTrie()
+    hostnames = _HostnameTrie()
+    entries = 0
     try:
         with hosts_file_path.open("r") as f:
             for line in f:
                 line = line.strip()
-                if line and not line.startswith("#"):
-                    allowed_entries.add(line)
+                if not line or line.startswith("#"):
+                    continue
+                entries += 1
+                try:
+                    networks.add(ip_network(line, strict=False))
+                except ValueError:
+                    hostnames.add(line)
     except Exception as e:
         printer.error(f"Error reading hosts file: {e}")
         return
 
-    if not allowed_entries:
+    if not entries:
         printer.warning(
             f"Hosts file {args.hosts_file} is empty or contains no valid entries."
         )
@@ -44,8 +153,8 @@ def apply_filter(infra: Infrastructure, args):
     infra.hosts = [
         host
         for host in infra.hosts
-        if any(addr in allowed_entries for addr in host.address)
-        or any(name in allowed_entries for name in host.hostnames)
+        if any(addr in networks or addr in hostnames for addr in host.address)
+        or any(name in hostnames for name in host.hostnames)
     ]
 
     printer.info(
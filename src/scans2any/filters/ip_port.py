@@ -1,12 +1,84 @@
 """Filter hosts by IP address allow/blocklists and port allow/blocklists."""
 
-from ipaddress import ip_address, summarize_address_range
+from bisect import bisect_right
+from ipaddress import ip_address, ip_network
 
 from scans2any.internal import Infrastructure, printer
 
 PRIORITY = 1
 
 
+class _AddressRanges:
+    """
+    Set of IP address ranges, stored as sorted and merged intervals of integer
+    addresses (separately for IPv4 and IPv6).
+
+    Lookups bisect the intervals, so their cost does not depend on the size of
+    the ranges.
+
+    Parameters
+    ----------
+    ranges : list[str]
+        Ranges as `start_ip-end_ip`, CIDR network (`10.0.0.0/8`) or single
+        address
+
+    Raises
+    ------
+    ValueError
+        A range is malformed, empty or mixes IPv4 and IPv6.
+    """
+
+    def __init__(self, ranges: list[str]):
+        intervals: dict[int, list[tuple[int, int]]] = {4: [], 6: []}
+        for address_range in ranges:
+            try:
+                version, start, end = self.__parse_range(address_range)
+            except ValueError as e:
+                raise ValueError(f"{address_range} ({e})") from e
+            intervals[version].append((start, end))
+
+        # version -> (starts, ends) of the merged intervals
+        self.__intervals: dict[int, tuple[list[int], list[int]]] = {}
+        for version, spans in intervals.items():
+            starts: list[int] = []
+            ends: list[int] = []
+            for start, end in sorted(spans):
+                if ends and start <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self.__intervals[version] = (starts, ends)
+
+    @staticmethod
+    def __parse_range(address_range: str) -> tuple[int, int, int]:
+        if "/" in address_range:
+            network = ip_network(address_range.strip(), strict=False)
+            return (
+                network.version,
+                int(network.network_address),
+                int(network.broadcast_address),
+            )
+
+        start_ip, _, end_ip = address_range.partition("-")
+        start = ip_address(start_ip.strip())
+        end = ip_address(end_ip.strip()) if end_ip else start
+        if start.version != end.version:
+            raise ValueError("mixed IP versions")
+        if start > end:
+            raise ValueError("start after end")
+        return start.version, int(start), int(end)
+
+    def __contains__(self, address: str) -> bool:
+        try:
+            ip = ip_address(address)
+        except ValueError:
+            return False
+        starts, ends = self.__intervals[ip.version]
+        i = bisect_right(starts, int(ip)) - 1
+        return i >= 0 and int(ip) <= ends[i]
+
+
 def add_arguments(parser):
     """
     Add arguments to the parser for the ip and port filter.
@@ -14,13 +86,13 @@ def add_arguments(parser):
     parser.add_argument(
         "--ip-allowlist",
         nargs="+",
-        help="IP ranges to allow (format: --ip-allowlist start_ip-end_ip start_ip-end_ip ...)",
+        help="IP ranges to allow (format: --ip-allowlist start_ip-end_ip network/prefix ...)",
         default=[],
     )
     parser.add_argument(
         "--ip-blocklist",
         nargs="+",
-        help="IP ranges to block (format: --ip-blocklist start_ip-end_ip start_ip-end_ip ...)",
+        help="IP ranges to block (format: --ip-blocklist start_ip-end_ip network/prefix ...)",
         default=[],
     )
     parser.add_argument(
@@ -42,42 +114,18 @@ def apply_filter(infra: Infrastructure, args):
 
     # Process Allowlisted and Blocklisted IPs
     if args.ip_allowlist:
-        allowed_ips = set()
-        for address_range in args.ip_allowlist:
-            try:
-                start_ip, end_ip = address_range.split("-")
-                networks = summarize_address_range(
-                    ip_address(start_ip), ip_address(end_ip)
-                )
-                for network in networks:
-                    for ip in network:
-                        allowed_ips.add(str(ip))
-            except ValueError:
-                printer.error(
-                    f"Invalid IP range: {address_range}. Please use the format start_ip-end_ip."
-                )
-                return
+        allowed_ips = __parse_address_ranges(args.ip_allowlist)
+        if allowed_ips is None:
+            return
 
         infra.hosts = [
             h for h in infra.hosts if any(ip in allowed_ips for ip in h.address)
         ]
 
     if args.ip_blocklist:
-        blocked_ips = set()
-        for address_range in args.ip_blocklist:
-            try:
-                start_ip, end_ip = address_range.split("-")
-                networks = summarize_address_range(
-                    ip_address(start_ip), ip_address(end_ip)
-                )
-                for network in networks:
-                    for ip in network:
-                        blocked_ips.add(str(ip))
-            except ValueError:
-                printer.error(
-                    f"Invalid IP range: {address_range}. Please use the format start_ip-end_ip."
-                )
-                return
+        blocked_ips = __parse_address_ranges(args.ip_blocklist)
+        if blocked_ips is None:
+            return
 
         for host in infra.hosts:
             host.address = set(ip for ip in host.address if ip not in blocked_ips)
@@ -116,3 +164,15 @@ def apply_filter(infra: Infrastructure, args):
                 host.services = [
                     s for s in host.services if s.port not in blocked_ports
                 ]
+
+
+def __parse_address_ranges(ranges: list[str]) -> _AddressRanges | None:
+    """Parse IP ranges, report and return None if any of them is invalid."""
+
+    try:
+        return _AddressRanges(ranges)
+    except ValueError as e:
+        printer.error(
+            f"Invalid IP range: {e}. Please use the format start_ip-end_ip or CIDR."
+        )
+        return None
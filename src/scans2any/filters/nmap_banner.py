@@ -3,6 +3,7 @@
 import re
 from typing import Any
 
+from scans2any.helpers.utils import banner_cache
 from scans2any.internal import Service, SortedSet
 
 PRIORITY = 1
@@ -17,24 +18,53 @@ POSSIBLE_KEYS = [
 ]
 
 
-def apply_filter(service: Service, args: Any) -> None:
-    """Filters a service's nmap banners, to reduce information overload."""
+# Banners keys are filtered by these rules
+KEY_FILTER = ("product", "version", "devicetype")
+
+# Pattern explanation: We expect a string similar to "key1: content for key 1
+# key2: content for key2" where key1 and key2 are part of "POSSIBLE_KEYS".
+# We want to create a dictionary with they keys and contents assorted. This
+# leads to the following pattern with three match groups:
+# (key1): (content for key1)(<either more of the same or the end of the
+# string>)
+_NMAP_BANNER_FIELDS = re.compile(
+    r"({0}): (.*?)(?=\s(?:{0}):|\s*$)".format("|".join(POSSIBLE_KEYS))
+)
+
 
-    # Banners keys are filtered by these rules
-    key_filter = ("product", "version", "devicetype")
+def applies_to(service: Service) -> bool:
+    """Services without banners have nothing to normalize."""
+    return bool(service.banners)
 
-    filtered_banners: SortedSet = SortedSet()
-    to_remove: SortedSet = SortedSet()
+
+def apply_filter(service: Service, args: Any) -> bool:
+    """Filters a service's nmap banners, to reduce information overload."""
+
+    filtered_banners: list[str] = []
+    to_remove: list[str] = []
 
     for banner in service.banners:
-        if _is_nmap_banner(banner):
-            banner_keys = _make_dict_from_nmap_banner(banner)
-            filtered_banners.add(_build_banner(banner_keys, key_filter))
-            to_remove.add(banner)
+        normalized = _normalize_nmap_banner(banner)
+        if normalized is not None:
+            filtered_banners.append(normalized)
+            to_remove.append(banner)
+
+    # No nmap banners, nothing to update
+    if not to_remove:
+        return False
 
     # Update banners in a single operation
-    service.banners -= to_remove
-    service.banners |= filtered_banners
+    service.banners -= SortedSet(to_remove)
+    service.banners |= SortedSet(filtered_banners)
+    return True
+
+
+@banner_cache
+def _normalize_nmap_banner(banner: str) -> str | None:
+    """Normalized form of an nmap banner, None if `banner` is not one."""
+    if not _is_nmap_banner(banner):
+        return None
+    return _build_banner(_make_dict_from_nmap_banner(banner), KEY_FILTER)
 
 
 def _is_nmap_banner(banner: str) -> bool:
@@ -47,17 +77,7 @@ def _make_dict_from_nmap_banner(banner: str) -> dict[str, str]:
     Turn nmap banner into dictionary with available keys. For instance turn
     `product: webserver version: 1.9` into a dict {"product":"1.9"}
     """
-    # Pattern explanation: We expect a string similar to "key1: content for key
-    # 1 key2: content for key2" where key1 and key2 are part of
-    # "POSSIBLE_KEYS".
-    # We want to create a dictionary with they keys and
-    # contents assorted. This leads to the following pattern with three match
-    # groups:
-    # (key1): (content for key1)(<either more of the same or the end of the
-    # string>)
-    pattern = r"({0}): (.*?)(?=\s(?:{0}):|\s*$)".format("|".join(POSSIBLE_KEYS))
-
-    return {key: value for key, value in re.findall(pattern, banner)}
+    return {key: value for key, value in _NMAP_BANNER_FIELDS.findall(banner)}
 
 
 def _build_banner(available_keys: dict[str, str], key_filter: tuple[str, ...]) -> str:
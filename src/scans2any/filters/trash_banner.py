@@ -2,64 +2,96 @@
 
 import re
 
+from scans2any.helpers.utils import banner_cache
 from scans2any.internal import Service, SortedSet
 
 PRIORITY = 2
 
+TRASH_BANNERS = (
+    "",
+    "-",
+    "unknown",
+    "Not Found",
+    "Loading...",
+    "Bad Request",
+    "200 \u2014 Document follows",
+    "Error",
+    "ERROR!",
+    "Error response",
+    "server",
+    "Dienst",
+    "Service",
+    "Service Unavailable",
+    "Document Error: Not Found",
+    "Site Not Found",
+)
 
-def apply_filter(service: Service | None, args):
+_TRASH = frozenset(banner.lower() for banner in TRASH_BANNERS)
+# HTTP 4xx status lines, e.g. `404 Not Found`
+_CLIENT_ERROR = re.compile(r"^'?4\d\d\b", re.IGNORECASE)
+# Separates the banners when searching for substrings, see `_drop_substrings`
+_SEPARATOR = "\x00"
+
+
+def applies_to(service: Service) -> bool:
+    """Services without banners have nothing to filter."""
+    return bool(service.banners)
+
+
+def apply_filter(service: Service | None, args) -> bool:
     """Filters a service's banners for "trash"."""
 
     if not service or not service.banners:
-        return
-
-    trash_banners = (
-        "",
-        "-",
-        "unknown",
-        "Not Found",
-        "Loading...",
-        "Bad Request",
-        "200 \u2014 Document follows",
-        "Error",
-        "ERROR!",
-        "Error response",
-        "server",
-        "Dienst",
-        "Service",
-        "Service Unavailable",
-        "Document Error: Not Found",
-        "Site Not Found",
-    )
-
-    trash = {banner.lower() for banner in trash_banners}
-
-    # Precompile the regex pattern for performance
-    pattern = re.compile(r"^'?4\d\d\b", re.IGNORECASE)
-
-    filtered_banners = [
-        banner
-        for banner in service.banners
-        if banner.lower() not in trash and not pattern.match(banner)
-    ]
+        return False
+
+    filtered_banners = [banner for banner in service.banners if not _is_trash(banner)]
 
     # Remove duplicates and substrings in both directions
-    filtered_banners = list(filtered_banners)
-    to_remove = set()
+    filtered_banners = _drop_substrings(filtered_banners)
+
+    # Nothing filtered, keep the existing set
+    if len(filtered_banners) == len(service.banners) and isinstance(
+        service.banners, SortedSet
+    ):
+        return False
+
+    service.banners = SortedSet(filtered_banners)
+    return True
+
+
+@banner_cache
+def _is_trash(banner: str) -> bool:
+    return banner.lower() in _TRASH or _CLIENT_ERROR.match(banner) is not None
+
+
+def _drop_substrings(banners: list[str]) -> list[str]:
+    """
+    Drop banners contained (case-insensitively) in a longer banner, or in an
+    equally long one that comes first.
 
-    # Sort by length descending to efficiently find substrings
-    filtered_banners.sort(key=len, reverse=True)
+    Instead of comparing all pairs in Python, the lowercased banners are
+    joined longest first and every banner is searched for in the part before
+    it, so each banner costs a single `str.find`.
+    """
 
-    for i, banner in enumerate(filtered_banners):
-        banner_lower = banner.lower()
-        for other in filtered_banners[:i]:
-            if banner_lower in other.lower():
-                to_remove.add(banner)
-                break
+    if len(banners) < 2:
+        return banners
 
-    # Remove only the elements marked for removal
-    filtered_banners = SortedSet(
-        [banner for banner in filtered_banners if banner not in to_remove]
-    )
+    # Stable, equally long banners keep their order
+    banners = sorted(banners, key=len, reverse=True)
+    lowered = [banner.lower() for banner in banners]
+    joined = _SEPARATOR.join(lowered)
 
-    service.banners = filtered_banners
+    kept = [banners[0]]
+    end = len(lowered[0])
+    for i in range(1, len(banners)):
+        banner_lower = lowered[i]
+        if _SEPARATOR in banner_lower:
+            # Might match across the separators, compare one by one
+            contained = any(banner_lower in other for other in lowered[:i])
+        else:
+            contained = joined.find(banner_lower, 0, end) >= 0
+        if not contained:
+            kept.append(banners[i])
+        end += len(_SEPARATOR) + len(banner_lower)
+    return kept
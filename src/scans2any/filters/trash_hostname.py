@@ -5,7 +5,12 @@ from scans2any.internal import Host, SortedSet
 PRIORITY = 2
 
 
-def apply_filter(host: Host, args):
+def applies_to(host: Host) -> bool:
+    """A single hostname is never a subdomain of another one."""
+    return len(host.hostnames) > 1 or not isinstance(host.hostnames, SortedSet)
+
+
+def apply_filter(host: Host, args) -> bool:
     """Filters a service's hostnames for "trash"."""
     hostnames = list(host.hostnames)
 
@@ -26,4 +31,11 @@ def apply_filter(host: Host, args):
         if not is_subdomain:
             filtered_hostnames.append(hostname)
 
+    # Nothing filtered, keep the existing set
+    if len(filtered_hostnames) == len(host.hostnames) and isinstance(
+        host.hostnames, SortedSet
+    ):
+        return False
+
     host.hostnames = SortedSet(filtered_hostnames)
+    return True
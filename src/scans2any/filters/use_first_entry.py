@@ -5,14 +5,19 @@ from scans2any.internal import Host, SortedSet
 PRIORITY = 5
 
 
-def apply_filter(host: Host, args):
+def apply_filter(host: Host, args) -> bool:
     """Resolves multiple conflicting banners/service names by selecting the first."""
 
+    changed = False
     for service in host.services:
-        if len(service.banners) > 0:
+        if len(service.banners) > 1:
             service.banners = SortedSet([service.banners[0]])
-        if len(service.service_names) > 0:
+            changed = True
+        if len(service.service_names) > 1:
             service.service_names = SortedSet([service.service_names[0]])
+            changed = True
 
-    if host.os:
+    if len(host.os) > 1 or (host.os and not isinstance(host.os, SortedSet)):
         host.os = SortedSet([next(iter(host.os))])
+        changed = True
+    return changed
@@ -9,8 +9,11 @@ from argparse import OPTIONAL, SUPPRESS, ZERO_OR_MORE, ArgumentDefaultsHelpForma
 from os import environ
 
 from scans2any.filters import avail_filters
+from scans2any.helpers.file_processing import DEFAULT_SHARD_SIZE_MIB
+from scans2any.helpers.infrastructure import DEFAULT_PARALLEL_FILTER_HOSTS
 from scans2any.helpers.utils import validate_columns
 from scans2any.internal import printer
+from scans2any.internal.database import DEFAULT_PROFILE, PROFILES, connection_profile
 from scans2any.internal.protocols import HasAddArguments
 from scans2any.parsers import (
     avail_parsers,
@@ -213,6 +216,50 @@ def _add_basic_arguments(parser):
         default=None,
         help="Load/save from/into <project-name>.db database",
     )
+    parser.add_argument(
+        "--db-profile",
+        choices=PROFILES,
+        default=None,
+        help="SQLite tuning of the project database: fast (WAL) or durable "
+        f"(rollback journal, full sync) (default: $SCANS2ANY_DB_PROFILE or "
+        f"{DEFAULT_PROFILE})",
+    )
+    parser.add_argument(
+        "--db-cache-size",
+        type=int,
+        metavar="MiB",
+        default=None,
+        help="SQLite page cache size of the project database "
+        "(default: $SCANS2ANY_DB_CACHE_SIZE or per profile)",
+    )
+    parser.add_argument(
+        "--db-mmap-size",
+        type=int,
+        metavar="MiB",
+        default=None,
+        help="Memory map at most this much of the project database, 0 disables "
+        "(default: $SCANS2ANY_DB_MMAP_SIZE or per profile)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Do not read or write the on-disk parse cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="directory",
+        default=None,
+        help="Directory of the parse cache (default: ~/.cache/scans2any)",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        metavar="MiB",
+        default=DEFAULT_SHARD_SIZE_MIB,
+        help="Parse reports larger than this in parallel shards of this size, "
+        "0 disables sharding",
+    )
     parser.add_argument(
         "--merge-rules",
         metavar="filename",
@@ -312,6 +359,21 @@ def _add_filter_arguments(parser):
         nargs="+",
         type=lambda s: filter_list(s.split(",")),
     )
+    filter_group.add_argument(
+        "--parallel-filter-hosts",
+        type=int,
+        metavar="N",
+        default=DEFAULT_PARALLEL_FILTER_HOSTS,
+        help="Run host and service filters in parallel worker processes for "
+        "infrastructures with at least N hosts, 0 disables",
+    )
+    filter_group.add_argument(
+        "--filter-stats",
+        metavar="filename",
+        default=None,
+        help="Write time, memory and objects examined/modified/removed per "
+        "filter as JSON to a file ('-' for stderr), shown as a table with -v",
+    )
     filter_group.add_argument(
         "-C",
         "--col",
@@ -352,10 +414,19 @@ def _add_filter_arguments(parser):
             "Specs are optional."
         ),
     )
+    filter_group.add_argument(
+        "--column-filter-backend",
+        choices=("python", "pandas"),
+        default="python",
+        help="Evaluate -C/-Cv/-Ch specs row by row (python) or as vectorised "
+        "masks on a flat service table (pandas), which is faster for many "
+        "patterns on large infrastructures",
+    )
     filter_group.add_argument(
         "--hosts-file",
         metavar="filename",
-        help="Filter output by a list of IPs or hostnames from a file (one per line)",
+        help="Filter output by a list of IPs, CIDR networks or hostnames "
+        "(*.domain for subdomains) from a file (one per line)",
         default=None,
     )
     filter_group.add_argument(
@@ -419,6 +490,17 @@ def parse_args_with_custom_options(
         if "column_filter" not in final_args.enable_filters:
             final_args.enable_filters.append("column_filter")
 
+    # Validate the database connection profile, which may come from the
+    # environment, before anything is parsed or written
+    try:
+        connection_profile(
+            final_args.db_profile,
+            cache_size=final_args.db_cache_size,
+            mmap_size=final_args.db_mmap_size,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
     # Handle --hosts-file shorthand: enable hosts_file_filter
     if (
         final_args.hosts_file is not None
@@ -5,6 +5,7 @@ File processing utilities for scans2any.
 import concurrent.futures
 import os
 import sys
+import threading
 from pathlib import Path
 
 from rich.progress import (
@@ -17,11 +18,23 @@ from rich.progress import (
     TimeElapsedColumn,
 )
 
+from scans2any.helpers.parse_cache import ParseCache, default_cache_dir
 from scans2any.helpers.utils import is_special_fd
 from scans2any.internal import Infrastructure, printer
 from scans2any.internal.printer import _stderr_console, logger
+from scans2any.internal.wire import (
+    pack_hosts,
+    pack_infrastructure,
+    unpack_hosts,
+    unpack_infrastructure,
+)
 from scans2any.parsers import avail_parsers
 from scans2any.parsers import database_parser as _database_parser
+from scans2any.parsers.auto_parser import detect_parser
+
+# Reports larger than this are split into shards that are parsed in parallel by
+# parsers supporting it (see `nessus_parser.split_file`)
+DEFAULT_SHARD_SIZE_MIB = 64
 
 
 def _worker_init(log_level: int) -> None:
@@ -42,12 +55,133 @@ def _osc_progress_end() -> None:
     os.write(sys.stderr.fileno(), b"\033]9;4;0;\033\\")
 
 
-def process_file(parser_func, filename):
-    """Process a single file with the given parser function."""
+def process_file(parser_func, filename, cache=None, cache_key=None, *, pack=False):
+    """Process a single file with the given parser function.
+
+    If a parse cache and key are given, a successful result is stored in the
+    cache (from within the worker, to keep serialization off the main process).
+
+    With `pack`, the result is returned in the compact wire format (see
+    `scans2any.internal.wire`), which is cheaper to send between processes.
+    """
     try:
-        return parser_func(filename), None
+        result = parser_func(filename)
     except Exception as e:
         return None, e
+    if cache is not None and cache_key is not None and result:
+        cache.put(cache_key, result)
+    if pack:
+        return pack_infrastructure(result), None
+    return result, None
+
+
+def process_shard(parse_shard, filename, start: int, end: int, *, pack=False):
+    """Parse one shard of a file, optionally packed into the wire format."""
+    hosts = parse_shard(filename, start, end)
+    return pack_hosts(hosts) if pack else hosts
+
+
+def split_file(parser, filename, shard_size: int) -> list[tuple[int, int]]:
+    """
+    Byte ranges to parse `filename` in parallel, if `parser` supports sharding
+    and the file is larger than `shard_size`. Otherwise an empty list.
+    """
+    if shard_size <= 0 or not hasattr(parser, "split_file") or is_special_fd(filename):
+        return []
+    try:
+        if os.path.getsize(filename) <= shard_size:
+            return []
+        shards = parser.split_file(filename, shard_size)
+    except OSError:
+        return []
+    return shards if len(shards) > 1 else []
+
+
+def submit_shards(
+    executor: concurrent.futures.Executor,
+    parser,
+    filename,
+    shards: list[tuple[int, int]],
+    cache=None,
+    cache_key=None,
+    *,
+    pack=False,
+) -> concurrent.futures.Future:
+    """Parse the shards of one file in parallel.
+
+    Returns a future that resolves like `process_file` once all shards are
+    done, with the shard results merged by `parser.merge_shards`. If any
+    shard fails, the whole file is parsed again with `parser.parse`.
+    """
+    combined: concurrent.futures.Future = concurrent.futures.Future()
+    shard_futures = [
+        executor.submit(
+            process_shard, parser.parse_shard, filename, start, end, pack=pack
+        )
+        for start, end in shards
+    ]
+    pending = len(shard_futures)
+    lock = threading.Lock()
+
+    def parse_whole():
+        try:
+            fallback = executor.submit(
+                process_file, parser.parse, filename, cache, cache_key, pack=pack
+            )
+        except Exception as e:
+            combined.set_result((None, e))
+            return
+        fallback.add_done_callback(on_fallback_done)
+
+    def on_fallback_done(fallback):
+        try:
+            combined.set_result(fallback.result())
+        except Exception as e:
+            combined.set_result((None, e))
+
+    def on_shard_done(_):
+        nonlocal pending
+        with lock:
+            pending -= 1
+            if pending:
+                return
+        try:
+            results = [f.result() for f in shard_futures]
+            if pack:
+                results = [unpack_hosts(hosts) for hosts in results]
+            result = parser.merge_shards(results)
+        except Exception as e:
+            printer.warning(
+                f"Parsing {filename} in shards failed ({e}), parsing it as a whole"
+            )
+            parse_whole()
+            return
+        if cache is not None and cache_key is not None and result:
+            cache.put(cache_key, result)
+        combined.set_result((result, None))
+
+    for future in shard_futures:
+        future.add_done_callback(on_shard_done)
+    return combined
+
+
+def _completed_future(result) -> concurrent.futures.Future:
+    """Wrap an already available result into a resolved future."""
+    future: concurrent.futures.Future = concurrent.futures.Future()
+    future.set_result(result)
+    return future
+
+
+def create_parse_cache(args) -> ParseCache | None:
+    """Create the on-disk parse cache, unless disabled via `--no-cache`."""
+    if getattr(args, "no_cache", False):
+        return None
+
+    # Local import to break circular dependency
+    from scans2any.main import __version__
+
+    cache_dir = getattr(args, "cache_dir", None) or default_cache_dir()
+    return ParseCache(cache_dir, __version__)
 
 
 def create_progress_bar(*, quiet: bool = False, verbose: bool = False) -> Progress:
@@ -96,6 +230,9 @@ def collect_scan_results(
                 filename = futures_map[future]
                 try:
                     result, error = future.result()
+                    # Results of worker processes arrive in the wire format
+                    if result is not None and not isinstance(result, Infrastructure):
+                        result = unpack_infrastructure(result)
                 except Exception as e:
                     result, error = None, e
 
@@ -194,27 +331,30 @@ def parse_input_files(args, parser) -> list[Infrastructure]:
         parser.error("At least one input file argument or --project must be provided.")
 
     def find_all_files(
-        paths: list | str | Path, fileextensions: list[str]
+        paths: list | str | Path, fileextensions: list[str], *, detect: bool = False
     ) -> list[Path]:
+        def is_scan_file(path: Path) -> bool:
+            if not any(path.name.endswith(ext) for ext in fileextensions):
+                return False
+            if detect and detect_parser(path) is None:
+                printer.warning(f"Skipping {path}: unknown file format")
+                return False
+            return True
+
         def find_all_files_from_path(
             path: Path, fileextensions: list[str], *, toplevel: bool = True
         ) -> list[Path]:
             if path.is_file():
                 if toplevel:
                     return [path]
-                if any(path.name.endswith(ext) for ext in fileextensions):
+                if is_scan_file(path):
                     return [path]
                 return []
             elif is_special_fd(path):
                 return [path]
 
             if path.is_dir():
-                return [
-                    p
-                    for p in path.rglob("*")
-                    if p.is_file()
-                    and any(p.name.endswith(ext) for ext in fileextensions)
-                ]
+                return [p for p in path.rglob("*") if p.is_file() and is_scan_file(p)]
             return []
 
         def flatten_list(nested_list):
@@ -231,8 +371,7 @@ def parse_input_files(args, parser) -> list[Infrastructure]:
         return output
 
     all_infras = []
-    tasks = []  # List of (input_type, parser_func, files)
-    total_files_count = 0
+    tasks = []  # List of (input_type, parser_name, files)
 
     # Process each input type if provided
     for input_type, files in input_args.items():
@@ -269,15 +408,47 @@ def parse_input_files(args, parser) -> list[Infrastructure]:
 
         config = avail_parsers[parser_name].CONFIG
 
-        input_files = find_all_files(files, config["extensions"])
+        # Auto-detection classifies directory contents up front, so that
+        # unrelated files are never handed to a parser
+        input_files = find_all_files(
+            files, config["extensions"], detect=input_type == "auto"
+        )
         if input_files:
-            tasks.append((input_type, avail_parsers[parser_name].parse, input_files))
-            total_files_count += len(input_files)
+            tasks.append((input_type, parser_name, input_files))
+
+    # Look up all input files in the parse cache before starting any workers,
+    # so that only cache misses are parsed.
+    # Large files of parsers that support it are split into shards, which are
+    # scheduled like separate files.
+    cache = create_parse_cache(args)
+    shard_size = getattr(args, "shard_size", DEFAULT_SHARD_SIZE_MIB) * 1024**2
+    lookups = []  # List of (input_type, parser, [(file, key, cached, shards)])
+    total_files_count = 0
+    sharded = False
+    for input_type, parser_name, input_files in tasks:
+        parser_module = avail_parsers[parser_name]
+        file_lookups = []
+        for f in input_files:
+            key = cache.key(f, parser_name) if cache else None
+            cached = cache.get(key) if cache and key else None
+            shards = []
+            if cached is None:
+                shards = split_file(parser_module, f, shard_size)
+                total_files_count += len(shards) or 1
+                sharded = sharded or bool(shards)
+            file_lookups.append((f, key, cached, shards))
+        lookups.append((input_type, parser_module, file_lookups))
+
+    if cache and (cache.hits or cache.misses):
+        printer.status(
+            f"Parse cache: {cache.hits} hit(s), {cache.misses} miss(es) "
+            f"({cache.cache_dir})"
+        )
 
     # Adaptive strategy: Use ProcessPoolExecutor for large batches to bypass GIL,
     # but ThreadPoolExecutor for small batches to avoid process startup overhead.
     log_level = logger.level
-    use_processes = total_files_count >= 10
+    use_processes = total_files_count >= 10 or sharded
 
     if use_processes:
         executor = concurrent.futures.ProcessPoolExecutor(
@@ -287,12 +458,34 @@ def parse_input_files(args, parser) -> list[Infrastructure]:
         executor = concurrent.futures.ThreadPoolExecutor()
 
     with executor:
-        # 1. Submit all tasks
+        # 1. Submit all tasks (cache hits are already resolved)
         future_groups = []
-        for input_type, parser_func, input_files in tasks:
-            futures_map = {
-                executor.submit(process_file, parser_func, f): f for f in input_files
-            }
+        for input_type, parser_module, file_lookups in lookups:
+            futures_map = {}
+            for f, key, cached, shards in file_lookups:
+                if cached is not None:
+                    future = _completed_future((cached, None))
+                elif shards:
+                    printer.debug(f"Parsing {f} in {len(shards)} shards")
+                    future = submit_shards(
+                        executor,
+                        parser_module,
+                        f,
+                        shards,
+                        cache,
+                        key,
+                        pack=use_processes,
+                    )
+                else:
+                    future = executor.submit(
+                        process_file,
+                        parser_module.parse,
+                        f,
+                        cache,
+                        key,
+                        pack=use_processes,
+                    )
+                futures_map[future] = f
             future_groups.append((input_type, futures_map))
 
         # 2. Collect results (preserving output order)
@@ -305,4 +498,7 @@ def parse_input_files(args, parser) -> list[Infrastructure]:
                 verbose=getattr(args, "verbose", 0) > 0,
             )
 
+    if cache:
+        cache.evict()
+
     return all_infras
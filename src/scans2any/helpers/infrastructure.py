@@ -2,13 +2,88 @@
 Infrastructure processing utilities for scans2any.
 """
 
+import dataclasses
+import json
+import multiprocessing
 import os
-from concurrent.futures import ThreadPoolExecutor
-
+import pickle
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any
+
+from scans2any.helpers.utils import add_banner_cache_stats, banner_cache_stats
 from scans2any.internal import Host, Infrastructure, cluster_hosts, printer
+from scans2any.internal.wire import (
+    apply_host_diffs,
+    diff_packed_hosts,
+    pack_hosts,
+    unpack_hosts,
+)
 from scans2any.parsers import merge_file_parser
 from scans2any.writers import avail_writers
 
+# Run host/service filters in worker processes from this many hosts on
+DEFAULT_PARALLEL_FILTER_HOSTS = 20000
+
+
+@dataclass(slots=True)
+class FilterStats:
+    """
+    Cost and selectivity of a single filter in `apply_filters`.
+
+    Attributes
+    ----------
+    name : str
+        Filter name
+    level : str
+        `infra`, `host` or `service`
+    wall_time : float
+        Wall clock time spent in the filter in seconds, summed over the
+        worker processes for parallel filtering
+    cpu_time : float
+        CPU time spent in the filter in seconds, summed likewise
+    memory : int | None
+        Net number of bytes allocated by the filter, None unless tracemalloc
+        is tracing (e.g. `PYTHONTRACEMALLOC=1`)
+    examined : int
+        Objects the filter ran on: hosts for infrastructure and host filters,
+        services for service filters
+    skipped : int
+        Objects rejected by the filter's `applies_to` precondition
+    modified : int | None
+        Objects the filter reported as changed, None for infrastructure
+        filters, which do not report changes
+    removed : int
+        Hosts removed by infrastructure filters, services removed by host
+        filters
+    """
+
+    name: str
+    level: str
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    memory: int | None = None
+    examined: int = 0
+    skipped: int = 0
+    modified: int | None = 0
+    removed: int = 0
+
+    def add(self, other: "FilterStats"):
+        """Add the counters of `other` (e.g. from a worker process)."""
+        self.wall_time += other.wall_time
+        self.cpu_time += other.cpu_time
+        if other.memory is not None:
+            self.memory = (self.memory or 0) + other.memory
+        self.examined += other.examined
+        self.skipped += other.skipped
+        if self.modified is not None and other.modified is not None:
+            self.modified += other.modified
+        self.removed += other.removed
+
 
 def handle_merge_file(merge_file) -> tuple[Infrastructure | None, list[dict] | None]:
     """Parse merge file if provided."""
@@ -161,6 +236,233 @@ def check_for_remaining_conflicts(
     return True
 
 
+def compile_filter_pipeline(filters: list[tuple[str, Any, str]]) -> list[tuple]:
+    """Group filters into stages that each take a single pass.
+
+    Filters are ordered by priority. Consecutive host and service level filters
+    only ever touch the host (or service) they are given, so running them one
+    after another on each host is equivalent to running each filter on all
+    hosts in turn. They are fused into one stage, which traverses the hosts
+    (and their services) once. Infrastructure level filters see the whole
+    infrastructure and form a stage on their own.
+
+    Parameters
+    ----------
+    filters : list[tuple[str, Any, str]]
+        `(name, module, level)` entries as in `avail_filters`
+
+    Returns
+    -------
+    list[tuple]
+        `("infra", [(name, module)])` and
+        `("hosts", [(name, module, level), ...])` stages in execution order
+    """
+
+    stages: list[tuple] = []
+    for name, obj, level in sorted(filters, key=lambda item: item[1].PRIORITY):
+        if level == "infra":
+            stages.append(("infra", [(name, obj)]))
+        elif stages and stages[-1][0] == "hosts":
+            stages[-1][1].append((name, obj, level))
+        else:
+            stages.append(("hosts", [(name, obj, level)]))
+    return stages
+
+
+def _run_host_stage(
+    hosts: list[Host], stage: list[tuple[str, Any, str]], args
+) -> list[int]:
+    """
+    Run fused host/service level filters in one pass over `hosts`.
+
+    A filter is skipped for objects its optional `applies_to` precondition
+    rejects. Returns the indices of the hosts a filter reported as changed
+    (any return value but False), on the host or one of its services.
+    """
+
+    # Consecutive service filters run back to back on each service
+    steps: list[tuple[str, list]] = []
+    for _, obj, level in stage:
+        step = (obj.apply_filter, getattr(obj, "applies_to", None))
+        if level == "service" and steps and steps[-1][0] == "service":
+            steps[-1][1].append(step)
+        else:
+            steps.append((level, [step]))
+
+    changed = []
+    for i, host in enumerate(hosts):
+        host_changed = False
+        for level, funcs in steps:
+            if level == "host":
+                func, applies_to = funcs[0]
+                if (applies_to is None or applies_to(host)) and func(
+                    host, args
+                ) is not False:
+                    host_changed = True
+                continue
+            for service in host.services:
+                for func, applies_to in funcs:
+                    if (applies_to is None or applies_to(service)) and func(
+                        service, args
+                    ) is not False:
+                        host_changed = True
+        if host_changed:
+            changed.append(i)
+    return changed
+
+
+def _run_host_stage_with_stats(
+    hosts: list[Host],
+    stage: list[tuple[str, Any, str]],
+    args,
+    stats: dict[str, FilterStats],
+) -> list[int]:
+    """
+    Like `_run_host_stage`, but measures every filter call into `stats`.
+
+    Kept separate, so that filtering without statistics does not pay for the
+    clock calls.
+    """
+    clock, cpu_clock = time.perf_counter, time.process_time
+    tracing = tracemalloc.is_tracing()
+
+    def run(stat: FilterStats, func, applies_to, obj) -> bool:
+        if tracing:
+            memory = tracemalloc.get_traced_memory()[0]
+        start, cpu_start = clock(), cpu_clock()
+        if applies_to is not None and not applies_to(obj):
+            stat.skipped += 1
+            changed = False
+        else:
+            stat.examined += 1
+            changed = func(obj, args) is not False
+        stat.wall_time += clock() - start
+        stat.cpu_time += cpu_clock() - cpu_start
+        if tracing:
+            stat.memory += tracemalloc.get_traced_memory()[0] - memory
+        return changed
+
+    if tracing:
+        for name, *_ in stage:
+            stats[name].memory = stats[name].memory or 0
+
+    steps: list[tuple[str, list]] = []
+    for name, obj, level in stage:
+        step = (stats[name], obj.apply_filter, getattr(obj, "applies_to", None))
+        if level == "service" and steps and steps[-1][0] == "service":
+            steps[-1][1].append(step)
+        else:
+            steps.append((level, [step]))
+
+    changed = []
+    for i, host in enumerate(hosts):
+        host_changed = False
+        for level, funcs in steps:
+            if level == "host":
+                stat = funcs[0][0]
+                services = len(host.services)
+                if run(*funcs[0], host):
+                    host_changed = True
+                    stat.modified += 1
+                    stat.removed += services - len(host.services)
+                continue
+            for service in host.services:
+                for stat, func, applies_to in funcs:
+                    if run(stat, func, applies_to, service):
+                        host_changed = True
+                        stat.modified += 1
+        if host_changed:
+            changed.append(i)
+    return changed
+
+
+def _filter_mp_context():
+    """
+    Start filter workers fresh instead of forking this (large and possibly
+    threaded) process, whose heap every worker would otherwise inherit.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _filter_shard(
+    stage_names: list[str], packed_hosts: tuple, args, *, with_stats: bool = False
+) -> tuple[list, dict[str, FilterStats] | None, dict[str, tuple[int, int]]]:
+    """
+    Worker process side of `_run_host_stage_parallel`.
+
+    Runs the filters named in `stage_names` on the packed hosts and returns
+    only the changes (see `diff_packed_hosts`), the statistics of the filters
+    if `with_stats`, and the banner cache hits and misses of this shard.
+    """
+    from scans2any.filters import avail_filters
+
+    # Workers are reused for several shards
+    cache_before = banner_cache_stats()
+    by_name = {entry[0]: entry for entry in avail_filters}
+    hosts = unpack_hosts(packed_hosts)
+    stage = [by_name[name] for name in stage_names]
+    stats = None
+    if with_stats:
+        stats = {name: FilterStats(name, level) for name, _, level in stage}
+        changed = _run_host_stage_with_stats(hosts, stage, args, stats)
+    else:
+        changed = _run_host_stage(hosts, stage, args)
+
+    # Unchanged hosts need neither be packed again nor compared
+    changes = diff_packed_hosts(
+        tuple(packed_hosts[i] for i in changed),
+        pack_hosts([hosts[i] for i in changed]),
+    )
+    cache_stats = {
+        name: (hits - cache_before[name][0], misses - cache_before[name][1])
+        for name, (hits, misses) in banner_cache_stats().items()
+    }
+    return [(changed[i], host_diff) for i, host_diff in changes], stats, cache_stats
+
+
+def _run_host_stage_parallel(
+    executor: ProcessPoolExecutor,
+    hosts: list[Host],
+    stage: list[tuple[str, Any, str]],
+    args,
+    workers: int,
+    stats: dict[str, FilterStats] | None = None,
+):
+    """
+    Run fused host/service level filters on shards of `hosts` in `executor`.
+
+    Hosts are sent in the compact wire format and only the changed fields are
+    sent back and applied to the hosts in place. Nothing is applied unless all
+    shards succeeded. The statistics of the workers are added to `stats`,
+    their banner cache hits and misses to `banner_cache_stats`.
+    """
+    # A few shards per worker to even out the load
+    shard_size = -(-len(hosts) // (workers * 4))
+    stage_names = [name for name, _, _ in stage]
+    futures = [
+        (
+            start,
+            executor.submit(
+                _filter_shard,
+                stage_names,
+                pack_hosts(hosts[start : start + shard_size]),
+                args,
+                with_stats=stats is not None,
+            ),
+        )
+        for start in range(0, len(hosts), shard_size)
+    ]
+    results = [(start, future.result()) for start, future in futures]
+    for start, (changes, shard_stats, cache_stats) in results:
+        apply_host_diffs(hosts[start : start + shard_size], changes)
+        add_banner_cache_stats(cache_stats)
+        if stats is not None and shard_stats is not None:
+            for name, stat in shard_stats.items():
+                stats[name].add(stat)
+
+
 def apply_filters(
     infra: Infrastructure,
     enabled_filters: list[str],
@@ -168,13 +470,34 @@ def apply_filters(
     *,
     quiet: bool = False,
     verbose: bool = False,
-):
-    """Apply filters to the infrastructure."""
+) -> list[FilterStats]:
+    """
+    Apply filters to the infrastructure.
+
+    In verbose mode, or if `args.filter_stats` names a file, the cost and
+    selectivity of every filter are measured. They are printed as a table
+    (verbose mode) and written as JSON to `args.filter_stats`.
+
+    Returns
+    -------
+    list[FilterStats]
+        Statistics in execution order, empty if they were not measured
+    """
     if not enabled_filters:
-        return
+        return []
 
     from scans2any.filters import avail_filters
 
+    # Host/service filters run in worker processes for large infrastructures
+    parallel_hosts = getattr(args, "parallel_filter_hosts", 0)
+    workers = os.cpu_count() or 1
+    executor = None
+
+    stats_file = getattr(args, "filter_stats", None)
+    stats: dict[str, FilterStats] | None = None
+    if verbose or stats_file:
+        stats = {}
+
     with printer.status_section("Applying filters", quiet=quiet, verbose=verbose):
         active_filters = [
             (name, obj, level)
@@ -182,21 +505,134 @@ def apply_filters(
             if name in enabled_filters
         ]
 
-        sorted_filters = sorted(active_filters, key=lambda item: item[1].PRIORITY)
-
-        for name, obj, level in sorted_filters:
-            printer.status(f"{name}: {obj.apply_filter.__doc__}")
-            printer.debug(f"Priority: {obj.PRIORITY}")
-
-            if level == "infra":
-                obj.apply_filter(infra, args)
-            elif level == "host":
-                for host in infra.hosts:
-                    obj.apply_filter(host, args)
-            elif level == "service":
-                for host in infra.hosts:
-                    for service in host.services:
-                        obj.apply_filter(service, args)
+        try:
+            for kind, stage in compile_filter_pipeline(active_filters):
+                for name, obj, *_ in stage:
+                    printer.status(f"{name}: {obj.apply_filter.__doc__}")
+                    printer.debug(f"Priority: {obj.PRIORITY}")
+
+                if kind == "infra":
+                    name, obj = stage[0]
+                    if stats is None:
+                        obj.apply_filter(infra, args)
+                    else:
+                        stats[name] = __run_infra_filter_with_stats(
+                            name, obj, infra, args
+                        )
+                    continue
+
+                stage_stats = None
+                if stats is not None:
+                    stage_stats = {
+                        name: FilterStats(name, level) for name, _, level in stage
+                    }
+                    stats.update(stage_stats)
+
+                if (
+                    parallel_hosts
+                    and workers > 1
+                    and len(infra.hosts) >= parallel_hosts
+                ):
+                    try:
+                        if executor is None:
+                            executor = ProcessPoolExecutor(
+                                max_workers=workers, mp_context=_filter_mp_context()
+                            )
+                        _run_host_stage_parallel(
+                            executor, infra.hosts, stage, args, workers, stage_stats
+                        )
+                        continue
+                    except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+                        # Only failures of the worker processes, errors raised
+                        # by the filters themselves are propagated
+                        printer.warning(
+                            f"Parallel filtering failed, running serially: {e}"
+                        )
+                        parallel_hosts = 0
+                        # Nothing was applied, drop partial statistics
+                        if stage_stats is not None:
+                            for stat in stage_stats.values():
+                                stat.__init__(stat.name, stat.level)
+                if stage_stats is None:
+                    _run_host_stage(infra.hosts, stage, args)
+                else:
+                    _run_host_stage_with_stats(infra.hosts, stage, args, stage_stats)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        for name, (hits, misses) in banner_cache_stats().items():
+            if hits or misses:
+                printer.status(f"Banner cache {name}: {hits} hit(s), {misses} miss(es)")
+
+        if stats:
+            printer.status(
+                f"Filter statistics:\n{format_filter_stats(list(stats.values()))}"
+            )
+
+    if stats is None:
+        return []
+    if stats_file:
+        write_filter_stats(stats.values(), stats_file)
+    return list(stats.values())
+
+
+def __run_infra_filter_with_stats(name: str, obj, infra: Infrastructure, args):
+    tracing = tracemalloc.is_tracing()
+    hosts = len(infra.hosts)
+    if tracing:
+        memory = tracemalloc.get_traced_memory()[0]
+    start, cpu_start = time.perf_counter(), time.process_time()
+    obj.apply_filter(infra, args)
+    return FilterStats(
+        name,
+        "infra",
+        wall_time=time.perf_counter() - start,
+        cpu_time=time.process_time() - cpu_start,
+        memory=tracemalloc.get_traced_memory()[0] - memory if tracing else None,
+        examined=hosts,
+        modified=None,
+        removed=hosts - len(infra.hosts),
+    )
+
+
+def format_filter_stats(stats) -> str:
+    """Filter statistics as a plain text table (see `FilterStats`)."""
+
+    def optional(value, fmt: str = "d") -> str:
+        return "-" if value is None else format(value, fmt)
+
+    # One line per filter, narrow enough for 80 column terminals
+    width = max([len(stat.name) for stat in stats] + [6])
+    lines = [
+        f"{'Filter':<{width}}  {'Wall ms':>7}  {'CPU ms':>7}  {'KiB':>6}"
+        " Examined Skipped Modified Removed"
+    ]
+    lines.extend(
+        f"{stat.name:<{width}}  {stat.wall_time * 1000:>7.1f}"
+        f"  {stat.cpu_time * 1000:>7.1f}"
+        f"  {optional(stat.memory and stat.memory / 1024, '.1f'):>6}"
+        f" {stat.examined:>8} {stat.skipped:>7}"
+        f" {optional(stat.modified):>8} {stat.removed:>7}"
+        for stat in stats
+    )
+    return "\n".join(lines)
+
+
+def write_filter_stats(stats, filename: str):
+    """
+    Write filter statistics as a JSON list, `-` writes to stderr (stdout is
+    the writer output).
+    """
+    data = json.dumps([dataclasses.asdict(stat) for stat in stats], indent=2)
+    if filename == "-":
+        sys.stderr.write(data + "\n")
+        return
+    try:
+        with open(filename, "w") as fh:
+            fh.write(data + "\n")
+    except OSError as e:
+        printer.error(f"Could not write filter statistics to {filename}: {e}")
 
 
 def generate_output(
@@ -0,0 +1,154 @@
+"""
+Persistent on-disk cache for parser results.
+
+Parsed `Infrastructure` objects are stored per input file, keyed by the file's
+content hash, the parser that produced them and the scans2any version. Re-runs
+that only change output options (e.g. `-w`/`-c`) therefore skip re-parsing
+unchanged inputs. The cache is bounded in size; least recently used entries are
+evicted first.
+
+Entries are stored in the compact wire format of `scans2any.internal.wire`.
+"""
+
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from scans2any.helpers.utils import is_special_fd
+from scans2any.internal import Infrastructure, printer
+from scans2any.internal.wire import (
+    WIRE_VERSION,
+    pack_infrastructure,
+    unpack_infrastructure,
+)
+
+DEFAULT_MAX_SIZE = 1024**3  # 1 GiB
+
+_SUFFIX = ".pickle"
+
+
+def default_cache_dir() -> Path:
+    """
+    Cache directory used if none is given explicitly.
+
+    `$SCANS2ANY_CACHE_DIR`, else `$XDG_CACHE_HOME/scans2any`, else
+    `~/.cache/scans2any`.
+    """
+    if cache_dir := os.environ.get("SCANS2ANY_CACHE_DIR"):
+        return Path(cache_dir)
+    xdg_cache = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg_cache) / "scans2any"
+
+
+class ParseCache:
+    """
+    Content-hash keyed cache of parsed infrastructures.
+
+    Entries are pickled, so the cache directory must only be writable by the
+    user running scans2any.
+
+    Parameters
+    ----------
+    cache_dir : Path
+        Directory holding the cache entries, created on first write.
+    version : str
+        scans2any version, part of every key so that parser changes between
+        releases invalidate old entries.
+    max_size : int
+        Upper bound for the total size of all entries in bytes.
+    """
+
+    def __init__(
+        self, cache_dir: str | Path, version: str, max_size: int = DEFAULT_MAX_SIZE
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.version = version
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, filename: str | Path, parser_name: str) -> str | None:
+        """
+        Cache key for `filename` parsed by `parser_name`, or None if the file
+        cannot be cached (e.g. pipes and process substitutions, which can only
+        be read once).
+        """
+        if is_special_fd(filename):
+            return None
+        try:
+            with open(filename, "rb") as fh:
+                digest = hashlib.file_digest(fh, "blake2b").hexdigest()
+        except OSError:
+            return None
+        ident = f"{digest}:{parser_name}:{self.version}:{WIRE_VERSION}"
+        return hashlib.blake2b(ident.encode(), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> Infrastructure | None:
+        """Return cached infrastructure for `key` or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                infra = unpack_infrastructure(pickle.load(fh))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            # Unreadable or truncated entry, treat as miss and drop it
+            printer.debug(f"Dropping broken cache entry {path}: {e}")
+            with contextlib.suppress(OSError):
+                path.unlink()
+            self.misses += 1
+            return None
+
+        # Mark as recently used for LRU eviction
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        self.hits += 1
+        return infra
+
+    def put(self, key: str, infra: Infrastructure):
+        """Store `infra` under `key`. Failures are reported, never raised."""
+        tmp_name = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that concurrent runs never
+            # see partially written entries.
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(
+                    pack_infrastructure(infra), fh, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_name, self._path(key))
+        except Exception as e:
+            printer.debug(f"Could not write parse cache entry: {e}")
+            if tmp_name:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_name)
+
+    def evict(self):
+        """Delete least recently used entries until `max_size` is satisfied."""
+        entries = []
+        for path in self.cache_dir.glob(f"*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            with contextlib.suppress(OSError):
+                path.unlink()
+                total -= size
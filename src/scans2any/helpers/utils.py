@@ -290,3 +290,51 @@ def cleanup(string: str, chars_to_escape: str) -> str:
     regex = _get_cleanup_regex(chars_to_escape)
     # Replace any unescaped special character with its escaped version
     return regex.sub(r"\\\1", string)
+
+
+# Upper bound for the number of entries in each banner memo
+BANNER_CACHE_SIZE = 4096
+
+_banner_caches: dict[str, functools._lru_cache_wrapper] = {}
+# Hits and misses reported by worker processes, see `add_banner_cache_stats`
+_worker_banner_stats: dict[str, tuple[int, int]] = {}
+
+
+def banner_cache(func):
+    """
+    Decorator memoizing a function of a single banner (e.g. raw banner ->
+    rewritten banner, or whether a banner is dropped) in a bounded LRU cache.
+
+    The same banners repeat many times across a network (e.g. every domain
+    controller reports `product: Microsoft Windows RPC`), so filters that
+    rewrite banners one by one should share their results this way. Hits and
+    misses of all banner caches are available via `banner_cache_stats`.
+    """
+    cached = functools.lru_cache(maxsize=BANNER_CACHE_SIZE)(func)
+    _banner_caches[f"{func.__module__.rpartition('.')[2]}.{func.__name__}"] = cached
+    return cached
+
+
+def banner_cache_stats() -> dict[str, tuple[int, int]]:
+    """
+    Hits and misses of every banner cache (see `banner_cache`) in this process,
+    plus those added from worker processes via `add_banner_cache_stats`.
+
+    Returns
+    -------
+    dict[str, tuple[int, int]]
+        `module.function` -> `(hits, misses)`
+    """
+    stats = {}
+    for name, cached in _banner_caches.items():
+        info = cached.cache_info()
+        worker_hits, worker_misses = _worker_banner_stats.get(name, (0, 0))
+        stats[name] = (info.hits + worker_hits, info.misses + worker_misses)
+    return stats
+
+
+def add_banner_cache_stats(stats: dict[str, tuple[int, int]]):
+    """Add the banner cache hits and misses of a worker process."""
+    for name, (hits, misses) in stats.items():
+        total_hits, total_misses = _worker_banner_stats.get(name, (0, 0))
+        _worker_banner_stats[name] = (total_hits + hits, total_misses + misses)
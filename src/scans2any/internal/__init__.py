@@ -2,7 +2,7 @@
 
 # ruff: noqa: F401
 from .clustering import cluster_hosts
-from .host import Host
+from .host import Host, validate_host
 from .infrastructure import Infrastructure
-from .service import Service
+from .service import Service, validate_service
 from .sorted_set import SortedSet
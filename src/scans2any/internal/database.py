@@ -2,15 +2,237 @@
 Database management for scans2any using SQLite.
 
 Provides functionality to store and retrieve scan data efficiently.
-Each project gets its own set of tables (hosts_<project>, services_<project>).
+Each project gets its own database file. Multi-valued fields (addresses,
+hostnames, OS, service names, banners and custom fields) are stored one value
+per row in child tables of `hosts` and `services` (schema version 2, kept in
+`PRAGMA user_version`). Databases with the former comma-separated layout
+(version 1) are migrated in place when opened.
+
+Connections are tuned by a `ConnectionProfile`, see `PROFILES`.
 """
 
+import json
+import os
+import re
 import sqlite3
+from dataclasses import dataclass, replace
+from functools import cache, lru_cache
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
 from scans2any.internal import Host, Infrastructure, Service, SortedSet, printer
 
+SCHEMA_VERSION = 2
+
+# Maximum number of `?` parameters per statement (SQLite < 3.32 allows 999)
+_MAX_VARIABLES = 999
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS hosts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS host_addresses (
+        address TEXT PRIMARY KEY,
+        host_id INTEGER NOT NULL REFERENCES hosts(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS host_hostnames (
+        host_id INTEGER NOT NULL REFERENCES hosts(id) ON DELETE CASCADE,
+        hostname TEXT NOT NULL,
+        PRIMARY KEY (host_id, hostname)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS host_os (
+        host_id INTEGER NOT NULL REFERENCES hosts(id) ON DELETE CASCADE,
+        os TEXT NOT NULL,
+        PRIMARY KEY (host_id, os)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS services (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        host_id INTEGER NOT NULL REFERENCES hosts(id) ON DELETE CASCADE,
+        port INTEGER NOT NULL,
+        protocol TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (host_id, port, protocol)
+    );
+    CREATE TABLE IF NOT EXISTS service_names (
+        service_id INTEGER NOT NULL REFERENCES services(id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        PRIMARY KEY (service_id, name)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS service_banners (
+        service_id INTEGER NOT NULL REFERENCES services(id) ON DELETE CASCADE,
+        banner TEXT NOT NULL,
+        PRIMARY KEY (service_id, banner)
+    ) WITHOUT ROWID;
+    -- Custom fields of hosts (service_id NULL) and their services
+    CREATE TABLE IF NOT EXISTS custom_fields (
+        host_id INTEGER NOT NULL REFERENCES hosts(id) ON DELETE CASCADE,
+        service_id INTEGER REFERENCES services(id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        value
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_host_addresses_host ON host_addresses(host_id);
+    CREATE INDEX IF NOT EXISTS idx_host_hostnames_hostname ON host_hostnames(hostname);
+    CREATE INDEX IF NOT EXISTS idx_services_port ON services(port);
+    CREATE INDEX IF NOT EXISTS idx_service_names_name ON service_names(name);
+    CREATE INDEX IF NOT EXISTS idx_service_banners_banner ON service_banners(banner);
+    CREATE INDEX IF NOT EXISTS idx_custom_fields_host
+        ON custom_fields(host_id, service_id);
+    CREATE INDEX IF NOT EXISTS idx_custom_fields_service ON custom_fields(service_id);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectionProfile:
+    """
+    PRAGMAs applied to every connection.
+
+    Temporary tables are always kept in memory and foreign keys are always
+    enforced, so deleting a host or service deletes its child rows.
+    """
+
+    journal_mode: str
+    synchronous: str
+    # MiB
+    cache_size: int
+    mmap_size: int
+
+
+PROFILES = {
+    # Write-ahead log: readers and the writer do not block each other and
+    # commits are only synced at checkpoints. A commit can be lost on power
+    # failure, but the database stays consistent.
+    "fast": ConnectionProfile("WAL", "NORMAL", cache_size=64, mmap_size=256),
+    # SQLite defaults: rollback journal synced on every commit, no memory
+    # mapping. Also suitable for network file systems, which lack WAL support.
+    "durable": ConnectionProfile("DELETE", "FULL", cache_size=2, mmap_size=0),
+}
+DEFAULT_PROFILE = "fast"
+
+
+def connection_profile(
+    name: str | None = None,
+    *,
+    cache_size: int | None = None,
+    mmap_size: int | None = None,
+) -> ConnectionProfile:
+    """
+    Profile `name`, else `$SCANS2ANY_DB_PROFILE`, else `DEFAULT_PROFILE`.
+
+    The page cache and memory map sizes (MiB) of the profile are replaced by
+    `cache_size` and `mmap_size`, else by `$SCANS2ANY_DB_CACHE_SIZE` and
+    `$SCANS2ANY_DB_MMAP_SIZE`, if set.
+
+    Raises
+    ------
+    ValueError
+        Unknown profile name, or a size that is not a non-negative integer.
+    """
+    name = name or os.environ.get("SCANS2ANY_DB_PROFILE") or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown database profile '{name}', choose from {', '.join(PROFILES)}"
+        )
+    profile = PROFILES[name]
+    return replace(
+        profile,
+        cache_size=_size("cache", cache_size, profile.cache_size),
+        mmap_size=_size("mmap", mmap_size, profile.mmap_size),
+    )
+
+
+def _size(kind: str, value: int | None, default: int) -> int:
+    """`value`, else `$SCANS2ANY_DB_<KIND>_SIZE`, else `default` (MiB)."""
+    variable = f"SCANS2ANY_DB_{kind.upper()}_SIZE"
+    if value is None:
+        value = os.environ.get(variable, default)
+    try:
+        size = int(value)
+    except ValueError:
+        size = -1
+    if size < 0:
+        raise ValueError(
+            f"Invalid database {kind} size '{value}' (--db-{kind}-size or "
+            f"${variable}), expected a number of MiB >= 0"
+        )
+    return size
+
+
+def _os_name(os) -> str:
+    return os[0] if isinstance(os, tuple) else str(os)
+
+
+def _custom_field_rows(host_id: int, service_id: int | None, custom_fields: dict):
+    return (
+        (host_id, service_id, name, value)
+        for name, values in custom_fields.items()
+        for value in values
+    )
+
+
+def _custom_fields(rows_json: str) -> dict[str, set]:
+    """Custom fields from a JSON array of `[name, value]` pairs."""
+    custom_fields: dict[str, set] = {}
+    if rows_json == "[]":
+        return custom_fields
+    for name, value in json.loads(rows_json):
+        custom_fields.setdefault(name, set()).add(value)
+    return custom_fields
+
+
+@dataclass(frozen=True, slots=True)
+class ColumnFilter:
+    """
+    A `column_filter` spec evaluated by SQLite, see `read_infrastructure`.
+
+    `pattern` is a Python regex searched in the column string, `column` None
+    matches against all columns.
+    """
+
+    column: str | None
+    pattern: str
+    negated: bool = False
+
+
+# Column strings as built by `column_filter`, which joins multi-valued fields
+# in sorted order. `merge_os_sources` reduces the OS to the names read.
+def _joined(table: str, column: str, key: str, separator: str = "' '") -> str:
+    return (
+        f"coalesce((SELECT group_concat({column}, {separator}) FROM "
+        f"(SELECT {column} FROM {table} WHERE {key} ORDER BY {column})), '')"
+    )
+
+
+_HOST_COLUMNS = {
+    "IP-Addresses": _joined("host_addresses", "address", "host_id = h.id"),
+    "Hostnames": _joined("host_hostnames", "hostname", "host_id = h.id"),
+    "OS": _joined("host_os", "os", "host_id = h.id"),
+}
+_SERVICE_COLUMNS = {
+    "Ports": "s.port || '/' || s.protocol",
+    "Services": _joined("service_names", "name", "service_id = s.id"),
+    "Banners": _joined(
+        "service_banners", "banner", "service_id = s.id", "' ' || char(10)"
+    ),
+}
+
+# Patterns repeat for every row, compile each of them once
+_compile = lru_cache(maxsize=256)(re.compile)
+
+
+def _regexp(pattern: str, value: str | None) -> bool:
+    """SQLite `REGEXP` function, whether `pattern` is found in `value`."""
+    return value is not None and _compile(pattern).search(value) is not None
+
+
+def _passes(expr: str, spec: ColumnFilter) -> str:
+    return f"(({expr}) REGEXP ?) = {int(not spec.negated)}"
+
 
 class Database:
     """
@@ -19,7 +241,12 @@ class Database:
     Manages host and service data with project-based table separation.
     """
 
-    def __init__(self, db_path: str | Path = "scans2any.db", project: str = "default"):
+    def __init__(
+        self,
+        db_path: str | Path = "scans2any.db",
+        project: str = "default",
+        profile: ConnectionProfile | None = None,
+    ):
         """
         Initialize database connection.
 
@@ -29,17 +256,45 @@ class Database:
             Path to SQLite database file
         project : str
             Project name (used for display/reference only, each project has own .db file)
+        profile : ConnectionProfile, optional
+            Connection tuning, default see `connection_profile`
         """
         self.db_path = Path(db_path)
         self.project = project
+        self.profile = profile or connection_profile()
         self.conn: sqlite3.Connection | None = None
         self.hosts_table = "hosts"
         self.services_table = "services"
 
     def connect(self):
-        """Establish database connection."""
+        """
+        Establish database connection, apply the connection profile and
+        migrate older schema versions.
+        """
         self.conn = sqlite3.connect(str(self.db_path))
         self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("REGEXP", 2, _regexp, deterministic=True)
+        self.__configure()
+        self.__migrate()
+        # Outside of the migration, which renames and drops referenced tables
+        self.conn.execute("PRAGMA foreign_keys = ON")
+
+    def __configure(self):
+        """Apply `self.profile` to the connection."""
+        profile = self.profile
+        try:
+            # Persistent, and fails while another connection uses the WAL
+            self.conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+        except sqlite3.OperationalError as e:
+            printer.warning(
+                f"Could not set journal mode {profile.journal_mode} "
+                f"of {self.db_path}: {e}"
+            )
+        self.conn.execute(f"PRAGMA synchronous = {profile.synchronous}")
+        # Negative sizes are in KiB
+        self.conn.execute(f"PRAGMA cache_size = {-profile.cache_size * 1024}")
+        self.conn.execute(f"PRAGMA mmap_size = {profile.mmap_size * 1024 * 1024}")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
 
     def close(self):
         """Close database connection."""
@@ -60,69 +315,126 @@ class Database:
         """
         Create tables if they don't exist.
 
-        Creates hosts and services tables with appropriate indexes.
+        Creates the host and service tables, their child tables for
+        multi-valued fields and the indexes for common queries.
         """
         if not self.conn:
             raise RuntimeError("Database not connected")
 
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __migrate(self):
+        """
+        Migrate a database with comma-separated fields (schema version 1) to
+        child tables, in a single transaction.
+        """
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Database {self.db_path} has schema version {version}, "
+                f"this version of scans2any supports up to {SCHEMA_VERSION}"
+            )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(hosts)")}
+        if version == SCHEMA_VERSION or "address" not in columns:
+            return
+
+        printer.info(
+            f"Migrating database {self.db_path} to schema version {SCHEMA_VERSION}"
+        )
         cursor = self.conn.cursor()
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute("ALTER TABLE services RENAME TO services_v1")
+            cursor.execute("ALTER TABLE hosts RENAME TO hosts_v1")
+            cursor.execute("DROP TABLE IF EXISTS host_addresses")
+            for index in (
+                "idx_host_address",
+                "idx_host_hostname",
+                "idx_service_port",
+                "idx_service_name",
+                "idx_service_host",
+            ):
+                cursor.execute(f"DROP INDEX IF EXISTS {index}")
+            for statement in _SCHEMA.split(";"):
+                cursor.execute(statement)
 
-        # Create hosts table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS hosts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                address TEXT NOT NULL UNIQUE,
-                hostnames TEXT,
-                os TEXT,
-                custom_fields TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            cursor.execute(
+                "INSERT INTO hosts (id, created_at, updated_at) "
+                "SELECT id, created_at, updated_at FROM hosts_v1"
             )
-        """)
-
-        # Create services table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS services (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                host_id INTEGER NOT NULL,
-                port INTEGER NOT NULL,
-                protocol TEXT NOT NULL,
-                service_names TEXT,
-                banners TEXT,
-                custom_fields TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (host_id) REFERENCES hosts(id) ON DELETE CASCADE,
-                UNIQUE(host_id, port, protocol)
+            cursor.execute(
+                "INSERT INTO services "
+                "(id, host_id, port, protocol, created_at, updated_at) "
+                "SELECT id, host_id, port, protocol, created_at, updated_at "
+                "FROM services_v1"
             )
-        """)
-
-        # Create indexes for common queries
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_host_address
-            ON hosts(address)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_host_hostname
-            ON hosts(hostnames)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_service_port
-            ON services(port)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_service_name
-            ON services(service_names)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_service_host
-            ON services(host_id)
-        """)
 
+            def split(rows, column: str):
+                return [
+                    (row[0], value)
+                    for row in rows
+                    if row[column]
+                    for value in row[column].split(",")
+                ]
+
+            cursor.execute(
+                "SELECT id, address, hostnames, os, custom_fields FROM hosts_v1"
+            )
+            host_rows = cursor.fetchall()
+            cursor.executemany(
+                # Older versions could store an address with several hosts
+                "INSERT OR IGNORE INTO host_addresses (host_id, address) VALUES (?, ?)",
+                split(host_rows, "address"),
+            )
+            cursor.executemany(
+                "INSERT OR IGNORE INTO host_hostnames VALUES (?, ?)",
+                split(host_rows, "hostnames"),
+            )
+            cursor.executemany(
+                "INSERT OR IGNORE INTO host_os VALUES (?, ?)", split(host_rows, "os")
+            )
+            cursor.execute(
+                "SELECT id, host_id, service_names, banners, custom_fields "
+                "FROM services_v1"
+            )
+            service_rows = cursor.fetchall()
+            cursor.executemany(
+                "INSERT OR IGNORE INTO service_names VALUES (?, ?)",
+                split(service_rows, "service_names"),
+            )
+            cursor.executemany(
+                "INSERT OR IGNORE INTO service_banners VALUES (?, ?)",
+                split(service_rows, "banners"),
+            )
+            cursor.executemany(
+                "INSERT INTO custom_fields VALUES (?, ?, ?, ?)",
+                [
+                    *(
+                        field
+                        for row in host_rows
+                        if row["custom_fields"]
+                        for field in _custom_field_rows(
+                            row["id"], None, json.loads(row["custom_fields"])
+                        )
+                    ),
+                    *(
+                        field
+                        for row in service_rows
+                        if row["custom_fields"]
+                        for field in _custom_field_rows(
+                            row["host_id"], row["id"], json.loads(row["custom_fields"])
+                        )
+                    ),
+                ],
+            )
+
+            cursor.execute("DROP TABLE services_v1")
+            cursor.execute("DROP TABLE hosts_v1")
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except BaseException:
+            self.conn.rollback()
+            raise
         self.conn.commit()
 
     def clear_project_data(self):
@@ -134,15 +446,34 @@ class Database:
         if not self.conn:
             raise RuntimeError("Database not connected")
 
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM services")
-        cursor.execute("DELETE FROM hosts")
+        self.__delete_all(self.conn.cursor())
         self.conn.commit()
 
+    @staticmethod
+    def __delete_all(cursor: sqlite3.Cursor):
+        """Delete all rows, in the transaction of `cursor`."""
+        for table in (
+            "custom_fields",
+            "service_banners",
+            "service_names",
+            "services",
+            "host_os",
+            "host_hostnames",
+            "host_addresses",
+            "hosts",
+        ):
+            cursor.execute(f"DELETE FROM {table}")
+
     def write_infrastructure(self, infra: Infrastructure, *, clear: bool = False):
         """
         Write infrastructure data to database.
 
+        A host is merged into the stored host that has one of its addresses,
+        services are merged by host, port and protocol. The hostnames, OS,
+        service names, banners and custom fields of written hosts and
+        services replace the stored ones. All rows are written in bulk in a
+        single transaction.
+
         Parameters
         ----------
         infra : Infrastructure
@@ -155,145 +486,188 @@ class Database:
 
         self.create_tables()
 
-        if clear:
-            self.clear_project_data()
-
         cursor = self.conn.cursor()
+        # Take the write lock before the lookups and the ID allocation, so
+        # concurrent writers are serialized instead of allocating the same IDs
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            if clear:
+                self.__delete_all(cursor)
+            host_ids = self.__lookup_host_ids(
+                {address for host in infra.hosts for address in host.address}
+            )
+            service_ids = self.__lookup_service_ids(set(host_ids.values()))
+
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.hosts_table}")
+            first_host_id = next_host_id = cursor.fetchone()[0] + 1
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.services_table}")
+            first_service_id = next_service_id = cursor.fetchone()[0] + 1
+
+            # Later hosts and services with the same ID replace earlier ones
+            hosts: dict[int, Host] = {}
+            new_addresses: list[tuple[str, int]] = []
+            services: dict[int, tuple[int, Service]] = {}
+            for host in infra.hosts:
+                addresses = sorted(host.address)
+                # The first stored address determines the host to merge into
+                host_id = next((host_ids[a] for a in addresses if a in host_ids), None)
+                if host_id is None:
+                    host_id = next_host_id
+                    next_host_id += 1
+                for address in addresses:
+                    if address not in host_ids:
+                        host_ids[address] = host_id
+                        new_addresses.append((address, host_id))
+                hosts[host_id] = host
+
+                for service in host.services:
+                    key = (host_id, service.port, service.protocol)
+                    service_id = service_ids.get(key)
+                    if service_id is None:
+                        service_id = service_ids[key] = next_service_id
+                        next_service_id += 1
+                    services[service_id] = (host_id, service)
+
+            stored_hosts = [(i,) for i in hosts if i < first_host_id]
+            stored_services = [(i,) for i in services if i < first_service_id]
+            cursor.executemany(
+                f"INSERT INTO {self.hosts_table} (id) VALUES (?)",
+                ((i,) for i in hosts if i >= first_host_id),
+            )
+            cursor.executemany(
+                f"UPDATE {self.hosts_table} SET updated_at = CURRENT_TIMESTAMP "
+                "WHERE id = ?",
+                stored_hosts,
+            )
+            cursor.executemany(
+                "INSERT INTO host_addresses (address, host_id) VALUES (?, ?)",
+                new_addresses,
+            )
+            cursor.executemany(
+                f"INSERT INTO {self.services_table} (id, host_id, port, protocol) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (service_id, host_id, service.port, service.protocol)
+                    for service_id, (host_id, service) in services.items()
+                    if service_id >= first_service_id
+                ),
+            )
+            cursor.executemany(
+                f"UPDATE {self.services_table} SET updated_at = CURRENT_TIMESTAMP "
+                "WHERE id = ?",
+                stored_services,
+            )
 
-        for host in infra.hosts:
-            # Serialize sets/lists to comma-separated strings
-            addresses = ",".join(sorted(host.address)) if host.address else ""
-            hostnames = ",".join(sorted(host.hostnames)) if host.hostnames else ""
-            os_list = (
-                ",".join(
-                    sorted(
-                        [os[0] if isinstance(os, tuple) else str(os) for os in host.os]
-                    )
+            # Replace the multi-valued fields of stored hosts and services
+            for table in ("host_hostnames", "host_os"):
+                cursor.executemany(
+                    f"DELETE FROM {table} WHERE host_id = ?", stored_hosts
                 )
-                if host.os
-                else ""
+            cursor.executemany(
+                "DELETE FROM custom_fields WHERE host_id = ? AND service_id IS NULL",
+                stored_hosts,
             )
+            for table in ("service_names", "service_banners", "custom_fields"):
+                cursor.executemany(
+                    f"DELETE FROM {table} WHERE service_id = ?", stored_services
+                )
 
-            import json
-
-            custom_fields_json = (
-                json.dumps({k: list(v) for k, v in host.custom_fields.items()})
-                if host.custom_fields
-                else None
+            cursor.executemany(
+                "INSERT OR IGNORE INTO host_hostnames VALUES (?, ?)",
+                (
+                    (host_id, hostname)
+                    for host_id, host in hosts.items()
+                    for hostname in host.hostnames
+                ),
             )
-
-            # Use first address as primary identifier for the host
-            # Check if host already exists by checking any of its addresses
-            existing_host_id = None
-            if addresses:
-                # Check if any address in this host already exists in database
-                for addr in addresses.split(","):
-                    cursor.execute(
-                        f"SELECT id, address FROM {self.hosts_table} WHERE address LIKE ?",
-                        (f"%{addr}%",),
-                    )
-                    row = cursor.fetchone()
-                    if row:
-                        existing_host_id = row["id"]
-                        # Merge addresses: combine old and new
-                        old_addresses = (
-                            set(row["address"].split(",")) if row["address"] else set()
+            cursor.executemany(
+                "INSERT OR IGNORE INTO host_os VALUES (?, ?)",
+                (
+                    (host_id, _os_name(os))
+                    for host_id, host in hosts.items()
+                    for os in host.os
+                ),
+            )
+            cursor.executemany(
+                "INSERT INTO service_names VALUES (?, ?)",
+                (
+                    (service_id, name)
+                    for service_id, (_, service) in services.items()
+                    for name in service.service_names
+                ),
+            )
+            cursor.executemany(
+                "INSERT INTO service_banners VALUES (?, ?)",
+                (
+                    (service_id, banner)
+                    for service_id, (_, service) in services.items()
+                    for banner in service.banners
+                ),
+            )
+            cursor.executemany(
+                "INSERT INTO custom_fields VALUES (?, ?, ?, ?)",
+                [
+                    *(
+                        field
+                        for host_id, host in hosts.items()
+                        for field in _custom_field_rows(
+                            host_id, None, host.custom_fields
                         )
-                        new_addresses = set(addresses.split(","))
-                        addresses = ",".join(sorted(old_addresses | new_addresses))
-                        break
-
-            if existing_host_id:
-                # Update existing host
-                cursor.execute(
-                    f"""
-                    UPDATE {self.hosts_table}
-                    SET address = ?, hostnames = ?, os = ?, custom_fields = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """,
-                    (
-                        addresses,
-                        hostnames,
-                        os_list,
-                        custom_fields_json,
-                        existing_host_id,
                     ),
-                )
-                host_id = existing_host_id
-            else:
-                # Insert new host
-                cursor.execute(
-                    f"""
-                    INSERT INTO {self.hosts_table} (address, hostnames, os, custom_fields)
-                    VALUES (?, ?, ?, ?)
-                """,
-                    (addresses, hostnames, os_list, custom_fields_json),
-                )
-                host_id = cursor.lastrowid
-
-            # Handle services
-            for service in host.services:
-                service_names = (
-                    ",".join(sorted(service.service_names))
-                    if service.service_names
-                    else ""
-                )
-                banners = ",".join(sorted(service.banners)) if service.banners else ""
-                service_custom_fields_json = (
-                    json.dumps({k: list(v) for k, v in service.custom_fields.items()})
-                    if service.custom_fields
-                    else None
-                )
-
-                # Check if service exists for this host
-                cursor.execute(
-                    f"""
-                    SELECT id FROM {self.services_table}
-                    WHERE host_id = ? AND port = ? AND protocol = ?
-                """,
-                    (host_id, service.port, service.protocol),
-                )
+                    *(
+                        field
+                        for service_id, (host_id, service) in services.items()
+                        for field in _custom_field_rows(
+                            host_id, service_id, service.custom_fields
+                        )
+                    ),
+                ],
+            )
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
 
-                existing_service = cursor.fetchone()
-
-                if existing_service:
-                    # Update existing service
-                    cursor.execute(
-                        f"""
-                        UPDATE {self.services_table}
-                        SET service_names = ?, banners = ?, custom_fields = ?,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE id = ?
-                    """,
-                        (
-                            service_names,
-                            banners,
-                            service_custom_fields_json,
-                            existing_service["id"],
-                        ),
-                    )
-                else:
-                    # Insert new service
-                    cursor.execute(
-                        f"""
-                        INSERT INTO {self.services_table}
-                        (host_id, port, protocol, service_names, banners, custom_fields)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            host_id,
-                            service.port,
-                            service.protocol,
-                            service_names,
-                            banners,
-                            service_custom_fields_json,
-                        ),
-                    )
+    def __lookup_host_ids(self, addresses: set[str]) -> dict[str, int]:
+        """Map those of `addresses` that are stored to their host IDs."""
+        cursor = self.conn.cursor()
+        host_ids = {}
+        addresses = list(addresses)
+        for start in range(0, len(addresses), _MAX_VARIABLES):
+            chunk = addresses[start : start + _MAX_VARIABLES]
+            cursor.execute(
+                "SELECT address, host_id FROM host_addresses "
+                f"WHERE address IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            host_ids.update(cursor.fetchall())
+        return host_ids
 
-        self.conn.commit()
+    def __lookup_service_ids(self, host_ids: set[int]) -> dict[tuple, int]:
+        """Map `(host_id, port, protocol)` of the hosts' services to their IDs."""
+        cursor = self.conn.cursor()
+        service_ids = {}
+        host_ids = list(host_ids)
+        for start in range(0, len(host_ids), _MAX_VARIABLES):
+            chunk = host_ids[start : start + _MAX_VARIABLES]
+            cursor.execute(
+                f"SELECT host_id, port, protocol, id FROM {self.services_table} "
+                f"WHERE host_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            service_ids.update(
+                ((host_id, port, protocol), service_id)
+                for host_id, port, protocol, service_id in cursor.fetchall()
+            )
+        return service_ids
 
     def read_infrastructure(
-        self, identifier: str | None = None, *, filters: dict[str, str] | None = None
+        self,
+        identifier: str | None = None,
+        *,
+        filters: list[ColumnFilter] | None = None,
+        host_mode: bool = False,
+        value_mode: bool = False,
     ) -> Infrastructure:
         """
         Read infrastructure data from database.
@@ -302,10 +676,18 @@ class Database:
         ----------
         identifier : str, optional
             Custom identifier for the infrastructure object
-        filters : dict[str, str], optional
-            Column filters to apply at database level.
-            Keys can be: 'address', 'hostname', 'port', 'service', 'banner'
-            Values are SQL LIKE patterns (use % for wildcards)
+        filters : list[ColumnFilter], optional
+            Column filters to apply at database level, with the semantics of
+            `column_filter` (all filters must pass). Filters on the columns
+            IP-Addresses, Hostnames, OS, Ports, Services and Banners and
+            global filters are evaluated with the `REGEXP` function. Filters
+            on other columns are not applied, services with custom fields
+            are assumed to match global filters.
+        host_mode : bool
+            Keep all services of the selected hosts, like `column_filter -Ch`
+        value_mode : bool
+            Global filters must match the service itself, like `column_filter
+            -Cv`. The values are not trimmed.
 
         Returns
         -------
@@ -330,145 +712,173 @@ class Database:
             printer.warning(f"No data found for project '{self.project}'")
             return Infrastructure([], identifier or f"Database:{self.project}")
 
-        # Build WHERE clauses for filtering
-        host_where = []
-        host_params = []
-        service_where = []
-        service_params = []
-
-        if filters:
-            if "address" in filters:
-                host_where.append("address LIKE ?")
-                host_params.append(filters["address"])
-            if "hostname" in filters:
-                host_where.append("hostnames LIKE ?")
-                host_params.append(filters["hostname"])
-            if "port" in filters:
-                service_where.append("port = ?")
-                service_params.append(filters["port"])
-            if "service" in filters:
-                service_where.append("service_names LIKE ?")
-                service_params.append(filters["service"])
-            if "banner" in filters:
-                service_where.append("banners LIKE ?")
-                service_params.append(filters["banner"])
-
-        # If filtering by services, we need to join to get matching hosts
-        if service_where:
-            # Get host IDs that have matching services
-            service_filter_sql = " AND ".join(service_where)
-            cursor.execute(
-                f"""
-                SELECT DISTINCT host_id
-                FROM {self.services_table}
-                WHERE {service_filter_sql}
-            """,
-                service_params,
-            )
-            matching_host_ids = [row["host_id"] for row in cursor.fetchall()]
-
-            if not matching_host_ids:
-                return Infrastructure([], identifier or f"Database:{self.project}")
-
-            # Add host ID filter
-            placeholders = ",".join("?" * len(matching_host_ids))
-            host_where.append(f"id IN ({placeholders})")
-            host_params.extend(matching_host_ids)
+        # Build WHERE clauses for filtering, on the hosts `h` and on the
+        # services `s` of the selected hosts
+        host_where, host_params = self.__host_filter(filters or [], host_mode=host_mode)
+        service_where, service_params = self.__service_filter(
+            filters or [], host_mode=host_mode, value_mode=value_mode
+        )
 
-        # Build final host query
-        host_query = f"""
-            SELECT id, address, hostnames, os, custom_fields
-            FROM {self.hosts_table}
-        """
+        # The hosts are selected once, both scans read the selected ids
+        selected = None
         if host_where:
-            host_query += " WHERE " + " AND ".join(host_where)
-        host_query += " ORDER BY address"
-
-        # Fetch filtered hosts
-        cursor.execute(host_query, host_params)
-        host_rows = cursor.fetchall()
-        hosts = []
-
-        import json
-
-        for host_row in host_rows:
-            # Parse comma-separated values back to sets
-            addresses = (
-                set(host_row["address"].split(",")) if host_row["address"] else set()
-            )
-            hostnames = (
-                set(host_row["hostnames"].split(","))
-                if host_row["hostnames"]
-                else set()
-            )
-            os_list = (
-                set((os, "database") for os in host_row["os"].split(","))
-                if host_row["os"]
-                else set()
-            )
-            custom_fields = (
-                {k: set(v) for k, v in json.loads(host_row["custom_fields"]).items()}
-                if host_row["custom_fields"]
-                else {}
+            cursor.execute(
+                f"SELECT json_group_array(h.id) FROM {self.hosts_table} h "
+                f"WHERE {' AND '.join(host_where)}",
+                host_params,
             )
+            selected = cursor.fetchone()[0]
+        scan_where = list(service_where)
+        scan_params = list(service_params)
+        if selected is not None:
+            scan_where.insert(0, "s.host_id IN (SELECT value FROM json_each(?))")
+            scan_params.insert(0, selected)
+
+        # Two scans: the services of all selected hosts ordered by host, which
+        # are grouped by host while streaming, then the hosts themselves.
+        # Multi-valued fields are aggregated to JSON arrays by SQLite.
+        scan = self.conn.cursor()
+        scan.row_factory = None
+        # Many services share their names and banners, decode each array once
+        values = cache(json.loads)
+        scan.execute(
+            f"""
+            SELECT
+                s.host_id,
+                s.port,
+                s.protocol,
+                (SELECT json_group_array(name) FROM service_names
+                 WHERE service_id = s.id),
+                (SELECT json_group_array(banner) FROM service_banners
+                 WHERE service_id = s.id),
+                (SELECT json_group_array(json_array(name, value))
+                 FROM custom_fields WHERE service_id = s.id)
+            FROM {self.services_table} s
+            {f"JOIN {self.hosts_table} h ON h.id = s.host_id" if service_where else ""}
+            WHERE {" AND ".join(scan_where) or "1"}
+            ORDER BY s.host_id, s.port, s.protocol
+        """,
+            scan_params,
+        )
+        services = {
+            host_id: [
+                Service(
+                    port=port,
+                    protocol=protocol,
+                    service_names=SortedSet(values(service_names)),
+                    banners=SortedSet(values(banners)),
+                    custom_fields=_custom_fields(custom_fields),
+                )
+                for _, port, protocol, service_names, banners, custom_fields in rows
+            ]
+            for host_id, rows in groupby(scan, key=itemgetter(0))
+        }
 
-            host = Host(
-                address=addresses,
-                hostnames=hostnames,
-                os=os_list,
-                custom_fields=custom_fields,
+        # Hosts without matching services are dropped
+        if service_where:
+            selected = json.dumps(list(services))
+        scan.execute(
+            f"""
+            SELECT
+                h.id,
+                (SELECT json_group_array(address) FROM host_addresses
+                 WHERE host_id = h.id),
+                (SELECT json_group_array(hostname) FROM host_hostnames
+                 WHERE host_id = h.id),
+                (SELECT json_group_array(os) FROM host_os
+                 WHERE host_id = h.id),
+                (SELECT json_group_array(json_array(name, value)) FROM custom_fields
+                 WHERE host_id = h.id AND service_id IS NULL)
+            FROM {self.hosts_table} h
+            WHERE {"h.id IN (SELECT value FROM json_each(?))" if selected else "1"}
+        """,
+            [selected] if selected else [],
+        )
+        hosts = [
+            # Services are unique by port and protocol, no need to add them
+            # one by one
+            Host(
+                address=set(json.loads(addresses)),
+                hostnames=set(json.loads(hostnames)),
+                os={(os, "database") for os in json.loads(os_names)},
+                services=services.get(host_id, []),
+                custom_fields=_custom_fields(custom_fields),
             )
+            for host_id, addresses, hostnames, os_names, custom_fields in scan
+        ]
+        hosts.sort(key=lambda host: min(host.address, default=""))
 
-            # Fetch services for this host (apply service filters)
-            service_query = f"""
-                SELECT port, protocol, service_names, banners, custom_fields
-                FROM {self.services_table}
-                WHERE host_id = ?
-            """
-            query_params = [host_row["id"]]
-
-            if service_where:
-                service_query += " AND " + " AND ".join(service_where)
-                query_params.extend(service_params)
-
-            service_query += " ORDER BY port"
-
-            cursor.execute(service_query, query_params)
-            service_rows = cursor.fetchall()
+        return Infrastructure(hosts, identifier or f"Database:{self.project}")
 
-            for service_row in service_rows:
-                service_names = (
-                    SortedSet(service_row["service_names"].split(","))
-                    if service_row["service_names"]
-                    else SortedSet()
-                )
-                banners = (
-                    SortedSet(service_row["banners"].split(","))
-                    if service_row["banners"]
-                    else SortedSet()
+    def __host_filter(
+        self, filters: list[ColumnFilter], *, host_mode: bool
+    ) -> tuple[list[str], list[str]]:
+        """Conditions on the hosts `h` for `read_infrastructure`."""
+        where, params = [], []
+        for spec in filters:
+            if spec.column in _HOST_COLUMNS:
+                where.append(_passes(_HOST_COLUMNS[spec.column], spec))
+                params.append(spec.pattern)
+        if not host_mode:
+            # Hosts are selected by their matching services
+            return where, params
+
+        # At least one service must pass every service column filter, every
+        # global filter must pass in a host column or a service column
+        service_columns = [f for f in filters if f.column in _SERVICE_COLUMNS]
+        if service_columns:
+            where.append(
+                f"EXISTS (SELECT 1 FROM {self.services_table} s WHERE s.host_id = h.id"
+                + "".join(
+                    f" AND {_passes(_SERVICE_COLUMNS[f.column], f)}"
+                    for f in service_columns
                 )
-                service_custom_fields = (
-                    {
-                        k: set(v)
-                        for k, v in json.loads(service_row["custom_fields"]).items()
-                    }
-                    if service_row["custom_fields"]
-                    else {}
-                )
-
-                service = Service(
-                    port=service_row["port"],
-                    protocol=service_row["protocol"],
-                    service_names=service_names,
-                    banners=banners,
-                    custom_fields=service_custom_fields,
+                + ")"
+            )
+            params.extend(f.pattern for f in service_columns)
+        for spec in filters:
+            if spec.column is None:
+                host_found, host_found_params = self.__found(spec, _HOST_COLUMNS)
+                found, found_params = self.__found(spec, _SERVICE_COLUMNS)
+                where.append(
+                    f"({host_found} OR EXISTS (SELECT 1 FROM "
+                    f"{self.services_table} s WHERE s.host_id = h.id AND ({found})))"
                 )
-
-                host.add_service(service)
-
-            hosts.append(host)
-
-        return Infrastructure(hosts, identifier or f"Database:{self.project}")
+                params.extend(host_found_params + found_params)
+        return where, params
+
+    def __service_filter(
+        self, filters: list[ColumnFilter], *, host_mode: bool, value_mode: bool
+    ) -> tuple[list[str], list[str]]:
+        """Conditions on the services `s` of the hosts `h` for `read_infrastructure`."""
+        where, params = [], []
+        if host_mode:
+            return where, params
+        for spec in filters:
+            if spec.column in _SERVICE_COLUMNS:
+                where.append(_passes(_SERVICE_COLUMNS[spec.column], spec))
+                params.append(spec.pattern)
+            elif spec.column is None:
+                # In value mode the service must match on its own columns
+                found, found_params = self.__found(spec, _SERVICE_COLUMNS)
+                if not value_mode:
+                    host_found, host_found_params = self.__found(spec, _HOST_COLUMNS)
+                    found = f"{found} OR {host_found}"
+                    found_params += host_found_params
+                where.append(f"({found})")
+                params.extend(found_params)
+        return where, params
+
+    @staticmethod
+    def __found(spec: ColumnFilter, columns: dict[str, str]) -> tuple[str, list[str]]:
+        """Whether a global filter passes in one of `columns`."""
+        conditions = [_passes(expr, spec) for expr in columns.values()]
+        if columns is _SERVICE_COLUMNS:
+            # Custom columns are left to `column_filter`
+            conditions.append(
+                "EXISTS (SELECT 1 FROM custom_fields WHERE service_id = s.id)"
+            )
+        return " OR ".join(conditions), [spec.pattern] * len(columns)
 
     def get_statistics(self) -> dict[str, Any]:
         """
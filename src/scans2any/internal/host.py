@@ -1,12 +1,15 @@
 """Host data model representing a single network host and its services."""
 
 import textwrap
+from dataclasses import dataclass, field
 from typing import Any, Self  # Use class type inside of the same class
 
-from pydantic import BaseModel, ConfigDict, Field, model_validator
-
 from scans2any.internal import printer
-from scans2any.internal.service import OverridingNoConflictError, Service
+from scans2any.internal.service import (
+    OverridingNoConflictError,
+    Service,
+    validate_service,
+)
 from scans2any.internal.sorted_set import SortedSet
 
 
@@ -14,10 +17,14 @@ class HostIntegrationError(Exception):
     pass
 
 
-class Host(BaseModel):
+@dataclass(slots=True, repr=False)
+class Host:
     """
     Internal representation of an IPv4 host and corresponding information.
 
+    Attributes are not validated on construction, use `validate_host` for
+    hosts built from untrusted input.
+
     Attributes
     ----------
     address : set[str] | SortedSet[str]
@@ -33,24 +40,31 @@ class Host(BaseModel):
     -------
     add_service(self, port: str, protocol: str, service: str, banner: str)
         Adds a new service to the host
-    """
 
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    Services are looked up through a `(port, protocol)` index, which is
+    rebuilt lazily whenever `services` is replaced, changes its length or is
+    sorted by `sort`.
+    """
 
     address: set[str] | SortedSet[str]
     hostnames: set[str] | SortedSet[str]
     os: set[tuple[str, str]] | SortedSet[str]
-    services: list[Service] = Field(default_factory=list)
-    trusted_fields: set[str] = Field(default_factory=set)
-    custom_fields: dict[str, set] = Field(default_factory=dict)
-
-    @model_validator(mode="after")
-    def check_address_or_hostname(self) -> Self:
-        if not self.address and not self.hostnames:
-            raise ValueError(
-                "A host must always have at least one of address or hostname"
-            )
-        return self
+    services: list[Service] = field(default_factory=list)
+    trusted_fields: set[str] = field(default_factory=set)
+    custom_fields: dict[str, set] = field(default_factory=dict)
+
+    # (port, protocol) -> service and port -> first service with that port
+    _service_index: dict[tuple[int, str], Service] = field(
+        default_factory=dict, init=False, compare=False
+    )
+    _port_index: dict[int, Service] = field(
+        default_factory=dict, init=False, compare=False
+    )
+    # `services` list and its length at the time the index was last updated
+    _indexed_services: list[Service] | None = field(
+        default=None, init=False, compare=False
+    )
+    _indexed_len: int = field(default=0, init=False, compare=False)
 
     def add_service(self, new_service: Service, *, prioritize_self: bool = False):
         """
@@ -72,23 +86,20 @@ class Host(BaseModel):
             `self`.
         """
 
-        for service in self.services:
-            if (
-                service.port == new_service.port
-                and service.protocol == new_service.protocol
-            ):
-                try:
-                    if prioritize_self:
-                        service.merge_with_service(new_service)
-                    else:
-                        service.union_with_service(new_service)
-                    return
-                except OverridingNoConflictError as e:
-                    e.print_warning(self.identifier())
-                    return
+        service = self._get_service(new_service.port, new_service.protocol)
+        if service is not None:
+            try:
+                if prioritize_self:
+                    service.merge_with_service(new_service)
+                else:
+                    service.union_with_service(new_service)
+            except OverridingNoConflictError as e:
+                e.print_warning(self.identifier())
+            return
 
         # No service with the new services port yet
         self.services.append(new_service)
+        self._index_service(new_service)
 
     def add_services(
         self, new_services: list[Service], *, prioritize_self: bool = False
@@ -104,22 +115,8 @@ class Host(BaseModel):
             Passed to calls of `self.add_service()`
         """
 
-        service_map = {(s.port, s.protocol): s for s in self.services}
-
         for new_service in new_services:
-            key = (new_service.port, new_service.protocol)
-            if key in service_map:
-                service = service_map[key]
-                try:
-                    if prioritize_self:
-                        service.merge_with_service(new_service)
-                    else:
-                        service.union_with_service(new_service)
-                except OverridingNoConflictError as e:
-                    e.print_warning(self.identifier())
-            else:
-                self.services.append(new_service)
-                service_map[key] = new_service
+            self.add_service(new_service, prioritize_self=prioritize_self)
 
     def remove_service(self, port: int):
         """
@@ -143,11 +140,49 @@ class Host(BaseModel):
         Returns the service corresponding to the specified port or None.
         """
 
-        for service in self.services:
-            if service.port == port:
-                return service
+        self._check_service_index()
+        service = self._port_index.get(port)
+        if service is not None and service.port != port:
+            # Port changed in place, index is stale
+            self._indexed_services = None
+            return self.get_service_by_port(port)
+        return service
+
+    def _get_service(self, port: int, protocol: str) -> Service | None:
+        """
+        Returns the service with the specified port and protocol or None.
+        """
 
-        return None
+        self._check_service_index()
+        key = (port, protocol)
+        service = self._service_index.get(key)
+        if service is not None and (service.port, service.protocol) != key:
+            # Port or protocol changed in place, index is stale
+            self._indexed_services = None
+            return self._get_service(port, protocol)
+        return service
+
+    def _check_service_index(self):
+        """
+        Rebuild the service index if `services` changed behind its back.
+        """
+
+        services = self.services
+        if self._indexed_services is not services or self._indexed_len != len(services):
+            self._service_index = {}
+            self._port_index = {}
+            self._indexed_services = services
+            for service in services:
+                self._index_service(service)
+
+    def _index_service(self, service: Service):
+        """
+        Add a service appended to `services` to the index.
+        """
+
+        self._service_index.setdefault((service.port, service.protocol), service)
+        self._port_index.setdefault(service.port, service)
+        self._indexed_len = len(self.services)
 
     def merge_with_host(self, other: Self):
         """
@@ -299,6 +334,8 @@ class Host(BaseModel):
         self.hostnames = SortedSet(self.hostnames)
         self.os = SortedSet(self.os)
         self.services.sort(key=lambda s: s.port)
+        # Order changed, first service per port might be a different one
+        self._indexed_services = None
 
     def __repr__(self) -> str:
         """
@@ -317,3 +354,31 @@ class Host(BaseModel):
 
     def __str__(self) -> str:
         return self.__repr__()
+
+
+def validate_host(host: Host) -> Host:
+    """
+    Validate and normalize a host (and its services) built from untrusted
+    input (e.g. JSON or merge files).
+
+    Raises
+    ------
+    ValueError
+        The host has neither address nor hostname, or one of its services is
+        invalid.
+    """
+
+    if not host.address and not host.hostnames:
+        raise ValueError("A host must always have at least one of address or hostname")
+
+    for name in ("address", "hostnames", "os"):
+        values = getattr(host, name)
+        if not isinstance(values, set | SortedSet):
+            setattr(host, name, set(values))
+    host.trusted_fields = set(host.trusted_fields)
+    host.custom_fields = {
+        str(key): values if isinstance(values, set | SortedSet) else set(values)
+        for key, values in host.custom_fields.items()
+    }
+    host.services = [validate_service(service) for service in host.services]
+    return host
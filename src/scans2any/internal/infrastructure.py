@@ -1,14 +1,20 @@
 """Infrastructure data model representing a collection of scanned hosts."""
 
+import contextlib
+import functools
+import hashlib
 import ipaddress
 import os
+import pickle
 import tempfile
 import textwrap
+from bisect import bisect_right
+from itertools import chain
 from pathlib import Path
 from typing import Self
 
 import yaml
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 from scans2any.internal import Host, printer
 from scans2any.internal.clustering import cluster_hosts
@@ -124,7 +130,7 @@ def _validate_and_split_rules(
                     f"Malformed rule: empty 'os' list in {rule}. Skipping..."
                 )
                 continue
-            os_rules.append({"key": key, "os": os_set, "cnt": 0})
+            os_rules.append({"key": key, "os": os_set})
             continue
 
         # Service-name and/or banner rule  →  service_rules list
@@ -148,13 +154,148 @@ def _validate_and_split_rules(
                 "port": rule.get("port"),
                 "ports": frozenset(rule["ports"]) if "ports" in rule else None,
                 "banners": banners,
-                "cnt": 0,
             }
         )
 
     return os_rules, service_rules
 
 
+class _CompiledRules:
+    """Auto-merge rules compiled into hash indexes.
+
+    Instead of comparing every rule with every service, the positions of the
+    rules are indexed by what they match on:
+
+    - OS rules by ``frozenset(os)``
+    - service rules without port constraint by ``frozenset(service_names)``
+    - port constrained service rules by ``(frozenset(service_names), port)``
+      (rules with ``ports`` have one entry per port)
+    - pure banner rules by their sorted banner tuple
+
+    Rules are still applied in order: the ``next_*`` methods return the first
+    matching rule after a given position, so that a rule rewriting the names
+    is followed by the rules after it that match the *updated* names.
+    """
+
+    def __init__(self, ruleset: list[dict]):
+        self.os_rules, self.service_rules = _validate_and_split_rules(ruleset)
+
+        self.by_os: dict[frozenset, list[int]] = {}
+        for i, rule in enumerate(self.os_rules):
+            self.by_os.setdefault(rule["os"], []).append(i)
+
+        self.by_names: dict[frozenset, list[int]] = {}
+        self.by_names_port: dict[tuple[frozenset, int], list[int]] = {}
+        self.by_banners: dict[tuple[str, ...], list[int]] = {}
+        for i, rule in enumerate(self.service_rules):
+            names = rule["service_names"]
+            if names is None:
+                self.by_banners.setdefault(rule["banners"], []).append(i)
+                continue
+
+            port, ports = rule["port"], rule["ports"]
+            if port is None and ports is None:
+                self.by_names.setdefault(names, []).append(i)
+            elif port is None:
+                for p in ports:
+                    self.by_names_port.setdefault((names, p), []).append(i)
+            elif ports is None or port in ports:
+                self.by_names_port.setdefault((names, port), []).append(i)
+
+    def next_os_rule(self, os_set: frozenset, after: int) -> int | None:
+        """Position of the first OS rule after `after` matching `os_set`."""
+        return _next_position((self.by_os.get(os_set),), after)
+
+    def next_service_rule(
+        self,
+        names: frozenset,
+        banners: tuple[str, ...],
+        port: int,
+        after: int,
+    ) -> int | None:
+        """Position of the first service rule after `after` matching a service
+        with `names`, `banners` and `port`."""
+        return _next_position(
+            (
+                self.by_names.get(names),
+                self.by_names_port.get((names, port)),
+                self.by_banners.get(banners),
+            ),
+            after,
+        )
+
+
+def _next_position(buckets, after: int) -> int | None:
+    """Smallest rule position greater than `after` in any of the (sorted)
+    buckets."""
+    best = None
+    for bucket in buckets:
+        if bucket:
+            i = bisect_right(bucket, after)
+            if i < len(bucket) and (best is None or bucket[i] < best):
+                best = bucket[i]
+    return best
+
+
+_DEFAULT_RULES_PATH = Path(__file__).parent / "merge-rules.yaml"
+# Bump whenever `_CompiledRules` changes, invalidates stored compiled rules
+_COMPILED_RULES_VERSION = 1
+
+
+def _load_default_rules(cache_dir: str | Path | None = None) -> _CompiledRules:
+    """Compiled form of the bundled `merge-rules.yaml`.
+
+    The compiled rules are memoized per process. With a `cache_dir` they are
+    also stored pickled in it, keyed by the content hash of the YAML file,
+    which is therefore only parsed again after it changed.
+    """
+    stat = _DEFAULT_RULES_PATH.stat()
+    return _compile_default_rules(
+        stat.st_mtime_ns, stat.st_size, Path(cache_dir) if cache_dir else None
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _compile_default_rules(
+    mtime_ns: int, size: int, cache_dir: Path | None
+) -> _CompiledRules:
+    data = _DEFAULT_RULES_PATH.read_bytes()
+    if cache_dir is None:
+        config = yaml.load(data, Loader=SafeLoader) or {}
+        return _CompiledRules(config.get("auto-merge", []))
+
+    digest = hashlib.blake2b(data, digest_size=16)
+    digest.update(f":{_COMPILED_RULES_VERSION}".encode())
+    path = cache_dir / f"merge-rules-{digest.hexdigest()}.pickle"
+
+    try:
+        with open(path, "rb") as fh:
+            rules = pickle.load(fh)
+        if isinstance(rules, _CompiledRules):
+            return rules
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        printer.debug(f"Ignoring broken compiled merge rules {path}: {e}")
+
+    config = yaml.load(data, Loader=SafeLoader) or {}
+    rules = _CompiledRules(config.get("auto-merge", []))
+
+    tmp_name = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(rules, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+    except Exception as e:
+        printer.debug(f"Could not store compiled merge rules: {e}")
+        if tmp_name:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+    return rules
+
+
 class Infrastructure(BaseModel):
     """
     Internal representation of parsed infrastructure scans.
@@ -167,6 +308,12 @@ class Infrastructure(BaseModel):
         List of scanned and available hosts
     identifier : str
         Additional information, like `Nmap scan infrastructure`
+
+    Host lookups (`add_host`, `get_host_by_address`, `remove_host`) go through
+    an index of all addresses and hostnames. It is rebuilt lazily whenever
+    `hosts` is replaced or changes its length. Hits are verified, so tokens
+    removed from a host in place are harmless. Tokens added to a host in place
+    (outside of `Infrastructure`) are only found after the next rebuild.
     """
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -175,6 +322,12 @@ class Infrastructure(BaseModel):
     identifier: str = ""
     trusted_fields: dict[str, list[str]] = Field(default_factory=dict)
 
+    # token (address/hostname) -> [(position in hosts, host), ...]
+    _index: dict[str, list[tuple[int, Host]]] = PrivateAttr(default_factory=dict)
+    # `hosts` list and its length at the time the index was (last) updated
+    _indexed: list[Host] | None = PrivateAttr(default=None)
+    _indexed_len: int = PrivateAttr(default=0)
+
     def __init__(
         self,
         hosts: list[Host] | None = None,
@@ -222,26 +375,27 @@ class Infrastructure(BaseModel):
                 for field in self.trusted_fields["service"]:
                     service.trusted_fields.add(field)
 
-        # Fast O(n) linear scan for single-host additions (avoids cluster_hosts
-        # overhead of list copy + union-find + dict setup on every call).
-        for host in self.hosts:
-            if (host.address & new_host.address) or (
-                host.hostnames & new_host.hostnames
-            ):
-                try:
-                    if prioritize_self:
-                        host.merge_with_host(new_host)
-                        return
+        # Index lookup of all hosts sharing an address or hostname, in order
+        # of `self.hosts` (avoids cluster_hosts overhead of list copy +
+        # union-find + dict setup on every call).
+        for position, host in self._lookup(chain(new_host.address, new_host.hostnames)):
+            try:
+                if prioritize_self:
+                    host.merge_with_host(new_host)
+                else:
                     host.union_with_host(new_host)
-                    return
-                except HostIntegrationError as e:
-                    printer.warning(str(e))
-                    printer.warning(f"self: {host.address!s}, {host.hostnames!s}")
-                    printer.warning(
-                        f"other: {new_host.address!s}, {new_host.hostnames!s}"
-                    )
+            except HostIntegrationError as e:
+                printer.warning(str(e))
+                printer.warning(f"self: {host.address!s}, {host.hostnames!s}")
+                printer.warning(f"other: {new_host.address!s}, {new_host.hostnames!s}")
+                continue
+            # Make the tokens of `new_host` point to the host it went into
+            self._index_host(position, host)
+            return
 
         self.hosts.append(new_host)
+        self._index_host(len(self.hosts) - 1, new_host)
+        self._indexed_len = len(self.hosts)
 
     def add_hosts(self, new_hosts: list[Host], *, prioritize_self: bool = False):
         """
@@ -316,15 +470,22 @@ class Infrastructure(BaseModel):
             IP addresses
         """
 
-        new_hosts = []
-        for host in self.hosts:
-            if hostip in host.address:
-                if len(host.address) == 1:
-                    continue
-                else:
-                    host.address.remove(hostip)
-            new_hosts.append(host)
-        self.hosts = new_hosts
+        removed = []
+        for _, host in self._lookup([hostip]):
+            if hostip not in host.address:
+                continue
+            if len(host.address) == 1:
+                removed.append(host)
+            else:
+                host.address.remove(hostip)
+
+        if removed:
+            # New list, index is rebuilt on next lookup
+            self.hosts = [
+                host for host in self.hosts if not any(host is r for r in removed)
+            ]
+        else:
+            self._index.pop(hostip, None)
 
     def get_host_by_address(self, hostip: str):
         """
@@ -336,12 +497,59 @@ class Infrastructure(BaseModel):
             IP addresses
         """
 
-        for host in self.hosts:
+        for _, host in self._lookup([hostip]):
             if hostip in host.address:
                 return host
 
         return None
 
+    def _lookup(self, tokens) -> list[tuple[int, Host]]:
+        """
+        All (position, host) sharing at least one of `tokens`, ordered by
+        position in `self.hosts`.
+        """
+
+        if self._indexed is not self.hosts or self._indexed_len != len(self.hosts):
+            self._reindex()
+
+        tokens = list(tokens)
+        for _ in range(2):
+            matches: dict[int, Host] = {}
+            stale = False
+            for token in tokens:
+                for position, host in self._index.get(token, ()):
+                    if token in host.address or token in host.hostnames:
+                        matches[position] = host
+                    else:
+                        stale = True
+            if not stale:
+                break
+            # A host lost a token in place, rebuild and look up again
+            self._reindex()
+
+        return sorted(matches.items(), key=lambda match: match[0])
+
+    def _reindex(self):
+        """
+        Rebuild the token index from scratch.
+        """
+
+        self._index = {}
+        for position, host in enumerate(self.hosts):
+            self._index_host(position, host)
+        self._indexed = self.hosts
+        self._indexed_len = len(self.hosts)
+
+    def _index_host(self, position: int, host: Host):
+        """
+        Add all addresses and hostnames of `host` to the index.
+        """
+
+        for token in chain(host.address, host.hostnames):
+            entries = self._index.setdefault(token, [])
+            if not any(entry is host for _, entry in entries):
+                entries.append((position, host))
+
     def merge_with_infrastructure(self, other: Self, ruleset: list[dict] | None = None):
         """High-performance prioritized merge of another infrastructure into self.
 
@@ -395,6 +603,7 @@ class Infrastructure(BaseModel):
         *,
         quiet: bool = False,
         verbose: bool = False,
+        cache_dir: str | Path | None = None,
     ):
         """
         Automatic conflict solving using internal ruleset from config.
@@ -404,6 +613,9 @@ class Infrastructure(BaseModel):
 
         ruleset: list[dict]
             List of merging rules as in `merge-rules.yaml` to be applied.
+        cache_dir: str | Path | None
+            Directory to store the compiled internal ruleset in, see
+            `default_cache_dir`. If None, it is only kept in memory.
         quiet: bool
             If True, suppress status spinner output.
         verbose: bool
@@ -411,12 +623,13 @@ class Infrastructure(BaseModel):
         """
         with printer.status_section("Automatic Merging", quiet=quiet, verbose=verbose):
             if ruleset is None:
-                config_path = Path(__file__).parent / "merge-rules.yaml"
-                with open(config_path) as file:
-                    config = yaml.load(file, Loader=SafeLoader)
-                    ruleset = config.get("auto-merge", [])
-
-            os_rules, service_rules = _validate_and_split_rules(ruleset)
+                rules = _load_default_rules(cache_dir)
+            else:
+                rules = _CompiledRules(ruleset)
+            os_rules, service_rules = rules.os_rules, rules.service_rules
+            # Applications per rule, compiled rules are shared between calls
+            os_counts = [0] * len(os_rules)
+            service_counts = [0] * len(service_rules)
 
             cnt_os = 0
             cnt_service = 0
@@ -426,12 +639,14 @@ class Infrastructure(BaseModel):
                 # --- OS rules (only checked per host, not per service) ---
                 if os_rules and host.os:
                     host_os_set = frozenset(host.os)
-                    for rule in os_rules:
-                        if host_os_set == rule["os"]:
-                            host.os = SortedSet(rule["key"])
-                            host_os_set = frozenset(host.os)
-                            cnt_os += 1
-                            rule["cnt"] += 1
+                    i = rules.next_os_rule(host_os_set, -1)
+                    while i is not None:
+                        rule = os_rules[i]
+                        host.os = SortedSet(rule["key"])
+                        host_os_set = frozenset(host.os)
+                        cnt_os += 1
+                        os_counts[i] += 1
+                        i = rules.next_os_rule(host_os_set, i)
 
                 # --- Service / banner rules ---
                 if not service_rules:
@@ -441,23 +656,18 @@ class Infrastructure(BaseModel):
                     svc_names = frozenset(service.service_names)
                     svc_banners = tuple(sorted(service.banners))
 
-                    for rule in service_rules:
-                        # Service-name matching (port constraints apply to
-                        # both service-name and banner checks for this rule)
+                    i = rules.next_service_rule(
+                        svc_names, svc_banners, service.port, -1
+                    )
+                    while i is not None:
+                        rule = service_rules[i]
+                        # Matched by service names (and port), or a pure
+                        # banner rule matched by the banners
                         if rule["service_names"] is not None:
-                            port = rule["port"]
-                            if port is not None and service.port != port:
-                                continue
-                            ports = rule["ports"]
-                            if ports is not None and service.port not in ports:
-                                continue
-                            if svc_names != rule["service_names"]:
-                                continue
-
                             service.service_names = SortedSet(rule["key"])
                             svc_names = frozenset(service.service_names)
                             cnt_service += 1
-                            rule["cnt"] += 1
+                            service_counts[i] += 1
 
                         if (
                             rule["banners"] is not None
@@ -466,12 +676,17 @@ class Infrastructure(BaseModel):
                             service.banners = SortedSet(rule["key"])
                             svc_banners = tuple(sorted(service.banners))
                             cnt_banner += 1
-                            rule["cnt"] += 1
+                            service_counts[i] += 1
+
+                        i = rules.next_service_rule(
+                            svc_names, svc_banners, service.port, i
+                        )
 
-            all_rules = os_rules + service_rules
-            for rule in all_rules:
-                if rule["cnt"] > 0:
-                    printer.status(f"Applied rule '{rule['key']}' {rule['cnt']} times.")
+            for rule, cnt in zip(
+                os_rules + service_rules, os_counts + service_counts, strict=True
+            ):
+                if cnt > 0:
+                    printer.status(f"Applied rule '{rule['key']}' {cnt} times.")
 
             if cnt_os or cnt_service or cnt_banner:
                 printer.success(
@@ -608,6 +823,9 @@ class Infrastructure(BaseModel):
                 )
                 service.banners = clean_names(service.banners, chars_to_escape)
 
+        # Hostnames changed in place
+        self._indexed = None
+
     def __repr__(self) -> str:
         """
         Print infrastructure, for testing purposes.
@@ -1,9 +1,8 @@
 """Service data model representing a single network service on a host."""
 
+from dataclasses import dataclass, field
 from typing import Self
 
-from pydantic import BaseModel, ConfigDict, Field
-
 from scans2any.internal import printer
 from scans2any.internal.sorted_set import SortedSet
 
@@ -31,10 +30,14 @@ class OverridingNoConflictError(Exception):
             )
 
 
-class Service(BaseModel):
+@dataclass(slots=True, repr=False)
+class Service:
     """
     Internal representation of a service run by a host.
 
+    Attributes are not validated on construction, use `validate_service` for
+    services built from untrusted input.
+
     Attributes
     ----------
     port : int
@@ -48,14 +51,12 @@ class Service(BaseModel):
         Additional information about the service, e.g. `Apache httpd x.y`
     """
 
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-
     port: int
     protocol: str
     service_names: SortedSet[str]
     banners: SortedSet[str]
-    trusted_fields: set[str] = Field(default_factory=set)
-    custom_fields: dict[str, set] = Field(default_factory=dict)
+    trusted_fields: set[str] = field(default_factory=set)
+    custom_fields: dict[str, set] = field(default_factory=dict)
 
     def merge_with_service(self, other: Self):
         """
@@ -198,6 +199,42 @@ class Service(BaseModel):
         return self.__repr__()
 
 
+def validate_service(service: Service) -> Service:
+    """
+    Validate and normalize a service built from untrusted input (e.g. JSON or
+    merge files).
+
+    Ports given as strings are converted to int, collections to their
+    expected types.
+
+    Raises
+    ------
+    ValueError
+        Invalid port or protocol.
+    """
+
+    try:
+        port = int(service.port)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid port {service.port!r}") from None
+    if isinstance(service.port, bool) or not 0 <= port <= 65535:
+        raise ValueError(f"Invalid port {service.port!r}")
+    if not isinstance(service.protocol, str):
+        raise ValueError(f"Invalid protocol {service.protocol!r}")
+
+    service.port = port
+    if not isinstance(service.service_names, SortedSet):
+        service.service_names = SortedSet(service.service_names)
+    if not isinstance(service.banners, SortedSet):
+        service.banners = SortedSet(service.banners)
+    service.trusted_fields = set(service.trusted_fields)
+    service.custom_fields = {
+        str(key): values if isinstance(values, set | SortedSet) else set(values)
+        for key, values in service.custom_fields.items()
+    }
+    return service
+
+
 def get_port_by_service(service: str, protocol: str) -> int:
     """
     Get default port associated with the specified service + protocol.
@@ -0,0 +1,287 @@
+"""
+Compact wire format for parser results.
+
+Parser workers run in separate processes. Instead of pickling the
+`Infrastructure`/`Host`/`Service` objects with all their model internals, the
+results are flattened into plain tuples, which pickle much smaller and faster.
+Unpacking rebuilds the objects directly, the hosts are not merged again.
+
+Layout (all collections are tuples):
+
+    infrastructure = (WIRE_VERSION, identifier, trusted_fields, hosts)
+    trusted_fields = ((level, (field, ...)), ...)
+    host           = (sorted_mask, address, hostnames, os, trusted, custom, services)
+    service        = (port, protocol, service_names, banners, trusted, custom)
+    custom         = ((key, is_sorted, (value, ...)), ...)
+
+`sorted_mask` records which of address/hostnames/os are `SortedSet`s (bits
+0/1/2), so that the unpacked host is indistinguishable from the original.
+
+Changes made to packed hosts (e.g. by filters running in worker processes) can
+be sent back as a diff of the changed fields only:
+
+    host_diff    = (host_fields, services)
+    host_fields  = ((position, value), ...)   # positions in `host`
+    services     = None | (True, (service, ...)) | (False, service_diffs)
+    service_diffs = ((index, ((position, value), ...)), ...)
+"""
+
+import contextlib
+import gc
+
+from scans2any.internal.host import Host
+from scans2any.internal.infrastructure import Infrastructure
+from scans2any.internal.service import Service
+from scans2any.internal.sorted_set import SortedSet
+
+WIRE_VERSION = 1
+
+_ADDRESS_SORTED = 1
+_HOSTNAMES_SORTED = 2
+_OS_SORTED = 4
+
+# Positions in the packed host/service tuples
+_HOST_MASK, _HOST_TRUSTED, _HOST_SERVICES = 0, 4, 6
+_HOST_COLLECTIONS = {1: "address", 2: "hostnames", 3: "os"}
+_SERVICE_FIELDS = (
+    "port",
+    "protocol",
+    "service_names",
+    "banners",
+    "trusted_fields",
+    "custom_fields",
+)
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """
+    Pause the cyclic garbage collector while bulk creating objects.
+
+    Unpacking allocates many small containers, which would otherwise trigger
+    repeated (and pointless, as nothing becomes garbage) collections.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def pack_infrastructure(infra: Infrastructure) -> tuple:
+    """Flatten `infra` into the wire format."""
+    return (
+        WIRE_VERSION,
+        infra.identifier,
+        tuple((level, tuple(fields)) for level, fields in infra.trusted_fields.items()),
+        pack_hosts(infra.hosts),
+    )
+
+
+def unpack_infrastructure(data: tuple) -> Infrastructure:
+    """
+    Rebuild an `Infrastructure` from the wire format.
+
+    The hosts are taken over as they are (they have already been merged by
+    the worker).
+
+    Raises
+    ------
+    ValueError
+        `data` was written by a different wire format version.
+    """
+    version, identifier, trusted_fields, hosts = data
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported wire format version {version}")
+    infra = Infrastructure(
+        identifier=identifier,
+        trusted_fields={level: list(fields) for level, fields in trusted_fields},
+    )
+    # Already merged (and with propagated trusted fields) by the worker
+    infra.hosts = unpack_hosts(hosts)
+    return infra
+
+
+def pack_hosts(hosts: list[Host]) -> tuple:
+    """Flatten a list of hosts into the wire format."""
+    with _gc_paused():
+        return tuple(__pack_host(host) for host in hosts)
+
+
+def unpack_hosts(data: tuple) -> list[Host]:
+    """Rebuild hosts from the wire format, without validation."""
+    with _gc_paused():
+        return [__unpack_host(host) for host in data]
+
+
+def __pack_host(host: Host) -> tuple:
+    sorted_mask = (
+        (_ADDRESS_SORTED if isinstance(host.address, SortedSet) else 0)
+        | (_HOSTNAMES_SORTED if isinstance(host.hostnames, SortedSet) else 0)
+        | (_OS_SORTED if isinstance(host.os, SortedSet) else 0)
+    )
+    return (
+        sorted_mask,
+        tuple(host.address),
+        tuple(host.hostnames),
+        tuple(host.os),
+        tuple(host.trusted_fields),
+        __pack_custom_fields(host.custom_fields),
+        tuple(__pack_service(service) for service in host.services),
+    )
+
+
+def __unpack_host(data: tuple) -> Host:
+    sorted_mask, address, hostnames, os, trusted, custom, services = data
+    return Host(
+        address=SortedSet(address) if sorted_mask & _ADDRESS_SORTED else set(address),
+        hostnames=(
+            SortedSet(hostnames) if sorted_mask & _HOSTNAMES_SORTED else set(hostnames)
+        ),
+        os=SortedSet(os) if sorted_mask & _OS_SORTED else set(os),
+        services=[__unpack_service(service) for service in services],
+        trusted_fields=set(trusted),
+        custom_fields=__unpack_custom_fields(custom),
+    )
+
+
+def __pack_service(service: Service) -> tuple:
+    return (
+        service.port,
+        service.protocol,
+        tuple(service.service_names),
+        tuple(service.banners),
+        tuple(service.trusted_fields),
+        __pack_custom_fields(service.custom_fields),
+    )
+
+
+def __unpack_service(data: tuple) -> Service:
+    port, protocol, service_names, banners, trusted, custom = data
+    return Service(
+        port=port,
+        protocol=protocol,
+        service_names=SortedSet(service_names),
+        banners=SortedSet(banners),
+        trusted_fields=set(trusted),
+        custom_fields=__unpack_custom_fields(custom),
+    )
+
+
+def __pack_custom_fields(custom_fields: dict[str, set]) -> tuple:
+    return tuple(
+        (key, isinstance(values, SortedSet), tuple(values))
+        for key, values in custom_fields.items()
+    )
+
+
+def __unpack_custom_fields(data: tuple) -> dict[str, set]:
+    return {
+        key: SortedSet(values) if is_sorted else set(values)
+        for key, is_sorted, values in data
+    }
+
+
+def diff_packed_hosts(before: tuple, after: tuple) -> list[tuple[int, tuple]]:
+    """
+    Compare two packed versions of the same hosts.
+
+    Returns
+    -------
+    list[tuple[int, tuple]]
+        `(index, host_diff)` for every host that changed, see module docstring
+    """
+    with _gc_paused():
+        return __diff_packed_hosts(before, after)
+
+
+def __diff_packed_hosts(before: tuple, after: tuple) -> list[tuple[int, tuple]]:
+    changes = []
+    for i, (old, new) in enumerate(zip(before, after, strict=True)):
+        if old == new:
+            continue
+        # Collections whose content or type (`sorted_mask` bit) changed
+        type_changed = old[_HOST_MASK] ^ new[_HOST_MASK]
+        fields = tuple(
+            (pos, new[pos])
+            for pos in range(1, _HOST_SERVICES)
+            if old[pos] != new[pos]
+            or (pos in _HOST_COLLECTIONS and type_changed & (1 << (pos - 1)))
+        )
+        if any(pos in _HOST_COLLECTIONS for pos, _ in fields):
+            # Needed to restore the collection types
+            fields = ((_HOST_MASK, new[_HOST_MASK]), *fields)
+
+        services = None
+        old_services, new_services = old[_HOST_SERVICES], new[_HOST_SERVICES]
+        if len(old_services) != len(new_services):
+            services = (True, new_services)
+        elif old_services != new_services:
+            service_diffs = tuple(
+                (j, __diff_fields(a, b))
+                for j, (a, b) in enumerate(zip(old_services, new_services, strict=True))
+                if a != b
+            )
+            services = (False, service_diffs)
+        changes.append((i, (fields, services)))
+    return changes
+
+
+def __diff_fields(old: tuple, new: tuple) -> tuple:
+    return tuple((pos, value) for pos, value in enumerate(new) if value != old[pos])
+
+
+def apply_host_diffs(hosts: list[Host], changes: list[tuple[int, tuple]]):
+    """
+    Apply diffs from `diff_packed_hosts` to the (unpacked) hosts in place.
+
+    Changed services are updated field by field, services are only replaced
+    if the number of services changed.
+    """
+    with _gc_paused():
+        __apply_host_diffs(hosts, changes)
+
+
+def __apply_host_diffs(hosts: list[Host], changes: list[tuple[int, tuple]]):
+    for i, (fields, services) in changes:
+        host = hosts[i]
+        sorted_mask = 0
+        for pos, value in fields:
+            if pos == _HOST_MASK:
+                sorted_mask = value
+            elif pos in _HOST_COLLECTIONS:
+                is_sorted = sorted_mask & (1 << (pos - 1))
+                setattr(
+                    host,
+                    _HOST_COLLECTIONS[pos],
+                    SortedSet(value) if is_sorted else set(value),
+                )
+            elif pos == _HOST_TRUSTED:
+                host.trusted_fields = set(value)
+            else:
+                host.custom_fields = __unpack_custom_fields(value)
+
+        if services is None:
+            continue
+        replaced, data = services
+        if replaced:
+            host.services = [__unpack_service(service) for service in data]
+            continue
+        for j, service_fields in data:
+            service = host.services[j]
+            for pos, value in service_fields:
+                setattr(
+                    service, _SERVICE_FIELDS[pos], __unpack_service_field(pos, value)
+                )
+
+
+def __unpack_service_field(pos: int, value):
+    if _SERVICE_FIELDS[pos] in ("service_names", "banners"):
+        return SortedSet(value)
+    if _SERVICE_FIELDS[pos] == "trusted_fields":
+        return set(value)
+    if _SERVICE_FIELDS[pos] == "custom_fields":
+        return __unpack_custom_fields(value)
+    return value
@@ -24,6 +24,7 @@ from scans2any.helpers.infrastructure import (
     handle_merge_file,
     resolve_infrastructure_conflicts,
 )
+from scans2any.helpers.parse_cache import default_cache_dir
 from scans2any.internal import printer
 from scans2any.writers import avail_writers, json_writer
 
@@ -139,7 +140,7 @@ def main():
 
         # Only auto-save if we loaded from input files, not from database
         if has_input_files:
-            from scans2any.internal.database import Database
+            from scans2any.internal.database import Database, connection_profile
 
             verbose = hasattr(args, "verbose") and args.verbose > 0
             db_path = f"{project}.db"
@@ -152,7 +153,12 @@ def main():
                 printer.info(f"Services: {service_count}")
 
             try:
-                with Database(db_path, project) as db:
+                profile = connection_profile(
+                    args.db_profile,
+                    cache_size=args.db_cache_size,
+                    mmap_size=args.db_mmap_size,
+                )
+                with Database(db_path, project, profile) as db:
                     # Merge with existing data (clear=False to preserve and merge)
                     db.write_infrastructure(combined_infra, clear=False)
                     if verbose:
@@ -180,8 +186,13 @@ def main():
 
     # Apply automatic merging if not disabled
     if not args.no_auto_merge:
+        # The compiled internal ruleset is stored next to the parse cache
+        cache_dir = None if args.no_cache else args.cache_dir or default_cache_dir()
         combined_infra.auto_merge(
-            ruleset=custom_merge_ruleset, quiet=args.quiet, verbose=verbose
+            ruleset=custom_merge_ruleset,
+            quiet=args.quiet,
+            verbose=verbose,
+            cache_dir=cache_dir,
         )
         printer.debug(combined_infra)
 
@@ -1,7 +1,12 @@
 """Auto-detect the input file format and dispatch to the appropriate parser."""
 
+import contextlib
+import os
+import re
+import sqlite3
 from pathlib import Path
 
+from scans2any.helpers.utils import is_special_fd, is_valid_ip
 from scans2any.internal import Infrastructure, printer
 from scans2any.parsers import avail_parsers
 
@@ -9,6 +14,14 @@ CONFIG = {
     "extensions": [""],
 }
 
+# Number of bytes read from the start (and end) of a file for format detection
+SNIFF_SIZE = 8192
+
+_SQLITE_MAGIC = b"SQLite format 3\x00"
+_UTF8_BOM = b"\xef\xbb\xbf"
+# First key of a JSON object, e.g. `{ "192.168.56.10": {`
+_FIRST_JSON_KEY = re.compile(rb'^\{\s*"((?:[^"\\]|\\.)*)"\s*:')
+
 
 def add_arguments(parser):
     """
@@ -25,7 +38,152 @@ def add_arguments(parser):
     )
 
 
+def detect_parser(filename: str | Path) -> str | None:
+    """
+    Classify a scan file by the structural signature of its content.
+
+    Only the first and last `SNIFF_SIZE` bytes of the file are read (SQLite
+    databases are inspected via their schema), so detection is cheap even for
+    huge reports.
+
+    Parameters
+    ----------
+    filename : str | Path
+        Path to the scan file
+
+    Returns
+    -------
+    str | None
+        Name of the parser for the file (e.g. `nmap_parser`), None if the
+        format could not be identified or the file cannot be read twice (pipes,
+        process substitutions).
+    """
+
+    if is_special_fd(filename):
+        return None
+
+    try:
+        with open(filename, "rb") as fh:
+            head = fh.read(SNIFF_SIZE)
+            size = os.fstat(fh.fileno()).st_size
+            fh.seek(max(size - SNIFF_SIZE, len(head)))
+            tail = fh.read()
+    except OSError:
+        return None
+
+    if head.startswith(_SQLITE_MAGIC):
+        return __detect_sqlite(filename)
+
+    content = head.removeprefix(_UTF8_BOM).lstrip()
+    if content.startswith(b"<"):
+        return __detect_xml(content)
+    if content.startswith((b"{", b"[")):
+        return __detect_json(content, tail)
+    return __detect_text(content)
+
+
+def __detect_xml(head: bytes) -> str | None:
+    if b"<NessusClientData_v2" in head:
+        return "nessus_parser"
+    if b"<nmaprun" in head:
+        return "nmap_parser"
+    return None
+
+
+def __detect_json(head: bytes, tail: bytes) -> str | None:
+    """
+    Distinguish the JSON based formats.
+
+    - Masscan: list of objects with `"ip"` and `"ports"`
+    - JSON: object keyed by IP addresses (or `unknown_*` placeholders)
+    - Bloodhound: object with `"data"` and `"meta"` (which is written last)
+    - Aquatone: object with `"pages"`
+    """
+
+    if head.startswith(b"["):
+        body = head[1:].lstrip()
+        if not body or body.startswith(b"]"):
+            # Empty masscan scan
+            return "masscan_parser"
+        if body.startswith(b"{") and b'"ip"' in head and b'"ports"' in head + tail:
+            return "masscan_parser"
+        return None
+
+    match = _FIRST_JSON_KEY.match(head)
+    if match is None:
+        return None
+    first_key = match.group(1).decode(errors="replace")
+
+    if is_valid_ip(first_key) or first_key.startswith("unknown_"):
+        return "json_parser"
+    if b'"data"' in head and b'"meta"' in head + tail:
+        return "bloodhound_parser"
+    if b'"pages"' in head + tail:
+        return "aquatone_parser"
+    return None
+
+
+def __detect_text(head: bytes) -> str | None:
+    """
+    Plain text host lists (`IP hostname...` or `hostname IP`).
+    """
+
+    try:
+        text = head.decode()
+    except UnicodeDecodeError:
+        return None
+
+    for line in text.splitlines():
+        parts = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        if any(is_valid_ip(part) for part in parts[:2]):
+            return "txt_parser"
+        return None
+    return None
+
+
+def __detect_sqlite(filename: str | Path) -> str | None:
+    """
+    Tell NetExec databases and scans2any project databases apart by their
+    `hosts` table (scans2any databases before schema version 2) or the
+    `host_addresses` table.
+    """
+
+    try:
+        uri = f"{Path(filename).absolute().as_uri()}?mode=ro"
+        with contextlib.closing(sqlite3.connect(uri, uri=True)) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(hosts)")}
+            address_columns = {
+                row[1] for row in conn.execute("PRAGMA table_info(host_addresses)")
+            }
+    except sqlite3.Error:
+        return None
+
+    if {"ip", "signing", "smbv1"} <= columns:
+        return "nxc_parser"
+    if {"address", "hostnames"} <= columns or {"address", "host_id"} <= address_columns:
+        return "database_parser"
+    return None
+
+
 def parse(filename: str | Path) -> Infrastructure:
+    name = detect_parser(filename)
+    if name in avail_parsers:
+        printer.status(f"Detected parser '{name}' for file '{filename}'")
+        return avail_parsers[name].parse(filename)
+
+    printer.debug(
+        f"Could not detect the format of {filename}, trying all matching parsers."
+    )
+    return __parse_trial_and_error(filename)
+
+
+def __parse_trial_and_error(filename: str | Path) -> Infrastructure:
+    """
+    Try every parser with a matching file extension until one returns hosts.
+    """
+
     filename_path = Path(filename)
     for name, parser in avail_parsers.items():
         # don't call yourself
@@ -5,8 +5,11 @@ Reads infrastructure data from a project-specific SQLite database.
 Supports efficient filtering at the SQL level.
 """
 
+import re
+from pathlib import Path
+
 from scans2any.internal import Infrastructure, printer
-from scans2any.internal.database import Database
+from scans2any.internal.database import ColumnFilter, Database, connection_profile
 
 CONFIG = {
     "extensions": [".db", ".sqlite", ".sqlite3"],
@@ -25,74 +28,51 @@ def add_arguments(parser):
     pass
 
 
-def _parse_column_filters(col_filters: list[str]) -> dict[str, str]:
+def _parse_column_filters(col_filters: list[str]) -> list[ColumnFilter]:
     """
-    Parse column:regex filters into database filter dict.
+    Parse `column_filter` specs into database filters.
 
     Parameters
     ----------
     col_filters : list[str]
-        List of "column:regex" strings
+        List of "[col:][!]regex" strings
 
     Returns
     -------
-    dict[str, str]
-        Filter dict with SQL LIKE patterns
+    list[ColumnFilter]
+        Filters evaluated by SQLite. Specs with invalid regexes are left to
+        `column_filter`, which reports them.
     """
-    filters = {}
-    column_map = {
-        "IP-Addresses": "address",
-        "IP": "address",
-        "Hostnames": "hostname",
-        "Hostname": "hostname",
-        "Ports": "port",
-        "Port": "port",
-        "Services": "service",
-        "Service": "service",
-        "Banners": "banner",
-        "Banner": "banner",
-    }
-
+    filters = []
     for col_filter in col_filters:
-        if ":" not in col_filter:
+        col = None
+        pattern = col_filter
+        if ":" in col_filter:
+            col, pattern = col_filter.split(":", 1)
+            col = col.strip()
+
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+        try:
+            re.compile(pattern)
+        except re.error:
             continue
-
-        col, pattern = col_filter.split(":", 1)
-        db_col = column_map.get(col)
-
-        if not db_col:
-            continue
-
-        # Convert regex to SQL LIKE pattern (simple conversion)
-        # For exact matches or simple patterns
-        if db_col == "port":
-            # Port should be exact match
-            try:
-                filters[db_col] = int(pattern)
-            except ValueError:
-                continue
-        else:
-            # Convert to SQL LIKE pattern
-            # Replace .* with %, . with _, etc.
-            like_pattern = pattern.replace(".*", "%").replace(".", "_")
-            if not like_pattern.startswith("%"):
-                like_pattern = "%" + like_pattern
-            if not like_pattern.endswith("%"):
-                like_pattern = like_pattern + "%"
-            filters[db_col] = like_pattern
+        filters.append(ColumnFilter(col, pattern, negated))
 
     return filters
 
 
-def parse(project: str = "default", args=None) -> Infrastructure:
+def parse(project: str | Path = "default", args=None) -> Infrastructure:
     """
     Parses SQLite database and generates an Infrastructure object.
 
     Parameters
     ----------
-    project : str
+    project : str | Path
         Project name to read from database (default: "default")
-        Database file is {project}.db
+        Database file is {project}.db, or the database file itself (as
+        passed by the auto parser)
     args : argparse.Namespace, optional
         Command line arguments for filtering and verbosity
 
@@ -102,22 +82,31 @@ def parse(project: str = "default", args=None) -> Infrastructure:
         Scan data as `Infrastructure` object.
     """
 
+    project = str(project)
     db_path = (
         project if project.endswith(tuple(CONFIG["extensions"])) else f"{project}.db"
     )
 
     printer.status(f"Database: {db_path}")
 
-    # Parse column filters from args if provided
+    # Push the column filter down into SQLite if it is enabled
     filters = None
-    if args and hasattr(args, "col") and args.col:
-        filters = _parse_column_filters(args.col)
+    enabled = args and "column_filter" in set(
+        getattr(args, "filters", []) + getattr(args, "enable_filters", [])
+    ) - set(getattr(args, "disable_filters", []))
+    if enabled and getattr(args, "column_regex", None):
+        filters = _parse_column_filters(args.column_regex)
         if filters:
             printer.info(f"Applying database filters: {filters}")
 
     verbose = args and hasattr(args, "verbose") and args.verbose > 0
 
-    with Database(db_path, project) as db:
+    profile = connection_profile(
+        getattr(args, "db_profile", None),
+        cache_size=getattr(args, "db_cache_size", None),
+        mmap_size=getattr(args, "db_mmap_size", None),
+    )
+    with Database(db_path, project, profile) as db:
         stats = db.get_statistics()
 
         if verbose:
@@ -132,7 +121,11 @@ def parse(project: str = "default", args=None) -> Infrastructure:
                 f"Loading {stats['hosts']} hosts with {stats['services']} services"
             )
 
-        infra = db.read_infrastructure(filters=filters)
+        infra = db.read_infrastructure(
+            filters=filters,
+            host_mode=getattr(args, "col_host_mode", False),
+            value_mode=getattr(args, "col_value_mode", False),
+        )
 
     printer.success(f"Successfully loaded project '{project}' from database")
     return infra
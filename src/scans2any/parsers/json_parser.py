@@ -5,7 +5,7 @@ import re
 from pathlib import Path
 
 from scans2any.helpers.utils import is_valid_ip, read_json
-from scans2any.internal import Host, Infrastructure, Service, SortedSet
+from scans2any.internal import Host, Infrastructure, Service, SortedSet, validate_host
 
 # None signals that the JSON parser accepts arbitrary custom column names
 # because it reads key/value pairs from the file dynamically.
@@ -122,7 +122,7 @@ def __parse_json(infra: dict) -> list[Host]:
         host.add_services(
             new_services=services,
         )
-        hosts.append(host)
+        hosts.append(validate_host(host))
 
     return hosts
 
@@ -12,7 +12,14 @@ from typing import Any
 import yaml
 
 from scans2any.helpers.utils import is_valid_ip
-from scans2any.internal import Host, Infrastructure, Service, SortedSet, printer
+from scans2any.internal import (
+    Host,
+    Infrastructure,
+    Service,
+    SortedSet,
+    printer,
+    validate_host,
+)
 
 
 def parse(
@@ -98,7 +105,7 @@ def parse(
             new_services.append(new_service)
 
         new_host.add_services(new_services)
-        new_hosts.append(new_host)
+        new_hosts.append(validate_host(new_host))
 
     for host, entries in custom_entries.items():
         if not __custom_entries_format_ok(entries):
@@ -123,7 +130,7 @@ def parse(
             new_services.append(new_service)
 
         new_host.add_services(new_services)
-        new_hosts.append(new_host)
+        new_hosts.append(validate_host(new_host))
 
     infra.add_hosts(new_hosts)
     printer.success(f"Parsing of {len(infra.hosts)} hosts finished without errors")
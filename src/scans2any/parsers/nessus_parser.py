@@ -1,8 +1,16 @@
 """
 Nessus Parser
+
+Large reports can be split into byte ranges of whole `<ReportHost>` elements
+(`split_file`), which are parsed independently (`parse_shard`) and merged
+afterwards (`merge_shards`) with the same result as `parse`.
 """
 
 import ast
+import io
+import mmap
+import re
+from itertools import chain
 from pathlib import Path
 
 from defusedxml.ElementTree import iterparse
@@ -14,6 +22,16 @@ CONFIG = {
     "extensions": [".nessus"],
 }
 
+_REPORT_HOST = b"<ReportHost"
+_REPORT_HOST_END = b"</ReportHost>"
+_REPORT_END = b"</Report>"
+
+# Start tags of the elements enclosing the hosts, including their attributes
+# (the `<Report>` tag declares e.g. the `cm:` namespace of compliance checks)
+_ATTRIBUTES = rb"""(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*\s*>"""
+_ROOT_START = re.compile(rb"<NessusClientData_v2" + _ATTRIBUTES)
+_REPORT_START = re.compile(rb"<Report" + _ATTRIBUTES)
+
 # Custom columns produced by this parser that can be requested via -c
 CUSTOM_COLUMNS: dict[str, str] = {
     "vulnerability-type": "Vulnerability-Type",
@@ -130,17 +148,114 @@ def parse(filename: str | Path) -> Infrastructure:
         Nessus scan as infrastructure object.
     """
 
+    return merge_shards([__parse_report(filename)])
+
+
+def split_file(filename: str | Path, shard_size: int) -> list[tuple[int, int]]:
+    """
+    Split a Nessus report into byte ranges of roughly `shard_size` bytes, each
+    consisting of complete `<ReportHost>` elements.
+
+    The file is memory mapped, only the shard boundaries are searched for.
+
+    Parameters
+    ----------
+    filename : str | Path
+        Path to Nessus report
+    shard_size : int
+        Minimum size of a shard in bytes (the last shard may be smaller)
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        (start, end) byte offsets of the shards, empty if the report contains
+        no hosts.
+    """
+
+    with open(filename, "rb") as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            return []
+
+    with mm:
+        start = mm.find(_REPORT_HOST)
+        end = mm.rfind(_REPORT_END)
+        if start == -1 or end < start:
+            return []
+
+        shards = []
+        while (boundary := __next_report_host(mm, start + shard_size, end)) != -1:
+            shards.append((start, boundary))
+            start = boundary
+        shards.append((start, end))
+        return shards
+
+
+def __next_report_host(mm: mmap.mmap, pos: int, end: int) -> int:
+    """
+    Offset of the first `<ReportHost` tag in `mm[pos:end]`, that directly
+    follows a closing `</ReportHost>` (and is not part of e.g. plugin output).
+    """
+
+    while (pos := mm.find(_REPORT_HOST, pos, end)) != -1:
+        before = mm[max(0, pos - 256) : pos].rstrip()
+        if before.endswith(_REPORT_HOST_END):
+            return pos
+        pos += len(_REPORT_HOST)
+    return -1
+
+
+def parse_shard(filename: str | Path, start: int, end: int) -> list[Host]:
+    """
+    Parse the `<ReportHost>` elements in byte range `start`-`end` of a Nessus
+    report (see `split_file`).
+
+    Returns
+    -------
+    list[Host]
+        Hosts in order of appearance, not yet merged.
+    """
+
+    with open(filename, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    with mm:
+        root = _ROOT_START.search(mm, 0, start)
+        report = _REPORT_START.search(mm, root.end() if root else 0, start)
+        document = b"%s%s%s</Report></NessusClientData_v2>" % (
+            root[0] if root else b"<NessusClientData_v2>",
+            report[0] if report else b"<Report>",
+            mm[start:end],
+        )
+    return __parse_report(io.BytesIO(document))
+
+
+def merge_shards(shards: list[list[Host]]) -> Infrastructure:
+    """
+    Merge the hosts of all shards (in file order) into one infrastructure.
+    """
+
     infra = Infrastructure(identifier="Nessus")
+    infra.add_hosts(list(chain.from_iterable(shards)))
+    return infra
+
+
+def __parse_report(fobj) -> list[Host]:
+    """
+    Parse all hosts of a Nessus report (path or file object).
+    """
+
     new_hosts = []
 
-    nessus_report = NessusReport(filename)
+    nessus_report = NessusReport(fobj)
     for item in nessus_report:
         new_host = __parse_report_item(item)
         if new_host:
             new_hosts.append(new_host)
 
-    infra.add_hosts(new_hosts)
-    return infra
+    return new_hosts
 
 
 def __parse_report_item(host: list) -> Host | None:
@@ -1,11 +1,21 @@
 """
 Nmap Parser
 
-Nmap Parser based on [python-libnmap](https://libnmap.readthedocs.io/en/latest/objects.html)
+Streaming Nmap XML parser built on `defusedxml.ElementTree.iterparse`. Each
+`<host>` element is turned into a `Host` as soon as it has been read and is
+cleared afterwards, so memory stays bounded by the largest single host instead
+of the whole report.
+
+Aborted (incomplete) scans are recovered with
+[python-libnmap](https://libnmap.readthedocs.io/en/latest/objects.html).
 """
 
+from collections.abc import Iterator
 from pathlib import Path
+from typing import NamedTuple
+from xml.etree.ElementTree import Element, ParseError
 
+from defusedxml.ElementTree import iterparse
 from libnmap.objects.os import NmapOSMatch
 from libnmap.parser import NmapHost, NmapParser, NmapParserException
 
@@ -16,6 +26,28 @@ CONFIG = {
     "extensions": [".xml"],
 }
 
+# Keys of the <service> element, that are not part of the banner (same as
+# python-libnmap's `NmapService.banner`)
+_BANNER_NOT_RELEVANT = ("name", "method", "conf", "cpelist", "servicefp", "tunnel")
+_BANNER_RELEVANT = ("product", "version", "extrainfo")
+
+
+class _NmapPort(NamedTuple):
+    """Parser-independent view of a `<port>` element."""
+
+    port: int
+    protocol: str
+    state: str | None
+    service: str
+    banner_dict: dict[str, str]
+    scripts: list[dict]
+
+    @property
+    def banner(self) -> str:
+        return " ".join(
+            f"{key}: {value}" for key, value in self.banner_dict.items()
+        ).rstrip()
+
 
 def add_arguments(parser):
     """
@@ -46,85 +78,313 @@ def parse(filename: str | Path) -> Infrastructure:
         Nmap's scan as `Infrastructure` object.
     """
 
+    infra = Infrastructure(identifier="Nmap")
+
     try:
-        nmap_report = NmapParser.parse_fromfile(str(filename))
-    except NmapParserException:
+        new_hosts = list(iter_hosts(filename, infra.identifier))
+    except ParseError:
         # Try to parse incomplete aborted Nmap scan
-        try:
-            nmap_report = NmapParser.parse_fromfile(filename, incomplete=True)
-        except NmapParserException:
-            raise
+        new_hosts = __parse_incomplete(filename, infra.identifier)
 
-    infra = Infrastructure(identifier="Nmap")
-    new_hosts = []
+    infra.add_hosts(new_hosts)
+    return infra
 
-    for nmap_host in nmap_report.hosts:
-        nmap_os: set[tuple[str, str]] = set(
-            (osvalue, infra.identifier) for osvalue in __detect_os(nmap_host)
-        )
 
-        lower_hostnames: set[str] = set(
-            hostname.lower() for hostname in nmap_host.hostnames
-        )
+def iter_hosts(filename: str | Path, identifier: str = "Nmap") -> Iterator[Host]:
+    """
+    Stream `Host` objects from a Nmap XML report, one `<host>` at a time.
 
-        # Identify more hostnames from script results
-        for script in nmap_host.scripts_results:
-            fqdn = script.get("elements", {}).get("fqdn")
-            if fqdn:
-                lower_hostnames.add(fqdn.lower())
-
-        # Iterate over services to extract more details
-        for nservice in nmap_host.services:
-            for script in nservice.scripts_results:
-                elements = script.get("elements", {})
-
-                # Extract and add DNS_Computer_Name if available
-                dns_computer_name = elements.get("DNS_Computer_Name")
-                if dns_computer_name:
-                    lower_hostnames.add(dns_computer_name.lower())
-
-                # Extract and process certificate subjects
-                subject = elements.get("subject", {})
-                common_name = subject.get("commonName")
-                if common_name and match_fqdn(common_name):
-                    lower_hostnames.add(common_name.lower())
-
-            # Extract os type from banner
-            ostype = nservice.banner_dict.get("ostype", {})
-            if ostype:
-                os_name = find_os(ostype)
-                if os_name:
-                    nmap_os.add((os_name, infra.identifier))
-            hostname = nservice.banner_dict.get("hostname", {})
-            # Extract hostname from banner, strip leading/trailing whitespaces
-            if hostname:
-                lower_hostnames.add(hostname.lower().strip(" "))
-
-        new_host = Host(
-            address=set([nmap_host.address]), hostnames=lower_hostnames, os=nmap_os
-        )
+    Parameters
+    ----------
+    filename : str | Path
+        Path to XML Nmap report
+    identifier : str
+        Info origin stored alongside detected operating systems
+
+    Yields
+    ------
+    Host
+        Host with its services, in order of appearance in the report
+
+    Raises
+    ------
+    ParseError
+        The XML is malformed or ends prematurely (aborted scan).
+    """
+
+    root: Element | None = None
+    for event, elem in iterparse(str(filename), events=("start", "end")):
+        if root is None:
+            root = elem
+            continue
+        if event != "end" or elem.tag != "host":
+            continue
+
+        yield __host_from_element(elem, identifier)
+
+        # Drop the processed subtree and everything read before it
+        elem.clear()
+        root.clear()
+
+
+def __host_from_element(elem: Element, identifier: str) -> Host:
+    """
+    Build `Host` from a `<host>` element.
+    """
+
+    ipv4 = ipv6 = None
+    hostnames: list[str] = []
+    host_scripts: list[dict] = []
+    ports: list[_NmapPort] = []
+    os_matches: list[tuple[int, str]] = []
+
+    for child in elem:
+        match child.tag:
+            case "address":
+                addrtype = child.get("addrtype")
+                if addrtype == "ipv4":
+                    ipv4 = child.get("addr")
+                elif addrtype == "ipv6":
+                    ipv6 = child.get("addr")
+            case "hostnames":
+                hostnames.extend(
+                    name
+                    for hostname in child.findall("hostname")
+                    if (name := hostname.get("name")) is not None
+                )
+            case "ports":
+                ports.extend(
+                    port
+                    for xport in child.findall("port")
+                    if (port := __port_from_element(xport)) is not None
+                )
+            case "hostscript":
+                host_scripts.extend(
+                    __parse_script(script) for script in child.findall("script")
+                )
+            case "os":
+                os_matches.extend(__parse_os_matches(child))
+
+    return __build_host(
+        ipv4 or ipv6 or "",
+        hostnames,
+        host_scripts,
+        ports,
+        __detect_os_all_matches(os_matches),
+        identifier,
+    )
+
+
+def __port_from_element(xport: Element) -> _NmapPort | None:
+    """
+    Build `_NmapPort` from a `<port>` element, `None` if it is incomplete.
+    """
+
+    portid = xport.get("portid")
+    protocol = xport.get("protocol")
+    xstate = xport.find("state")
+    if portid is None or protocol is None or xstate is None:
+        return None
+
+    service: dict[str, str] = {}
+    xservice = xport.find("service")
+    if xservice is not None:
+        service = dict(xservice.attrib)
+
+    banner_dict: dict[str, str] = {}
+    if service.get("method") == "probed":
+        for key in _BANNER_RELEVANT:
+            if key in service:
+                banner_dict[key] = service[key]
+        for key, value in service.items():
+            if key not in _BANNER_NOT_RELEVANT and key not in _BANNER_RELEVANT:
+                banner_dict[key] = value
+
+    return _NmapPort(
+        port=int(portid),
+        protocol=protocol,
+        state=xstate.get("state"),
+        service=service.get("name", ""),
+        banner_dict=banner_dict,
+        scripts=[__parse_script(script) for script in xport.findall("script")],
+    )
+
+
+def __parse_script(script: Element) -> dict:
+    """
+    Convert `<script>` element to a dict with its attributes and `elements`
+    (same layout as python-libnmap's script results).
+    """
+
+    result: dict = dict(script.attrib)
+    result["elements"] = __parse_script_table(script, nested=False)
+    return result
+
+
+def __parse_script_table(table: Element, *, nested: bool = True) -> dict:
+    """
+    Convert the `<elem>`/`<table>` children of a script output to a dict.
+
+    Repeated keys are collected in a list, except for `<elem>`s on the top
+    level of a script, where a repeated key overwrites the previous value.
+    """
 
-        new_services = []
-        for nmap_service in nmap_host.services:
-            # With UDP-Scans nmap sets the state to "open|filtered" if no answer
-            # was received.
-            if nmap_service.protocol == "udp" and nmap_service.state != "open":
+    elements: dict = {}
+    for child in table:
+        key = child.get("key")
+        if child.tag == "elem":
+            if not nested:
+                elements[key] = child.text
                 continue
-            new_service = Service(
-                port=nmap_service.port,
-                protocol=nmap_service.protocol,
-                service_names=SortedSet([nmap_service.service.lower()]),
-                banners=SortedSet([nmap_service.banner])
-                if nmap_service.banner
-                else SortedSet(),
+            value = child.text
+        elif child.tag == "table":
+            value = __parse_script_table(child)
+        else:
+            continue
+
+        if key in elements:
+            if not isinstance(elements[key], list):
+                elements[key] = [elements[key]]
+            elements[key].append(value)
+        else:
+            elements[key] = value
+    return elements
+
+
+def __parse_os_matches(xos: Element) -> list[tuple[int, str]]:
+    """
+    Collect (accuracy, name) of all `<osmatch>`es of an `<os>` element.
+
+    Top-level `<osclass>`es (nmap XML < 1.04) without an `<osmatch>` of the
+    same accuracy are turned into `type:vendor:osfamily` matches.
+    """
+
+    matches: list[tuple[int, str]] = []
+    osclasses: list[Element] = []
+    for child in xos:
+        if child.tag == "osmatch":
+            matches.append((int(child.get("accuracy", 0)), child.get("name", "")))
+        elif child.tag == "osclass":
+            osclasses.append(child)
+
+    for osclass in osclasses:
+        accuracy = int(osclass.get("accuracy", 0))
+        if any(accuracy == match[0] for match in matches):
+            continue
+        name = f"{osclass.get('type', '')}:{osclass.get('vendor')}:{osclass.get('osfamily')}"
+        matches.append((accuracy, name))
+
+    return matches
+
+
+def __parse_incomplete(filename: str | Path, identifier: str) -> list[Host]:
+    """
+    Parse an aborted Nmap scan (missing closing tags) with python-libnmap.
+    """
+
+    try:
+        nmap_report = NmapParser.parse_fromfile(str(filename), incomplete=True)
+    except NmapParserException:
+        raise
+
+    new_hosts = []
+    for nmap_host in nmap_report.hosts:
+        ports = [
+            _NmapPort(
+                port=nservice.port,
+                protocol=nservice.protocol,
+                state=nservice.state,
+                service=nservice.service,
+                banner_dict=nservice.banner_dict,
+                scripts=nservice.scripts_results,
+            )
+            for nservice in nmap_host.services
+        ]
+        new_hosts.append(
+            __build_host(
+                nmap_host.address,
+                nmap_host.hostnames,
+                nmap_host.scripts_results,
+                ports,
+                __detect_os(nmap_host),
+                identifier,
             )
-            new_services.append(new_service)
-        new_host.add_services(new_services)
+        )
 
-        new_hosts.append(new_host)
+    return new_hosts
 
-    infra.add_hosts(new_hosts)
-    return infra
+
+def __build_host(
+    address: str,
+    hostnames: list[str],
+    host_scripts: list[dict],
+    ports: list[_NmapPort],
+    detected_os: list[str],
+    identifier: str,
+) -> Host:
+    """
+    Create `Host` with its services from the information of a Nmap host.
+    """
+
+    nmap_os: set[tuple[str, str]] = set(
+        (osvalue, identifier) for osvalue in detected_os
+    )
+
+    lower_hostnames: set[str] = set(hostname.lower() for hostname in hostnames)
+
+    # Identify more hostnames from script results
+    for script in host_scripts:
+        fqdn = script.get("elements", {}).get("fqdn")
+        if fqdn:
+            lower_hostnames.add(fqdn.lower())
+
+    # Iterate over services to extract more details
+    for nservice in ports:
+        for script in nservice.scripts:
+            elements = script.get("elements", {})
+
+            # Extract and add DNS_Computer_Name if available
+            dns_computer_name = elements.get("DNS_Computer_Name")
+            if dns_computer_name:
+                lower_hostnames.add(dns_computer_name.lower())
+
+            # Extract and process certificate subjects
+            subject = elements.get("subject", {})
+            common_name = subject.get("commonName")
+            if common_name and match_fqdn(common_name):
+                lower_hostnames.add(common_name.lower())
+
+        # Extract os type from banner
+        ostype = nservice.banner_dict.get("ostype", {})
+        if ostype:
+            os_name = find_os(ostype)
+            if os_name:
+                nmap_os.add((os_name, identifier))
+        hostname = nservice.banner_dict.get("hostname", {})
+        # Extract hostname from banner, strip leading/trailing whitespaces
+        if hostname:
+            lower_hostnames.add(hostname.lower().strip(" "))
+
+    new_host = Host(address=set([address]), hostnames=lower_hostnames, os=nmap_os)
+
+    new_services = []
+    for nmap_service in ports:
+        # With UDP-Scans nmap sets the state to "open|filtered" if no answer
+        # was received.
+        if nmap_service.protocol == "udp" and nmap_service.state != "open":
+            continue
+        new_service = Service(
+            port=nmap_service.port,
+            protocol=nmap_service.protocol,
+            service_names=SortedSet([nmap_service.service.lower()]),
+            banners=SortedSet([nmap_service.banner])
+            if nmap_service.banner
+            else SortedSet(),
+        )
+        new_services.append(new_service)
+    new_host.add_services(new_services)
+
+    return new_host
 
 
 def __detect_os(nmap_host: NmapHost) -> list[str]:
@@ -139,26 +399,20 @@ def __detect_os(nmap_host: NmapHost) -> list[str]:
         List of detected os's
     """
 
-    detected_os = []
-    os_matches = nmap_host.os_match_probabilities()
-
-    # Highest accuracy --> lowest accuracy
-    os_matches.sort(key=lambda m: m.accuracy, reverse=True)
+    os_matches: list[NmapOSMatch] = nmap_host.os_match_probabilities()
 
     # Execute detection strategy
-    detected_os = __detect_os_all_matches(os_matches)
+    return __detect_os_all_matches([(m.accuracy, m.name) for m in os_matches])
 
-    return detected_os
 
-
-def __detect_os_all_matches(os_matches: list[NmapOSMatch]) -> list[str]:
+def __detect_os_all_matches(os_matches: list[tuple[int, str]]) -> list[str]:
     """
     Detect Nmap os's using `all_matches` strategy.
 
     Parameters
     ----------
-    os_matches : list[NmapOSMatch]
-        Sorted list (descending) of possible os matches.
+    os_matches : list[tuple[int, str]]
+        Possible os matches as (accuracy, name).
 
     Returns
     -------
@@ -168,12 +422,13 @@ def __detect_os_all_matches(os_matches: list[NmapOSMatch]) -> list[str]:
 
     detected_os = set()
 
-    for os_match in os_matches:
+    # Highest accuracy --> lowest accuracy
+    for accuracy, name in sorted(os_matches, key=lambda m: m[0], reverse=True):
         # min accuracy
-        if os_match.accuracy < 92:
+        if accuracy < 92:
             break
         # save os map
-        os = find_os(os_match.name)
+        os = find_os(name)
         if os:
             detected_os.add(os)
 
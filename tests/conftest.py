@@ -1,7 +1,22 @@
+import os
 import sys
 from pathlib import Path
 
+import pytest
+
 # Insert src directory to sys.path to ensure local code is used
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+
+@pytest.fixture(scope="session", autouse=True)
+def _parse_cache_dir(tmp_path_factory):
+    """Keep the parse cache of test runs away from the user's cache directory."""
+    if "SCANS2ANY_CACHE_DIR" in os.environ:
+        yield
+        return
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("SCANS2ANY_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        yield
+
+
 # pytest_plugins = ["syrupy"]
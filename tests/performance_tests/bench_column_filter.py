@@ -0,0 +1,65 @@
+"""
+Benchmark the python and pandas backends of the column filter.
+
+Runs a few typical spec sets (service-level, global, many global patterns) in
+every granularity mode on a large infrastructure.
+
+    uv run python tests/performance_tests/bench_column_filter.py [--services 100000]
+"""
+
+import argparse
+import gc
+import time
+from types import SimpleNamespace
+
+from bench_filters import build
+
+from scans2any.filters import column_filter
+from scans2any.internal import printer
+
+SPECS = {
+    "service": ["Services:http", "Banners:!unknown"],
+    "global": ["(?i)apache", "!ssh"],
+    "6 global": ["linux", "host", "!zzz", "example", r"(?i)HOST\d", r"10\."],
+}
+MODES = {
+    "normal": {},
+    "value": {"col_value_mode": True},
+    "host": {"col_host_mode": True},
+}
+
+
+def measure(services: int, specs: list[str], mode: dict, backend: str) -> str:
+    infra = build(services)
+    args = SimpleNamespace(column_regex=specs, column_filter_backend=backend, **mode)
+    # Like timeit, disable the garbage collector while timing
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    column_filter.apply_filter(infra, args)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    print(f"{backend:<8} {elapsed:>8.3f} s", end="  ")  # noqa: T201
+    return str(infra)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--services", type=int, default=100_000)
+    args = parser.parse_args()
+
+    printer.status = printer.debug = lambda *_, **__: None
+    # Import once up front, it would otherwise be timed with the first run
+    import pandas  # noqa: F401
+
+    print(f"{args.services} services")  # noqa: T201
+    for specs_name, specs in SPECS.items():
+        for mode_name, mode in MODES.items():
+            print(f"{specs_name:<9} {mode_name:<7}", end="  ")  # noqa: T201
+            expected = measure(args.services, specs, mode, "python")
+            assert measure(args.services, specs, mode, "pandas") == expected
+            print()  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark writing and reading a large project database.
+
+Writes an infrastructure to a temporary project database, merges it into the
+database a second time and reads it back, with and without filters.
+
+    uv run python tests/performance_tests/bench_database.py [--services 100000]
+        [--profile durable]
+"""
+
+import argparse
+import gc
+import tempfile
+import time
+from pathlib import Path
+
+from bench_filters import build
+
+from scans2any.internal import printer
+from scans2any.internal.database import (
+    DEFAULT_PROFILE,
+    PROFILES,
+    ColumnFilter,
+    Database,
+)
+
+FILTERS = {
+    "read": None,
+    "read port": [ColumnFilter("Ports", "^3/")],
+    "read service": [ColumnFilter("Services", "ssh")],
+    "read address": [ColumnFilter("IP-Addresses", r"^10\.0\.1\.")],
+}
+
+
+def measure(name: str, func, *args):
+    # Like timeit, disable the garbage collector while timing
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    print(f"{name:<14} {elapsed:>8.3f} s")  # noqa: T201
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--services", type=int, default=100_000)
+    parser.add_argument("--profile", choices=PROFILES, default=DEFAULT_PROFILE)
+    args = parser.parse_args()
+
+    printer.info = printer.status = printer.debug = lambda *_, **__: None
+    infra = build(args.services)
+    print(f"{len(infra.hosts)} hosts, {args.services} services")  # noqa: T201
+
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        Database(Path(tmpdir) / "bench.db", profile=PROFILES[args.profile]) as db,
+    ):
+        measure("write", db.write_infrastructure, infra)
+        measure("write again", db.write_infrastructure, infra)
+        hosts = len(infra.hosts)
+        # Keep only one large infrastructure in memory at a time
+        del infra
+        for name, filters in FILTERS.items():
+            read = measure(name, lambda f: db.read_infrastructure(filters=f), filters)
+            if filters is None:
+                assert len(read.hosts) == hosts
+            del read
+
+
+if __name__ == "__main__":
+    main()
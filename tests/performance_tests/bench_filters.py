@@ -0,0 +1,112 @@
+"""
+Benchmark the default filters on a large infrastructure.
+
+Compares the fused filter pipeline of `apply_filters` (serial and in parallel
+worker processes) against running every filter as its own pass over all hosts
+(and services).
+
+    uv run python tests/performance_tests/bench_filters.py [--services 100000]
+"""
+
+import argparse
+import copy
+import gc
+import os
+import time
+from types import SimpleNamespace
+
+from scans2any.filters import avail_filters
+from scans2any.helpers.infrastructure import apply_filters
+from scans2any.internal import Host, Infrastructure, Service, SortedSet, printer
+
+SERVICES_PER_HOST = 10
+DEFAULT_FILTERS = [
+    "trash_banner",
+    "trash_service_name",
+    "trash_hostname",
+    "combine_banner",
+    "nmap_banner",
+]
+
+BANNERS = [
+    ["product: Apache httpd version: 2.4.41 ostype: Linux"],
+    ["OpenSSH 8.2p1", "OpenSSH"],
+    ["unknown", "404 Not Found", "nginx"],
+    ["Microsoft IIS httpd 10.0"],
+]
+SERVICE_NAMES = [["http", "www"], ["ssh"], ["https", "unknown"], ["msrpc"]]
+
+
+def build(services: int) -> Infrastructure:
+    hosts = []
+    for i in range(services // SERVICES_PER_HOST):
+        host = Host(
+            address={f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"},
+            hostnames=SortedSet([f"host{i}", f"host{i}.example"]),
+            os=SortedSet(["linux"]),
+        )
+        host.services = [
+            Service(
+                port=port,
+                protocol="tcp",
+                service_names=SortedSet(SERVICE_NAMES[port % len(SERVICE_NAMES)]),
+                banners=SortedSet(BANNERS[port % len(BANNERS)]),
+            )
+            for port in range(SERVICES_PER_HOST)
+        ]
+        hosts.append(host)
+    infra = Infrastructure()
+    infra.hosts = hosts
+    return infra
+
+
+def apply_sequential(infra: Infrastructure, enabled_filters: list[str], args):
+    """One full pass per filter (behaviour before the fused pipeline)."""
+    active = [f for f in avail_filters if f[0] in enabled_filters]
+    for _, obj, level in sorted(active, key=lambda item: item[1].PRIORITY):
+        if level == "infra":
+            obj.apply_filter(infra, args)
+        elif level == "host":
+            for host in infra.hosts:
+                obj.apply_filter(host, args)
+        else:
+            for host in infra.hosts:
+                for service in host.services:
+                    obj.apply_filter(service, args)
+
+
+def measure(name: str, func, infra: Infrastructure, args) -> Infrastructure:
+    # Like timeit, disable the garbage collector while timing
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    func(infra, DEFAULT_FILTERS, args)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    print(f"{name:<12} {elapsed:>8.3f} s")  # noqa: T201
+    return infra
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--services", type=int, default=100_000)
+    args = parser.parse_args()
+
+    printer.status = printer.debug = lambda *_, **__: None
+    infra = build(args.services)
+    print(f"{args.services} services, default filters, {os.cpu_count()} CPUs")  # noqa: T201
+    serial = SimpleNamespace(parallel_filter_hosts=0)
+    sequential = measure("sequential", apply_sequential, copy.deepcopy(infra), serial)
+
+    def fused(*args):
+        apply_filters(*args, quiet=True)
+
+    assert str(sequential) == str(measure("fused", fused, copy.deepcopy(infra), serial))
+    parallel = SimpleNamespace(parallel_filter_hosts=1)
+    assert str(sequential) == str(
+        measure("parallel", fused, copy.deepcopy(infra), parallel)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark construction time and memory of the core `Host`/`Service` model.
+
+Compares the slots based dataclasses against pydantic models equivalent to the
+previous implementation (validation on every construction).
+
+    uv run python tests/performance_tests/bench_models.py [--services 500000]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Self
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from scans2any.internal import Host, Service, SortedSet
+
+SERVICES_PER_HOST = 10
+
+
+class PydanticService(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    port: int
+    protocol: str
+    service_names: SortedSet[str]
+    banners: SortedSet[str]
+    trusted_fields: set[str] = Field(default_factory=set)
+    custom_fields: dict[str, set] = Field(default_factory=dict)
+
+
+class PydanticHost(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    address: set[str] | SortedSet[str]
+    hostnames: set[str] | SortedSet[str]
+    os: set[tuple[str, str]] | SortedSet[str]
+    services: list[PydanticService] = Field(default_factory=list)
+    trusted_fields: set[str] = Field(default_factory=set)
+    custom_fields: dict[str, set] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def check_address_or_hostname(self) -> Self:
+        if not self.address and not self.hostnames:
+            raise ValueError("host without address and hostname")
+        return self
+
+
+def build(host_cls, service_cls, services: int) -> list:
+    hosts = []
+    for i in range(services // SERVICES_PER_HOST):
+        host = host_cls(
+            address={f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"},
+            hostnames={f"host{i}.example"},
+            os=set(),
+        )
+        host.services = [
+            service_cls(
+                port=port,
+                protocol="tcp",
+                service_names=SortedSet(["http"]),
+                banners=SortedSet(),
+            )
+            for port in range(SERVICES_PER_HOST)
+        ]
+        hosts.append(host)
+    return hosts
+
+
+def measure(name: str, host_cls, service_cls, services: int):
+    # Like timeit, disable the garbage collector while timing, its (quadratic)
+    # full collections would otherwise dominate for large numbers of objects
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    hosts = build(host_cls, service_cls, services)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    del hosts
+
+    gc.collect()
+    tracemalloc.start()
+    hosts = build(host_cls, service_cls, services)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del hosts
+
+    print(f"{name:<10} {elapsed:>8.2f} s {current / 1024**2:>10.1f} MiB")  # noqa: T201
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--services", type=int, default=500_000)
+    args = parser.parse_args()
+
+    print(f"{args.services} services, {SERVICES_PER_HOST} per host")  # noqa: T201
+    measure("pydantic", PydanticHost, PydanticService, args.services)
+    measure("slots", Host, Service, args.services)
+
+
+if __name__ == "__main__":
+    main()
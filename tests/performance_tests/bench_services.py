@@ -0,0 +1,47 @@
+"""
+Benchmark adding and looking up services on a single host with every port open.
+
+    uv run python tests/performance_tests/bench_services.py [--ports 65535]
+"""
+
+import argparse
+import time
+
+from scans2any.internal import Host, Service, SortedSet
+
+
+def service(port: int, name: str) -> Service:
+    return Service(
+        port=port,
+        protocol="tcp",
+        service_names=SortedSet([name]),
+        banners=SortedSet(),
+    )
+
+
+def measure(name: str, func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    print(f"{name:<24} {time.perf_counter() - start:>8.3f} s")  # noqa: T201
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ports", type=int, default=65535)
+    args = parser.parse_args()
+    ports = range(1, args.ports + 1)
+
+    # Services are built up front, only adding them is timed
+    new = [service(port, "http") for port in ports]
+    merge = [service(port, "www") for port in ports]
+
+    host = Host(address={"10.0.0.1"}, hostnames=set(), os=set())
+    print(f"{args.ports} open ports on one host")  # noqa: T201
+    measure("add_service (new)", host.add_service, new)
+    measure("add_service (merge)", host.add_service, merge)
+    measure("get_service_by_port", host.get_service_by_port, ports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark the `trash_banner` filter on services with many banners.
+
+    uv run python tests/performance_tests/bench_trash_banner.py
+"""
+
+import random
+import time
+
+from scans2any.filters import trash_banner
+from scans2any.internal import Service, SortedSet
+
+WORDS = [
+    "Apache",
+    "httpd",
+    "nginx",
+    "Microsoft-IIS",
+    "OpenSSL",
+    "PHP",
+    "Ubuntu",
+    "Welcome",
+    "Login",
+    "Portal",
+    "Admin",
+]
+
+
+def banners(count: int, rng: random.Random) -> SortedSet[str]:
+    result: SortedSet[str] = SortedSet()
+    while len(result) < count:
+        words = rng.choices(WORDS, k=rng.randint(1, 8))
+        result.add(" ".join(words) + f" {rng.randint(0, 99)}" * rng.randint(0, 1))
+    return result
+
+
+def main():
+    rng = random.Random(0)
+    for count in (1, 10, 500):
+        data = banners(count, rng)
+        repeat = max(1, 5000 // count)
+        elapsed = 0.0
+        for _ in range(repeat):
+            service = Service(
+                port=80, protocol="tcp", service_names=SortedSet(), banners=data
+            )
+            start = time.perf_counter()
+            trash_banner.apply_filter(service, None)
+            elapsed += time.perf_counter() - start
+        print(f"{count:>4} banners {elapsed / repeat * 1e6:>10.1f} µs/service")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -189,3 +189,24 @@ def test_combine_multiple_inputs(test_env):
     # Both IPs should be present in the output
     assert "1.1.1.1" in result.stdout
     assert "2.2.2.2" in result.stdout
+
+
+def test_auto_project_database(test_env, tmp_path):
+    """Test that a project database can be read with the auto parser"""
+    json_file = test_env.data_dir / "json/simple.json"
+    project = tmp_path / "project"
+    result = test_env.run_scans2any(["--json", str(json_file), "-p", str(project)])
+    assert result.returncode == 0
+
+    result = test_env.run_scans2any(["-a", f"{project}.db"])
+    assert result.returncode == 0, result.stderr
+    assert "1.1.1.1" in result.stdout
+    assert "22/tcp" in result.stdout
+
+    # Files of unknown format in a directory are skipped with a warning
+    (tmp_path / "notes.txt").write_text("not a scan\n")
+    result = test_env.run_scans2any(["-a", str(tmp_path)])
+    assert result.returncode == 0, result.stderr
+    assert "1.1.1.1" in result.stdout
+    assert "Skipping" in result.stderr
+    assert "notes.txt" in result.stderr
@@ -0,0 +1,234 @@
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from scans2any.filters import column_filter
+from scans2any.internal import Host, Infrastructure, Service, SortedSet
+from scans2any.internal.database import (
+    SCHEMA_VERSION,
+    ColumnFilter,
+    Database,
+    connection_profile,
+)
+from scans2any.parsers.auto_parser import detect_parser
+
+
+def _host(*addresses, hostname="a.example", ports=(80,), banner="nginx") -> Host:
+    host = Host(address=set(addresses), hostnames={hostname}, os={"linux"})
+    host.services = [
+        Service(
+            port=port,
+            protocol="tcp",
+            service_names=SortedSet(["http"]),
+            banners=SortedSet([banner]),
+        )
+        for port in ports
+    ]
+    return host
+
+
+def _rows(db: Database, *specs: str, **modes) -> list[tuple]:
+    filters = []
+    for spec in specs:
+        column, pattern = spec.split(":", 1) if ":" in spec else (None, spec)
+        negated = pattern.startswith("!")
+        filters.append(ColumnFilter(column, pattern.removeprefix("!"), negated))
+    return [
+        (sorted(host.address), sorted(host.hostnames), service.port, *service.banners)
+        for host in db.read_infrastructure(filters=filters, **modes).hosts
+        for service in host.services
+    ]
+
+
+def test_write_infrastructure_upserts_by_exact_address(tmp_path):
+    with Database(tmp_path / "test.db") as db:
+        db.write_infrastructure(Infrastructure([_host("10.0.0.10")]))
+        db.write_infrastructure(
+            Infrastructure(
+                [
+                    # Not merged into 10.0.0.10
+                    _host("10.0.0.1", ports=(22,)),
+                    _host("10.0.0.10", "10.0.0.11", hostname="b", banner="Apache"),
+                ]
+            )
+        )
+
+        assert _rows(db) == [
+            (["10.0.0.1"], ["a.example"], 22, "nginx"),
+            (["10.0.0.10", "10.0.0.11"], ["b"], 80, "Apache"),
+        ]
+
+
+def test_concurrent_writers_are_serialized(tmp_path, monkeypatch):
+    """
+    A writer that starts while another one is between its lookups and its
+    inserts waits for it, and then merges into the hosts it wrote.
+    """
+    db_path = tmp_path / "test.db"
+    errors = []
+
+    def write_second():
+        try:
+            with Database(db_path) as db:
+                db.write_infrastructure(
+                    Infrastructure([_host("10.0.0.1", hostname="b", ports=(22,))])
+                )
+        except Exception as e:
+            errors.append(e)
+
+    with Database(db_path) as db:
+        lookup_host_ids = db._Database__lookup_host_ids
+        second = threading.Thread(target=write_second)
+
+        def interleave(addresses):
+            host_ids = lookup_host_ids(addresses)
+            second.start()
+            # Blocked by the write lock of the first writer
+            second.join(0.5)
+            assert second.is_alive()
+            return host_ids
+
+        monkeypatch.setattr(db, "_Database__lookup_host_ids", interleave)
+        db.write_infrastructure(Infrastructure([_host("10.0.0.1")]))
+        second.join()
+
+        assert errors == []
+        assert _rows(db) == [
+            (["10.0.0.1"], ["b"], 22, "nginx"),
+            (["10.0.0.1"], ["b"], 80, "nginx"),
+        ]
+
+
+def test_database_stores_single_values(tmp_path):
+    with Database(tmp_path / "test.db") as db:
+        db.write_infrastructure(
+            Infrastructure(
+                [
+                    _host("10.0.0.1", banner="Apache, PHP 8"),
+                    _host("10.0.0.2", hostname="b.example", ports=(22,)),
+                ]
+            )
+        )
+
+        assert _rows(db, "Banners:^Apache, PHP 8$") == [
+            (["10.0.0.1"], ["a.example"], 80, "Apache, PHP 8")
+        ]
+        assert _rows(db, "Hostnames:^b", "Ports:^22/tcp$") == [
+            (["10.0.0.2"], ["b.example"], 22, "nginx")
+        ]
+        assert _rows(db, r"IP-Addresses:10\.0\.0\.1\b", "Ports:22") == []
+
+
+def test_read_infrastructure_pushes_down_column_filters(tmp_path):
+    with Database(tmp_path / "test.db") as db:
+        db.write_infrastructure(
+            Infrastructure(
+                [
+                    _host("10.0.0.1", ports=(22, 80)),
+                    _host("10.0.0.2", hostname="b.example", ports=(8080,)),
+                    _host("10.0.0.3", hostname="c.example", banner="Apache"),
+                ]
+            )
+        )
+
+        # Negation and several specs on one column
+        assert _rows(db, "Ports:!^22/", "Ports:0/tcp$", "Banners:!Apache") == [
+            (["10.0.0.1"], ["a.example"], 80, "nginx"),
+            (["10.0.0.2"], ["b.example"], 8080, "nginx"),
+        ]
+        # Global specs match host or service columns
+        assert _rows(db, "b.example", "nginx") == [
+            (["10.0.0.2"], ["b.example"], 8080, "nginx")
+        ]
+        assert _rows(db, "b.example", value_mode=True) == []
+        # Host mode keeps all services of matching hosts
+        assert _rows(db, "Ports:22", host_mode=True) == [
+            (["10.0.0.1"], ["a.example"], 22, "nginx"),
+            (["10.0.0.1"], ["a.example"], 80, "nginx"),
+        ]
+
+
+def test_pushdown_matches_column_filter_on_joined_values(tmp_path):
+    # Patterns spanning several values see them joined in sorted order
+    hosts = [
+        _host(f"192.168.0.{i}", f"10.0.1.{i}", hostname=f"h{i}") for i in range(20)
+    ]
+    args = SimpleNamespace(column_regex=[r"IP-Addresses:^10\.0\.1"])
+    with Database(tmp_path / "test.db") as db:
+        db.write_infrastructure(Infrastructure(hosts))
+        pushed_down = db.read_infrastructure(
+            filters=[ColumnFilter("IP-Addresses", r"^10\.0\.1")]
+        )
+    pushed_down.merge_os_sources()
+    column_filter.apply_filter(pushed_down, args)
+    infra = Infrastructure(hosts)
+    column_filter.apply_filter(infra, args)
+
+    assert len(pushed_down.hosts) == len(infra.hosts) == 20
+
+
+def test_database_migrates_comma_separated_layout(tmp_path):
+    db_path = tmp_path / "test.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript("""
+            CREATE TABLE hosts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                address TEXT NOT NULL UNIQUE, hostnames TEXT, os TEXT,
+                custom_fields TEXT, created_at TIMESTAMP, updated_at TIMESTAMP
+            );
+            CREATE TABLE services (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, host_id INTEGER NOT NULL,
+                port INTEGER NOT NULL, protocol TEXT NOT NULL, service_names TEXT,
+                banners TEXT, custom_fields TEXT, created_at TIMESTAMP,
+                updated_at TIMESTAMP, UNIQUE(host_id, port, protocol)
+            );
+            CREATE INDEX idx_service_port ON services(port);
+            INSERT INTO hosts (address, hostnames, os, custom_fields) VALUES
+                ('10.0.0.1,10.0.0.2', 'a.example,b.example', 'linux',
+                 '{"tags": ["x", "y"]}');
+            INSERT INTO services (host_id, port, protocol, service_names, banners)
+                VALUES (1, 80, 'tcp', 'http,www', 'nginx,Apache');
+        """)
+    conn.close()
+    assert detect_parser(db_path) == "database_parser"
+
+    with Database(db_path) as db:
+        assert db.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        (host,) = db.read_infrastructure().hosts
+        db.write_infrastructure(Infrastructure([_host("10.0.0.2", ports=(22,))]))
+        stats = db.get_statistics()
+
+    assert host.address == {"10.0.0.1", "10.0.0.2"}
+    assert host.custom_fields == {"tags": {"x", "y"}}
+    assert list(host.services[0].banners) == ["Apache", "nginx"]
+    assert (stats["hosts"], stats["services"]) == (1, 2)
+    assert detect_parser(db_path) == "database_parser"
+
+
+def test_connection_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCANS2ANY_DB_MMAP_SIZE", "1")
+    with Database(tmp_path / "test.db", profile=connection_profile()) as db:
+        pragmas = [
+            db.conn.execute(f"PRAGMA {name}").fetchone()[0]
+            for name in ("journal_mode", "synchronous", "mmap_size", "foreign_keys")
+        ]
+        db.write_infrastructure(Infrastructure([_host("10.0.0.1")]))
+        # Child rows are deleted with their host
+        db.conn.execute("DELETE FROM hosts")
+        assert db.conn.execute("SELECT COUNT(*) FROM service_names").fetchone()[0] == 0
+    assert pragmas == ["wal", 1, 1024 * 1024, 1]
+
+    profile = connection_profile("durable", cache_size=8)
+    with Database(tmp_path / "test.db", profile=profile) as db:
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert db.conn.execute("PRAGMA cache_size").fetchone()[0] == -8 * 1024
+
+    # Malformed or negative sizes are rejected like unknown profiles
+    for name, kwargs in (("x", {}), (None, {"cache_size": -1})):
+        with pytest.raises(ValueError, match="database"):
+            connection_profile(name, **kwargs)
+    monkeypatch.setenv("SCANS2ANY_DB_MMAP_SIZE", "1G")
+    with pytest.raises(ValueError, match="SCANS2ANY_DB_MMAP_SIZE"):
+        connection_profile()
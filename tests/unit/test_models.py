@@ -1,7 +1,16 @@
 import pytest
-from pydantic import ValidationError
 
-from scans2any.internal import Host, Infrastructure, Service, SortedSet
+from scans2any.internal import (
+    Host,
+    Infrastructure,
+    Service,
+    SortedSet,
+    validate_host,
+)
+from scans2any.internal.infrastructure import (
+    _compile_default_rules,
+    _load_default_rules,
+)
 
 
 def test_service_creation():
@@ -21,8 +30,61 @@ def test_host_creation():
 
 
 def test_host_validation():
-    with pytest.raises(ValidationError):
-        Host(address=set(), hostnames=set(), os=set())
+    with pytest.raises(ValueError):
+        validate_host(Host(address=set(), hostnames=set(), os=set()))
+
+
+def test_host_validation_normalizes_untrusted_input():
+    service = Service(port="443", protocol="tcp", service_names=["https"], banners=[])
+    h = validate_host(
+        Host(address=["10.0.0.1"], hostnames=[], os=[], services=[service])
+    )
+    assert h.address == {"10.0.0.1"}
+    assert h.services[0].port == 443
+    assert isinstance(h.services[0].service_names, SortedSet)
+
+    service.port = 70000
+    with pytest.raises(ValueError):
+        validate_host(h)
+
+
+def test_host_service_index():
+    def service(port, protocol="tcp", name="http"):
+        return Service(
+            port=port,
+            protocol=protocol,
+            service_names=SortedSet([name]),
+            banners=SortedSet(),
+        )
+
+    h = Host(address={"10.0.0.1"}, hostnames=set(), os=set())
+    h.add_services([service(443), service(80), service(80, "udp", "dns")])
+    h.add_service(service(80, name="www"))
+    assert len(h.services) == 3
+    assert h.services[1].service_names == {"http", "www"}
+    assert h.get_service_by_port(80) is h.services[1]
+    assert h.get_service_by_port(22) is None
+
+    # Sorting may change which service comes first for a port
+    h.services.reverse()
+    h.sort()
+    assert h.get_service_by_port(80) is h.services[0]
+    assert h.services[0].protocol == "udp"
+
+    # Appending to and replacing the list directly keeps lookups coherent
+    h.services.append(service(22, name="ssh"))
+    assert h.get_service_by_port(22) is h.services[-1]
+    h.remove_service(80)
+    assert h.get_service_by_port(80) is None
+    h.services = [service(8080)]
+    assert h.get_service_by_port(443) is None
+    h.add_service(service(8080, name="proxy"))
+    assert len(h.services) == 1
+
+    # Ports changed in place are not found under their old number anymore
+    h.services[0].port = 8443
+    assert h.get_service_by_port(8080) is None
+    assert h.get_service_by_port(8443) is h.services[0]
 
 
 def test_infrastructure_creation():
@@ -37,3 +99,99 @@ def test_infrastructure_add_host():
     infra.add_host(h)
     assert len(infra.hosts) == 1
     assert infra.hosts[0].address == {"1.1.1.1"}
+
+
+def test_infrastructure_host_index():
+    infra = Infrastructure()
+    infra.add_host(Host(address={"10.0.0.1"}, hostnames={"a.example"}, os=set()))
+    infra.add_host(Host(address={"10.0.0.2"}, hostnames=set(), os=set()))
+
+    # Merged via hostname, new address is found afterwards
+    infra.add_host(Host(address={"10.0.0.3"}, hostnames={"a.example"}, os=set()))
+    assert len(infra.hosts) == 2
+    assert infra.get_host_by_address("10.0.0.3") is infra.hosts[0]
+
+    # Index follows replacement of the host list
+    infra.hosts = infra.hosts[1:]
+    assert infra.get_host_by_address("10.0.0.1") is None
+    assert infra.get_host_by_address("10.0.0.2") is infra.hosts[0]
+
+    # Addresses removed in place are not found anymore
+    infra.hosts[0].address.discard("10.0.0.2")
+    assert infra.get_host_by_address("10.0.0.2") is None
+
+
+def test_infrastructure_remove_host():
+    infra = Infrastructure(
+        [
+            Host(address={"10.0.0.1", "10.0.0.2"}, hostnames=set(), os=set()),
+            Host(address={"10.0.0.3"}, hostnames=set(), os=set()),
+        ]
+    )
+
+    infra.remove_host("10.0.0.1")
+    assert infra.hosts[0].address == {"10.0.0.2"}
+    assert infra.get_host_by_address("10.0.0.1") is None
+
+    infra.remove_host("10.0.0.3")
+    assert len(infra.hosts) == 1
+    assert infra.get_host_by_address("10.0.0.3") is None
+
+
+def test_infrastructure_auto_merge_rule_order():
+    def host(port, names, banners=()):
+        return Host(
+            address={f"10.0.0.{port}"},
+            hostnames=set(),
+            os=SortedSet(["linux", "windows"]),
+            services=[
+                Service(
+                    port=port,
+                    protocol="tcp",
+                    service_names=SortedSet(names),
+                    banners=SortedSet(banners),
+                )
+            ],
+        )
+
+    ruleset = [
+        {"os": ["linux", "windows"], "key": ["unknown"]},
+        {"service-names": ["c"], "key": ["never"]},
+        {"service-names": ["a", "b"], "port": 80, "key": ["c"]},
+        {"service-names": ["a", "b"], "ports": [443], "key": ["d"]},
+        {"service-names": ["c"], "banners": ["x", "y"], "key": ["z"]},
+        {"banners": ["z"], "key": ["w"]},
+    ]
+    infra = Infrastructure([host(80, ["a", "b"], ["y", "x"]), host(443, ["a", "b"])])
+    infra.auto_merge(ruleset, quiet=True)
+
+    http, https = (h.services[0] for h in infra.hosts)
+    # Later rules see the rewritten names and banners, earlier ones do not
+    assert list(http.service_names) == ["z"]
+    assert list(http.banners) == ["w"]
+    assert list(https.service_names) == ["d"]
+    assert all(list(h.os) == ["unknown"] for h in infra.hosts)
+
+
+def test_default_merge_rules_are_cached(tmp_path):
+    _compile_default_rules.cache_clear()
+
+    rules = _load_default_rules(tmp_path)
+    assert _load_default_rules(tmp_path) is rules
+    assert len(list(tmp_path.glob("merge-rules-*.pickle"))) == 1
+
+    # A new process loads the stored compiled rules instead of the YAML
+    _compile_default_rules.cache_clear()
+    stored = _load_default_rules(tmp_path)
+    assert stored is not rules
+    assert stored.service_rules == rules.service_rules
+    assert stored.by_names_port == rules.by_names_port
+
+    # Without a cache directory (--no-cache) nothing is read or written
+    for path in tmp_path.glob("merge-rules-*.pickle"):
+        path.write_bytes(b"broken")
+    compiled = _load_default_rules()
+    assert compiled.service_rules == rules.service_rules
+    assert _load_default_rules() is compiled
+    assert all(p.read_bytes() == b"broken" for p in tmp_path.iterdir())
+    _compile_default_rules.cache_clear()
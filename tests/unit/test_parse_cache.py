@@ -0,0 +1,58 @@
+import os
+
+from scans2any.helpers.parse_cache import ParseCache
+from scans2any.internal import Host, Infrastructure
+
+
+def _infra() -> Infrastructure:
+    return Infrastructure(
+        [Host(address={"10.0.0.1"}, hostnames={"a.example"}, os=set())], "test"
+    )
+
+
+def test_parse_cache_roundtrip(tmp_path):
+    scan = tmp_path / "scan.json"
+    scan.write_text("[]")
+    cache = ParseCache(tmp_path / "cache", "1.0.0")
+
+    key = cache.key(scan, "json_parser")
+    assert key is not None
+    assert cache.get(key) is None
+
+    cache.put(key, _infra())
+    cached = cache.get(key)
+    assert cached is not None
+    assert str(cached) == str(_infra())
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_parse_cache_key_depends_on_content_parser_and_version(tmp_path):
+    scan = tmp_path / "scan.json"
+    scan.write_text("[]")
+    cache = ParseCache(tmp_path, "1.0.0")
+
+    key = cache.key(scan, "json_parser")
+    assert key != cache.key(scan, "masscan_parser")
+    assert key != ParseCache(tmp_path, "1.0.1").key(scan, "json_parser")
+
+    scan.write_text("[ ]")
+    assert key != cache.key(scan, "json_parser")
+
+
+def test_parse_cache_uncacheable_inputs(tmp_path):
+    cache = ParseCache(tmp_path, "1.0.0")
+    assert cache.key("/dev/fd/0", "json_parser") is None
+    assert cache.key(tmp_path / "missing.json", "json_parser") is None
+
+
+def test_parse_cache_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(tmp_path, "1.0.0")
+    for i, key in enumerate(("old", "new")):
+        cache.put(key, _infra())
+        os.utime(tmp_path / f"{key}.pickle", (i, i))
+
+    cache.max_size = (tmp_path / "new.pickle").stat().st_size
+    cache.evict()
+
+    assert not (tmp_path / "old.pickle").exists()
+    assert (tmp_path / "new.pickle").exists()
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+
+from scans2any.internal import Host, Infrastructure, Service, SortedSet
+from scans2any.internal.wire import (
+    pack_infrastructure,
+    unpack_infrastructure,
+)
+from scans2any.parsers import avail_parsers
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+@pytest.mark.parametrize(
+    ("parser_name", "scan"),
+    [
+        ("aquatone_parser", "aquatone/goad-light-aquatone_session.json"),
+        ("json_parser", "json/filter_test.json"),
+        ("nessus_parser", "nessus/goad-light.nessus"),
+        ("nmap_parser", "nmap/goad-light.xml"),
+    ],
+)
+def test_wire_roundtrip_parser_results(parser_name, scan):
+    infra = avail_parsers[parser_name].parse(DATA_DIR / scan)
+    unpacked = unpack_infrastructure(pack_infrastructure(infra))
+
+    assert unpacked.identifier == infra.identifier
+    assert unpacked.trusted_fields == infra.trusted_fields
+    # Not compared via str(), iteration order of plain sets may differ
+    assert unpacked.hosts == infra.hosts
+
+
+def test_wire_preserves_collection_types():
+    service = Service(
+        port=443,
+        protocol="tcp",
+        service_names=SortedSet(["https"]),
+        banners=SortedSet(),
+        trusted_fields={"protocol"},
+        custom_fields={"tag": {"x"}},
+    )
+    host = Host(
+        address={"10.0.0.1"},
+        hostnames=SortedSet(["a.example"]),
+        os={("Windows", "Nmap")},
+        services=[service],
+    )
+    host.services[0].custom_fields["Vulnerability-Type"] = SortedSet(["TLS"])
+    unpacked = unpack_infrastructure(
+        pack_infrastructure(Infrastructure([host], "test"))
+    ).hosts[0]
+
+    assert type(unpacked.address) is set
+    assert type(unpacked.hostnames) is SortedSet
+    assert unpacked.os == {("Windows", "Nmap")}
+    unpacked_service = unpacked.services[0]
+    assert type(unpacked_service.custom_fields["Vulnerability-Type"]) is SortedSet
+    assert unpacked_service.custom_fields["tag"] == {"x"}
+    assert unpacked_service.trusted_fields == {"protocol"}
+
+
+def test_wire_rejects_other_versions():
+    data = pack_infrastructure(Infrastructure(identifier="test"))
+    with pytest.raises(ValueError):
+        unpack_infrastructure((0, *data[1:]))
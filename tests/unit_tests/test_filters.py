@@ -1,9 +1,19 @@
 import copy
+import json
 import textwrap
+from concurrent.futures.process import BrokenProcessPool
 from types import SimpleNamespace
 
+import pytest
+
 from scans2any import filters
 from scans2any.filters import column_filter
+from scans2any.helpers.infrastructure import (
+    _run_host_stage,
+    apply_filters,
+    compile_filter_pipeline,
+)
+from scans2any.helpers.utils import banner_cache_stats
 from scans2any.internal import Host, Infrastructure, Service, SortedSet
 
 #  Test Infrastructure
@@ -110,6 +120,254 @@ def test_trash_banners_filter():
         """)
 
 
+def test_trash_banner_drops_contained_banners():
+    service = Service(
+        port=80,
+        protocol="tcp",
+        service_names=SortedSet(["http"]),
+        banners=SortedSet(["Apache", "apache httpd", "APACHE HTTPD", "nginx", "404"]),
+    )
+    filters.trash_banner.apply_filter(service, None)
+    assert list(service.banners) == ["APACHE HTTPD", "nginx"]
+
+
+def test_nmap_banner_memoizes_normalized_banners():
+    raw = "product: Microsoft Windows RPC ostype: Windows"
+    name = "nmap_banner._normalize_nmap_banner"
+    hits, misses = banner_cache_stats()[name]
+    for _ in range(3):
+        service = Service(
+            port=135,
+            protocol="tcp",
+            service_names=SortedSet(["msrpc"]),
+            banners=SortedSet([raw, "Other"]),
+        )
+        filters.nmap_banner.apply_filter(service, None)
+        assert list(service.banners) == ["Microsoft Windows RPC", "Other"]
+
+    new_hits, new_misses = banner_cache_stats()[name]
+    assert new_hits - hits >= 4
+    assert new_misses - misses <= 2
+
+
+def test_filter_pipeline_fuses_host_and_service_filters():
+    names = [
+        "nmap_banner",
+        "trash_banner",
+        "trash_hostname",
+        "combine_banner",
+        "empty_service",
+        "empty_host",
+        "use_first_entry",
+    ]
+    stages = compile_filter_pipeline(
+        [f for f in filters.avail_filters if f[0] in names]
+    )
+
+    assert [kind for kind, _ in stages] == ["hosts", "infra", "hosts"]
+    assert {entry[0] for entry in stages[0][1]} == set(names[:5])
+    assert [obj.PRIORITY for _, obj, _ in stages[0][1]] == [1, 2, 2, 3, 3]
+    assert [entry[0] for entry in stages[2][1]] == ["use_first_entry"]
+
+
+def test_filter_pipeline_matches_filter_by_filter_passes():
+    names = ["trash_banner", "trash_service_name", "combine_banner", "empty_service"]
+    expected = copy.deepcopy(infra)
+    for _, obj, level in sorted(
+        (f for f in filters.avail_filters if f[0] in names),
+        key=lambda f: f[1].PRIORITY,
+    ):
+        for host in expected.hosts:
+            if level == "host":
+                obj.apply_filter(host, None)
+            else:
+                for service in host.services:
+                    obj.apply_filter(service, None)
+
+    infra_ = copy.deepcopy(infra)
+    apply_filters(infra_, names, None, quiet=True)
+    assert str(infra_) == str(expected)
+
+
+def test_filters_in_parallel_shards_match_serial(monkeypatch):
+    names = ["nmap_banner", "trash_banner", "trash_hostname", "empty_service"]
+    big = Infrastructure()
+    big.hosts = [copy.deepcopy(infra.hosts[0]) for _ in range(9)]
+    big.hosts[0].hostnames = {"localhost", "localhost.local"}
+    big.hosts[1].services[0].banners.add("product: OpenSSH version: 9.0")
+    big.hosts[2].services[1].service_names.clear()
+    big.hosts[2].services[1].banners.clear()
+    expected = copy.deepcopy(big)
+    apply_filters(expected, names, SimpleNamespace(parallel_filter_hosts=0))
+
+    monkeypatch.setattr("os.cpu_count", lambda: 2)
+    calls = sum(banner_cache_stats()["trash_banner._is_trash"])
+    apply_filters(big, names, SimpleNamespace(parallel_filter_hosts=5), quiet=True)
+    assert str(big) == str(expected)
+    # Banner cache hits and misses of the workers are added up
+    assert sum(banner_cache_stats()["trash_banner._is_trash"]) > calls
+    assert big.hosts[0].hostnames == SortedSet(["localhost.local"])
+    assert len(big.hosts[2].services) == 3
+
+
+def test_parallel_filter_fallback(monkeypatch):
+    names = ["nmap_banner", "trash_banner", "empty_service"]
+    big = Infrastructure()
+    big.hosts = [copy.deepcopy(infra.hosts[0]) for _ in range(9)]
+    expected = copy.deepcopy(big)
+    apply_filters(expected, names, SimpleNamespace(parallel_filter_hosts=0))
+    monkeypatch.setattr("os.cpu_count", lambda: 2)
+
+    def broken_pool(*args):
+        raise BrokenProcessPool("worker died")
+
+    # Failed worker processes fall back to a serial run
+    monkeypatch.setattr(
+        "scans2any.helpers.infrastructure._run_host_stage_parallel", broken_pool
+    )
+    apply_filters(big, names, SimpleNamespace(parallel_filter_hosts=5), quiet=True)
+    assert str(big) == str(expected)
+
+    def broken_filter(*args):
+        raise ValueError("filter bug")
+
+    # Errors of the filters themselves are not hidden
+    monkeypatch.setattr(
+        "scans2any.helpers.infrastructure._run_host_stage_parallel", broken_filter
+    )
+    with pytest.raises(ValueError, match="filter bug"):
+        apply_filters(big, names, SimpleNamespace(parallel_filter_hosts=5), quiet=True)
+
+
+def test_filters_track_changes():
+    infra_ = copy.deepcopy(infra)
+    infra_.hosts.append(
+        Host(address=SortedSet(["10.0.0.1"]), hostnames=SortedSet(["a"]), os=set())
+    )
+    services = infra_.hosts[0].services
+    services[0].banners.add("product: OpenSSH version: 9.0")
+    banners = [service.banners for service in services]
+
+    names = ["nmap_banner", "trash_banner", "trash_hostname", "combine_banner"]
+    [(_, stage)] = compile_filter_pipeline(
+        [f for f in filters.avail_filters if f[0] in names]
+    )
+    assert _run_host_stage(infra_.hosts, stage, None) == [0]
+    # Unchanged services keep their banners, combine_banner did not apply
+    assert services[1].banners is banners[1]
+    assert services[2].banners is banners[2]
+
+
+def test_filter_stats(tmp_path, capsys):
+    infra_ = copy.deepcopy(infra)
+    infra_.hosts.append(
+        Host(address=SortedSet(["10.0.0.1"]), hostnames=set(), os=set())
+    )
+    infra_.hosts[0].services[0].banners.add("product: OpenSSH version: 9.0")
+    stats_file = tmp_path / "stats.json"
+
+    stats = apply_filters(
+        infra_,
+        ["empty_host", "nmap_banner", "empty_service"],
+        SimpleNamespace(parallel_filter_hosts=0, filter_stats=str(stats_file)),
+        quiet=True,
+    )
+    by_name = {stat.name: stat for stat in stats}
+    # In execution order (by priority)
+    assert list(by_name) == ["nmap_banner", "empty_service", "empty_host"]
+    assert (by_name["empty_host"].examined, by_name["empty_host"].removed) == (2, 1)
+    assert by_name["empty_host"].modified is None
+    nmap_banner = by_name["nmap_banner"]
+    assert nmap_banner.examined + nmap_banner.skipped == 4
+    assert nmap_banner.modified == 1
+    assert by_name["empty_service"].examined == 2
+    assert all(stat.wall_time >= 0 and stat.cpu_time >= 0 for stat in stats)
+
+    exported = json.loads(stats_file.read_text())
+    assert [entry["name"] for entry in exported] == list(by_name)
+    assert exported[2]["removed"] == 1
+    # '-' keeps stdout for the writer output
+    apply_filters(
+        copy.deepcopy(infra),
+        ["empty_host"],
+        SimpleNamespace(parallel_filter_hosts=0, filter_stats="-"),
+        quiet=True,
+    )
+    out, err = capsys.readouterr()
+    assert json.loads(err)[0]["name"] == "empty_host"
+    assert out == ""
+    # Without -v or --filter-stats nothing is measured
+    assert apply_filters(copy.deepcopy(infra), ["empty_host"], None, quiet=True) == []
+
+
+def _ip_infra(*addresses):
+    return Infrastructure(
+        [Host(address={address}, hostnames=set(), os=set()) for address in addresses]
+    )
+
+
+def _ip_args(allowlist=(), blocklist=()):
+    return SimpleNamespace(
+        ip_allowlist=list(allowlist),
+        ip_blocklist=list(blocklist),
+        port_allowlist=[],
+        port_blocklist=[],
+    )
+
+
+def test_ip_port_allowlist_ranges_and_cidr():
+    infra_ = _ip_infra(
+        "10.0.0.1", "10.255.255.255", "11.0.0.0", "2001:db8::1", "fe80::1"
+    )
+    filters.ip_port.apply_filter(
+        infra_, _ip_args(allowlist=["10.0.0.0-10.255.255.255", "2001:db8::/32"])
+    )
+    assert [next(iter(h.address)) for h in infra_.hosts] == [
+        "10.0.0.1",
+        "10.255.255.255",
+        "2001:db8::1",
+    ]
+
+
+def test_ip_port_blocklist_merges_overlapping_ranges():
+    infra_ = _ip_infra("192.168.0.5", "192.168.0.20", "192.168.0.30", "192.168.0.31")
+    filters.ip_port.apply_filter(
+        infra_,
+        _ip_args(blocklist=["192.168.0.0/28", "192.168.0.10-192.168.0.30"]),
+    )
+    assert [h.address for h in infra_.hosts] == [{"192.168.0.31"}]
+
+
+def test_ip_port_invalid_range_keeps_hosts():
+    infra_ = _ip_infra("10.0.0.1")
+    filters.ip_port.apply_filter(infra_, _ip_args(allowlist=["10.0.0.1-::1"]))
+    assert len(infra_.hosts) == 1
+
+
+def test_hosts_file_networks_and_wildcards(tmp_path):
+    hosts_file = tmp_path / "scope.txt"
+    hosts_file.write_text(
+        "# scope\n10.0.0.0/8\n192.168.1.5\n2001:db8::/32\n"
+        "exact.example\n*.corp.example\n.lab.test\n"
+    )
+    infra_ = _ip_infra("10.1.2.3", "11.0.0.1", "192.168.1.5", "192.168.1.6")
+    infra_.hosts.append(Host(address={"2001:db8::1"}, hostnames=set(), os=set()))
+    for name in ("Exact.example", "a.corp.example", "corp.example", "lab.test"):
+        infra_.hosts.append(Host(address={"1.1.1.1"}, hostnames={name}, os=set()))
+
+    filters.hosts_file_filter.apply_filter(
+        infra_, SimpleNamespace(hosts_file=str(hosts_file))
+    )
+    assert [(h.address, h.hostnames) for h in infra_.hosts] == [
+        ({"10.1.2.3"}, set()),
+        ({"192.168.1.5"}, set()),
+        ({"2001:db8::1"}, set()),
+        ({"1.1.1.1"}, {"Exact.example"}),
+        ({"1.1.1.1"}, {"a.corp.example"}),
+        ({"1.1.1.1"}, {"lab.test"}),
+    ]
+
+
 # ---------------------------------------------------------------------------
 # Helpers for column_filter tests
 # ---------------------------------------------------------------------------
@@ -420,3 +678,45 @@ def test_column_filter_value_mode_trims_service_names():
     assert len(result.hosts) == 1
     # Only "http-proxy" satisfies the pattern → other names trimmed
     assert list(result.hosts[0].services[0].service_names) == ["http-proxy"]
+
+
+def test_column_filter_combined_patterns():
+    """Patterns are pre-checked as one alternation, unless that is unsafe."""
+    patterns = column_filter._compile_specs(["(?i)APACHE", "!ssh", "Ports:^80/"])
+    assert column_filter._combine(patterns).pattern == "(?i:APACHE)|(?:ssh)|(?:^80/)"
+    # Backreferences would be renumbered
+    assert column_filter._combine(column_filter._compile_specs([r"(a)\1", "b"])) is None
+
+    # Same result as matching every pattern on its own
+    infra_ = _apply_cf(infra, ["(?i)APACHE", "!ssh", "Services:(?i)WWW"])
+    assert [s.port for s in infra_.hosts[0].services] == [80]
+    infra_ = _apply_cf(infra, ["(?i)openssh", "OpenSSH"])
+    assert [s.port for s in infra_.hosts[0].services] == [22]
+
+
+def test_column_filter_pandas_backend_matches_python():
+    """The pandas backend keeps the same hosts, services and values."""
+    infra_ = copy.deepcopy(infra)
+    infra_.hosts += _make_nessus_like_infra().hosts
+    infra_.hosts.append(
+        Host(address=SortedSet(["10.0.0.2"]), hostnames=SortedSet(["bare"]), os=set())
+    )
+    specs_list = [
+        ["Services:ssh"],
+        ["Services:!ssh", "(?i)apache"],
+        ["Vulnerability-Type:SSL", "!TRACE"],
+        ["Vulnerability-Type:!SSL"],
+        ["IP-Addresses:^10\\.", "Hostnames:!bare"],
+        ["Hostnames:bare"],
+        ["linux", "Ports:/tcp$"],
+        ["10\\.0\\.0", "!(?i)http"],
+    ]
+    for specs in specs_list:
+        for mode in ({}, {"value_mode": True}, {"host_mode": True}):
+            expected = copy.deepcopy(infra_)
+            column_filter.apply_filter(expected, _args(specs, **mode))
+            result = copy.deepcopy(infra_)
+            args = _args(specs, **mode)
+            args.column_filter_backend = "pandas"
+            column_filter.apply_filter(result, args)
+            assert str(result) == str(expected), (specs, mode)
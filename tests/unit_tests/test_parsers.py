@@ -1,10 +1,19 @@
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from xml.etree.ElementTree import ParseError
 
 import pytest
 
-from scans2any.parsers import merge_file_parser, nessus_parser, nmap_parser
+from scans2any.helpers.file_processing import submit_shards
+from scans2any.parsers import (
+    auto_parser,
+    avail_parsers,
+    merge_file_parser,
+    nessus_parser,
+    nmap_parser,
+)
 
 
 @pytest.fixture
@@ -64,6 +73,21 @@ def test_nmap_parser_complete(test_env):
     assert_or_heal(infra.__repr__(), "goad-light.xml")
 
 
+def test_nmap_parser_streaming(test_env):
+    """
+    Hosts are streamed one `<host>` at a time and match the full parse.
+    """
+    hosts = nmap_parser.iter_hosts(test_env.data_dir / "nmap/goad-light.xml")
+    first = next(hosts)
+    streamed = [first, *hosts]
+    assert len(streamed) == 3
+
+    infra = nmap_parser.parse(test_env.data_dir / "nmap/goad-light.xml")
+    assert sorted(h.identifier() for h in streamed) == sorted(
+        h.identifier() for h in infra.hosts
+    )
+
+
 def test_nmap_parser_incomplete(test_env):
     """
     Incomplete scan: missing closing tag but hosts should be intact.
@@ -92,9 +116,94 @@ def test_nessus_parser_valid(test_env):
     assert_or_heal(str(infra), "goad-light.nessus")
 
 
+def test_nessus_parser_sharded(test_env):
+    """
+    Parsing a Nessus scan in shards yields the same result as a single pass.
+    """
+    filename = test_env.data_dir / "nessus/goad-light.nessus"
+    shards = nessus_parser.split_file(filename, 1)
+    assert len(shards) == 3
+
+    infra = nessus_parser.merge_shards(
+        [nessus_parser.parse_shard(filename, start, end) for start, end in shards]
+    )
+    assert str(infra) == str(nessus_parser.parse(filename))
+
+
+def test_nessus_parser_sharded_namespaces(test_env, tmp_path):
+    """
+    Shards keep the namespaces declared on `<Report>` (e.g. `cm:` of
+    compliance checks).
+    """
+    report = (test_env.data_dir / "nessus/goad-light.nessus").read_bytes()
+    filename = tmp_path / "compliance.nessus"
+    filename.write_bytes(
+        re.sub(
+            rb"(<ReportItem[^>]*>)",
+            rb"\1<cm:compliance-check-name>check</cm:compliance-check-name>",
+            report,
+        )
+    )
+    shards = nessus_parser.split_file(filename, 1)
+    assert len(shards) == 3
+
+    infra = nessus_parser.merge_shards(
+        [nessus_parser.parse_shard(filename, start, end) for start, end in shards]
+    )
+    assert str(infra) == str(nessus_parser.parse(filename))
+
+
+def test_nessus_parser_sharded_fallback(test_env):
+    """
+    If a shard fails to parse, the whole file is parsed in one pass.
+    """
+
+    class BrokenShards:
+        parse = staticmethod(nessus_parser.parse)
+        merge_shards = staticmethod(nessus_parser.merge_shards)
+
+        @staticmethod
+        def parse_shard(filename, start, end):
+            raise ParseError("broken shard")
+
+    filename = test_env.data_dir / "nessus/goad-light.nessus"
+    shards = nessus_parser.split_file(filename, 1)
+    with ThreadPoolExecutor() as executor:
+        result, error = submit_shards(executor, BrokenShards, filename, shards).result()
+
+    assert error is None
+    assert str(result) == str(nessus_parser.parse(filename))
+
+
 def test_nessus_parser_corrupted(test_env):
     """
     Corrupted Nessus XML should raise an exception.
     """
     with pytest.raises(ParseError):
         _ = nessus_parser.parse(test_env.data_dir / "nessus/goad-mini-corrupted.nessus")
+
+
+@pytest.mark.parametrize(
+    ("scan", "parser_name"),
+    [
+        ("aquatone/goad-mini-aquatone_session.json", "aquatone_parser"),
+        ("bloodhound/goad-mini-computers.json", "bloodhound_parser"),
+        ("json/input1.json", "json_parser"),
+        ("masscan/goad-mini.json", "masscan_parser"),
+        ("nessus/goad-mini.nessus", "nessus_parser"),
+        ("nmap/goad-mini-incomplete.xml", "nmap_parser"),
+        ("nxc/goad-mini-smb.db", "nxc_parser"),
+        ("txt/goad-mini.txt", "txt_parser"),
+        ("MERGE_FILE.yaml", None),
+    ],
+)
+def test_auto_parser_detection(test_env, scan, parser_name):
+    """
+    Formats are told apart by content, auto parsing uses exactly that parser.
+    """
+    filename = test_env.data_dir / scan
+    assert auto_parser.detect_parser(filename) == parser_name
+
+    if parser_name is not None:
+        expected = avail_parsers[parser_name].parse(filename)
+        assert str(auto_parser.parse(filename)) == str(expected)